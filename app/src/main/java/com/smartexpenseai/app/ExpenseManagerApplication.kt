@@ -1,6 +1,7 @@
 package com.smartexpenseai.app
 
 import android.app.Application
+import com.smartexpenseai.app.services.SMSIngestionService
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import com.smartexpenseai.app.utils.logging.TimberFileTree
 import dagger.hilt.android.HiltAndroidApp
@@ -12,6 +13,9 @@ class ExpenseManagerApplication : Application() {
     @Inject
     lateinit var timberFileTree: TimberFileTree
 
+    @Inject
+    lateinit var smsIngestionService: SMSIngestionService
+
     private val logger = StructuredLogger("APP", ExpenseManagerApplication::class.java.simpleName)
 
     override fun onCreate() {
@@ -19,6 +23,9 @@ class ExpenseManagerApplication : Application() {
         logger.debug("onCreate","Application onCreate() starting with Timber logging...")
         initializeTimber()
         logger.debug("onCreate","Timber logging system initialized successfully")
+
+        // Load bank rules now so the first incoming SMS parses against a warm rule set
+        smsIngestionService.warmUp()
     }
 
     /**
@@ -40,6 +40,9 @@ interface MerchantDao {
     @Query("SELECT is_deleted FROM merchants WHERE normalized_name = :normalizedName")
     suspend fun isMerchantDeleted(normalizedName: String): Boolean?
 
+    @Query("SELECT normalized_name FROM merchants WHERE normalized_name IN (:normalizedNames) AND is_deleted = 1")
+    suspend fun getDeletedMerchantNames(normalizedNames: List<String>): List<String>
+
     @Query("UPDATE merchants SET is_deleted = 0 WHERE normalized_name = :normalizedName")
     suspend fun unmarkMerchantDeleted(normalizedName: String)
 
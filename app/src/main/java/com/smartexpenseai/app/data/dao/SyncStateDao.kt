@@ -43,6 +43,46 @@ interface SyncStateDao {
     @Query("UPDATE sync_state SET total_transactions = :count WHERE id = 1")
     suspend fun updateTransactionCount(count: Int)
     
+    @Query("""
+        UPDATE sync_state
+        SET import_since = :since,
+            import_pass = :pass,
+            import_pass_layout = :passLayout,
+            import_checkpoint_date = :checkpointDate,
+            import_checkpoint_sms_id = :checkpointSmsId,
+            import_chunk_index = :chunkIndex,
+            import_processed = :processed,
+            import_newest_date = :newestDate,
+            import_newest_sms_id = :newestSmsId
+        WHERE id = 1
+    """)
+    suspend fun updateImportCheckpoint(
+        since: Date,
+        pass: Int,
+        passLayout: Int,
+        checkpointDate: Date,
+        checkpointSmsId: Long,
+        chunkIndex: Int,
+        processed: Int,
+        newestDate: Date?,
+        newestSmsId: String?
+    )
+
+    @Query("""
+        UPDATE sync_state
+        SET import_since = NULL,
+            import_pass = 0,
+            import_pass_layout = 0,
+            import_checkpoint_date = NULL,
+            import_checkpoint_sms_id = NULL,
+            import_chunk_index = 0,
+            import_processed = 0,
+            import_newest_date = NULL,
+            import_newest_sms_id = NULL
+        WHERE id = 1
+    """)
+    suspend fun clearImportCheckpoint()
+
     @Query("DELETE FROM sync_state")
     suspend fun deleteSyncState()
 }
\ No newline at end of file
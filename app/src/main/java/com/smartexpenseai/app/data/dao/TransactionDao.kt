@@ -143,13 +143,15 @@ interface TransactionDao {
     @Query("SELECT * FROM transactions WHERE id = :transactionId LIMIT 1")
     suspend fun getTransactionById(transactionId: Long): TransactionEntity?
 
-    // Deliberately includes inactive rows (see getTransactionBySmsId)
+    // Deliberately includes inactive rows (see getTransactionBySmsId). The lowest id
+    // among the matches, the row IngestDedupIndex.findSimilar picks for a batch.
     @Query("""
         SELECT * FROM transactions
         WHERE normalized_merchant = :normalizedMerchant
           AND amount BETWEEN :minAmount AND :maxAmount
           AND transaction_date BETWEEN :startDate AND :endDate
           AND bank_name = :bankName
+        ORDER BY id
         LIMIT 1
     """)
     suspend fun findSimilarTransaction(
@@ -161,6 +163,25 @@ interface TransactionDao {
         bankName: String
     ): TransactionEntity?
 
+    // Bulk form of getTransactionBySmsId for ingestion batches; includes inactive rows
+    @Query("SELECT sms_id FROM transactions WHERE sms_id IN (:smsIds)")
+    suspend fun getExistingSmsIds(smsIds: List<String>): List<String>
+
+    // Bulk form of findSimilarTransaction: every row of these merchants in the window,
+    // in id order, so the first match is the row findSimilarTransaction returns.
+    // Includes inactive rows.
+    @Query("""
+        SELECT * FROM transactions
+        WHERE normalized_merchant IN (:normalizedMerchants)
+          AND transaction_date BETWEEN :startDate AND :endDate
+        ORDER BY id
+    """)
+    suspend fun getMerchantTransactionsInWindow(
+        normalizedMerchants: List<String>,
+        startDate: Date,
+        endDate: Date
+    ): List<TransactionEntity>
+
     @Insert(onConflict = OnConflictStrategy.IGNORE)
     suspend fun insertTransaction(transaction: TransactionEntity): Long
 
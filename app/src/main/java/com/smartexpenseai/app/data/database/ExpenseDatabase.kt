@@ -24,7 +24,7 @@ import com.smartexpenseai.app.data.dao.*
         TagEntity::class,
         TransactionTagEntity::class
     ],
-    version = 15,
+    version = 18,
     exportSchema = false
 )
 @TypeConverters(DateConverter::class)
@@ -65,7 +65,10 @@ abstract class ExpenseDatabase : RoomDatabase() {
                     MIGRATION_11_12, // Fix inconsistent transaction category_ids
                     MIGRATION_12_13, // Add is_active flag for soft-delete support
                     MIGRATION_13_14, // Add is_deleted flag to merchants for auto-hiding future SMS
-                    MIGRATION_14_15  // Add tags + transaction_tags tables (many-to-many tagging)
+                    MIGRATION_14_15, // Add tags + transaction_tags tables (many-to-many tagging)
+                    MIGRATION_15_16, // Add SMS import checkpoint columns to sync_state
+                    MIGRATION_16_17, // Add the sender pass to the SMS import checkpoint
+                    MIGRATION_17_18  // Add the sender pass layout to the SMS import checkpoint
                 )
                 .build()
                 INSTANCE = instance
@@ -424,6 +427,36 @@ abstract class ExpenseDatabase : RoomDatabase() {
                 )
             }
         }
+
+        // Migration from version 15 to 16: Add SMS import checkpoint columns to sync_state
+        // so an interrupted historical import resumes after the last stored chunk.
+        val MIGRATION_15_16 = object : Migration(15, 16) {
+            override fun migrate(database: SupportSQLiteDatabase) {
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_since INTEGER")
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_checkpoint_date INTEGER")
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_checkpoint_sms_id INTEGER")
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_chunk_index INTEGER NOT NULL DEFAULT 0")
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_processed INTEGER NOT NULL DEFAULT 0")
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_newest_date INTEGER")
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_newest_sms_id TEXT")
+            }
+        }
+
+        // Migration from version 16 to 17: Record which sender pass (bank senders or
+        // other senders) an interrupted SMS import stopped in.
+        val MIGRATION_16_17 = object : Migration(16, 17) {
+            override fun migrate(database: SupportSQLiteDatabase) {
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_pass INTEGER NOT NULL DEFAULT 0")
+            }
+        }
+
+        // Migration from version 17 to 18: Record which pass list an interrupted SMS
+        // import was planned with, so a checkpoint from another layout is not resumed.
+        val MIGRATION_17_18 = object : Migration(17, 18) {
+            override fun migrate(database: SupportSQLiteDatabase) {
+                database.execSQL("ALTER TABLE sync_state ADD COLUMN import_pass_layout INTEGER NOT NULL DEFAULT 0")
+            }
+        }
     }
 
     private class DatabaseCallback : RoomDatabase.Callback() {
@@ -465,8 +498,9 @@ abstract class ExpenseDatabase : RoomDatabase() {
             // Initialize sync state
             db.execSQL("""
                 INSERT OR IGNORE INTO sync_state 
-                (id, last_sms_sync_timestamp, last_sms_id, total_transactions, last_full_sync, sync_status)
-                VALUES (1, 0, null, 0, $currentTime, 'INITIAL')
+                (id, last_sms_sync_timestamp, last_sms_id, total_transactions, last_full_sync, sync_status,
+                 import_pass, import_pass_layout, import_chunk_index, import_processed)
+                VALUES (1, 0, null, 0, $currentTime, 'INITIAL', 0, 0, 0, 0)
             """)
         }
     }
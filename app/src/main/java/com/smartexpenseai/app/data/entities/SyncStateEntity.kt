@@ -23,5 +23,34 @@ data class SyncStateEntity(
     val lastFullSync: Date,
     
     @ColumnInfo(name = "sync_status")
-    val syncStatus: String = "COMPLETED" // COMPLETED, IN_PROGRESS, FAILED
+    val syncStatus: String = "COMPLETED", // COMPLETED, IN_PROGRESS, FAILED
+
+    // Checkpoint of an unfinished SMS import, written after every stored chunk so an
+    // interrupted import resumes where it stopped. All null/0 when no import is pending.
+    @ColumnInfo(name = "import_since")
+    val importSince: Date? = null, // Lower bound of the interrupted scan
+
+    @ColumnInfo(name = "import_pass")
+    val importPass: Int = 0, // Sender pass of the scan (bank senders, then other senders)
+
+    @ColumnInfo(name = "import_pass_layout")
+    val importPassLayout: Int = 0, // Which pass list the scan was planned with
+
+    @ColumnInfo(name = "import_checkpoint_date")
+    val importCheckpointDate: Date? = null, // DATE of the last SMS in the last stored chunk
+
+    @ColumnInfo(name = "import_checkpoint_sms_id")
+    val importCheckpointSmsId: Long? = null, // Telephony _ID of that SMS
+
+    @ColumnInfo(name = "import_chunk_index")
+    val importChunkIndex: Int = 0,
+
+    @ColumnInfo(name = "import_processed")
+    val importProcessed: Int = 0, // SMS already scanned by the interrupted import
+
+    @ColumnInfo(name = "import_newest_date")
+    val importNewestDate: Date? = null, // Newest transaction found so far
+
+    @ColumnInfo(name = "import_newest_sms_id")
+    val importNewestSmsId: String? = null
 )
\ No newline at end of file
@@ -1,6 +1,7 @@
 package com.smartexpenseai.app.data.repository
 
 import android.content.Context
+import androidx.room.withTransaction
 import com.smartexpenseai.app.data.database.ExpenseDatabase
 
 import com.smartexpenseai.app.data.entities.*
@@ -8,10 +9,12 @@ import com.smartexpenseai.app.data.dao.*
 import com.smartexpenseai.app.domain.repository.*
 import com.smartexpenseai.app.models.ParsedTransaction
 import com.smartexpenseai.app.parsing.engine.MerchantRuleEngine
+import com.smartexpenseai.app.services.SMSIngestionQueue
 import com.smartexpenseai.app.services.SMSParsingService
 import com.smartexpenseai.app.services.TransactionFilterService
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import com.smartexpenseai.app.data.repository.internal.DatabaseMaintenanceOperations
+import com.smartexpenseai.app.data.repository.internal.IngestDedupIndex
 import com.smartexpenseai.app.data.repository.internal.MerchantCategoryOperations
 import com.smartexpenseai.app.data.repository.internal.TransactionDataRepository
 import dagger.hilt.android.qualifiers.ApplicationContext
@@ -76,6 +79,8 @@ class ExpenseRepository @Inject constructor(
         featureTag = "DATABASE",
         className = "ExpenseRepository"
     )
+    // Group-commits SMS transactions from the receiver and the historical scan
+    private val ingestionQueue = SMSIngestionQueue(writer = ::storeIngestBatch)
     private val transactionRepository = TransactionDataRepository(
         context = context,
         transactionDao = transactionDao,
@@ -83,6 +88,7 @@ class ExpenseRepository @Inject constructor(
         merchantDao = merchantDao,
         syncStateDao = syncStateDao,
         smsParsingService = smsParsingService,
+        ingestionQueue = ingestionQueue,
         transactionFilterService = transactionFilterService,
         merchantRuleEngine = merchantRuleEngine
     )
@@ -218,6 +224,65 @@ class ExpenseRepository @Inject constructor(
     suspend fun isMerchantDeleted(normalizedMerchant: String): Boolean =
         transactionRepository.isMerchantDeleted(normalizedMerchant)
 
+    /**
+     * Store a parsed SMS transaction through the ingestion queue, batched with any
+     * other SMS arriving at the same time, and report what happened to it
+     */
+    suspend fun storeSmsTransaction(candidate: SMSIngestionQueue.Candidate): SMSIngestionQueue.Outcome =
+        ingestionQueue.submit(candidate)
+
+    // One queue batch, one database transaction: dedup, insert, merchant upsert and
+    // categorization for every row commit together. Duplicate checks are answered from
+    // an index loaded with one query per check for the whole batch.
+    private suspend fun storeIngestBatch(
+        candidates: List<SMSIngestionQueue.Candidate>
+    ): List<SMSIngestionQueue.Outcome> =
+        ExpenseDatabase.getDatabase(context).withTransaction {
+            val dedupIndex = transactionRepository.loadDedupIndex(
+                entities = candidates.map { it.entity },
+                similarFor = candidates.filter { it.checkSimilar }.map { it.entity }
+            )
+            candidates.map { storeIngestCandidate(it, dedupIndex) }
+        }
+
+    private suspend fun storeIngestCandidate(
+        candidate: SMSIngestionQueue.Candidate,
+        dedupIndex: IngestDedupIndex
+    ): SMSIngestionQueue.Outcome {
+        val entity = candidate.entity
+        return try {
+            if (dedupIndex.containsSmsId(entity.smsId)) {
+                return SMSIngestionQueue.Outcome.Duplicate("SMS ID match (${entity.smsId})")
+            }
+            val similar = if (candidate.checkSimilar) dedupIndex.findSimilar(entity) else null
+            if (similar != null) {
+                val similarRefInfo = if (!similar.referenceNumber.isNullOrBlank()) " [Ref: ${similar.referenceNumber}]" else ""
+                return SMSIngestionQueue.Outcome.Duplicate(
+                    "Similar transaction found (${similar.rawMerchant} - ₹${similar.amount}$similarRefInfo)"
+                )
+            }
+
+            // Merchant previously deleted by the user: store the transaction inactive
+            // so it stays hidden and is never re-imported
+            val merchantDeleted = dedupIndex.isMerchantDeleted(entity.normalizedMerchant)
+            val toInsert = if (merchantDeleted) entity.copy(isActive = false) else entity
+            val insertedId = transactionRepository.insertTransaction(toInsert)
+            if (insertedId > 0) dedupIndex.add(toInsert.copy(id = insertedId))
+            when {
+                // Stored meanwhile by a writer outside the queue
+                insertedId <= 0 -> SMSIngestionQueue.Outcome.Duplicate("SMS ID match (${entity.smsId})")
+                merchantDeleted -> SMSIngestionQueue.Outcome.Hidden(insertedId)
+                else -> {
+                    autoCategorizeTransaction(insertedId)
+                    SMSIngestionQueue.Outcome.Inserted(insertedId)
+                }
+            }
+        } catch (e: Exception) {
+            logger.error("storeIngestCandidate", "Error storing SMS transaction ${entity.smsId}", e)
+            SMSIngestionQueue.Outcome.Failed(e)
+        }
+    }
+
     suspend fun getInactiveTransactionsSync(): List<TransactionEntity> =
         transactionRepository.inactiveTransactions()
 
@@ -367,6 +432,13 @@ class ExpenseRepository @Inject constructor(
 
     override suspend fun syncNewSMS(): Int = transactionRepository.syncNewSms()
 
+    override suspend fun syncNewSMS(onProgress: (SmsImportProgress) -> Unit): Int =
+        transactionRepository.syncNewSms(onProgress)
+
+    override suspend fun getPendingImportOffset(): Int? = transactionRepository.pendingImportOffset()
+
+    override fun isImportRunning(): Boolean = transactionRepository.isImportRunning()
+
     override suspend fun getLastSyncTimestamp(): Date? = transactionRepository.lastSyncTimestamp()
 
     override suspend fun getSyncStatus(): String? = transactionRepository.syncStatus()
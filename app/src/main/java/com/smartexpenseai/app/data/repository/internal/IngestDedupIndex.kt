@@ -0,0 +1,105 @@
+package com.smartexpenseai.app.data.repository.internal
+
+import com.smartexpenseai.app.data.dao.MerchantDao
+import com.smartexpenseai.app.data.dao.TransactionDao
+import com.smartexpenseai.app.data.entities.TransactionEntity
+import java.util.Date
+
+/**
+ * Duplicate checks for one ingestion batch, answered from memory
+ *
+ * Built by [load] with three set queries per batch: the batch's sms_ids that already
+ * exist, every row of the batch's merchants in the batch's similarity window, and which
+ * of those merchants the user deleted. The lookups give the same answers as
+ * getTransactionBySmsId, findSimilarTransaction and isMerchantDeleted would per row,
+ * provided every row the batch stores is passed to [add] in order. When several rows
+ * are in a transaction's similarity window, both sides take the one with the lowest id;
+ * findSimilarTransaction's LIMIT 1 used to leave that choice to SQLite.
+ */
+internal class IngestDedupIndex(
+    existingSmsIds: Collection<String>,
+    windowRows: List<TransactionEntity>,
+    private val deletedMerchants: Set<String>
+) {
+    private data class SimilarityKey(val normalizedMerchant: String, val bankName: String)
+
+    private val smsIds = HashSet(existingSmsIds)
+
+    // Per merchant and bank, in id order like the table scan behind findSimilarTransaction
+    private val rowsByKey = HashMap<SimilarityKey, MutableList<TransactionEntity>>()
+
+    init {
+        windowRows.forEach { index(it) }
+    }
+
+    fun containsSmsId(smsId: String): Boolean = smsId in smsIds
+
+    fun isMerchantDeleted(normalizedMerchant: String): Boolean = normalizedMerchant in deletedMerchants
+
+    /**
+     * Lowest-id row in findSimilarTransaction's window, with its reference-number rule
+     * applied. Later rows in the window are not tried when that one has a different
+     * reference, as with the per-row query.
+     */
+    fun findSimilar(entity: TransactionEntity): TransactionEntity? {
+        val minAmount = (entity.amount - TransactionDataRepository.SIMILAR_AMOUNT_TOLERANCE).coerceAtLeast(0.0)
+        val maxAmount = entity.amount + TransactionDataRepository.SIMILAR_AMOUNT_TOLERANCE
+        val startMillis = entity.transactionDate.time - TransactionDataRepository.SIMILAR_TIME_WINDOW_MILLIS
+        val endMillis = entity.transactionDate.time + TransactionDataRepository.SIMILAR_TIME_WINDOW_MILLIS
+
+        val first = rowsByKey[SimilarityKey(entity.normalizedMerchant, entity.bankName)]?.firstOrNull { row ->
+            row.amount in minAmount..maxAmount && row.transactionDate.time in startMillis..endMillis
+        }
+        return TransactionDataRepository.confirmSimilar(entity, first)
+    }
+
+    /**
+     * Record a row the batch just stored, so later rows in the batch see it
+     */
+    fun add(stored: TransactionEntity) {
+        smsIds += stored.smsId
+        index(stored)
+    }
+
+    private fun index(row: TransactionEntity) {
+        rowsByKey.getOrPut(SimilarityKey(row.normalizedMerchant, row.bankName)) { mutableListOf() } += row
+    }
+
+    companion object {
+        // Stay well below SQLite's 999 bound arguments
+        private const val MAX_QUERY_ARGS = 500
+
+        /**
+         * Run the batch's three set queries. Similarity rows are only loaded for [similarFor].
+         */
+        suspend fun load(
+            transactionDao: TransactionDao,
+            merchantDao: MerchantDao,
+            entities: List<TransactionEntity>,
+            similarFor: List<TransactionEntity>
+        ): IngestDedupIndex {
+            val existingSmsIds = entities.map { it.smsId }.distinct()
+                .chunked(MAX_QUERY_ARGS)
+                .flatMap { transactionDao.getExistingSmsIds(it) }
+
+            val windowRows = if (similarFor.isEmpty()) {
+                emptyList()
+            } else {
+                val window = TransactionDataRepository.SIMILAR_TIME_WINDOW_MILLIS
+                val startDate = Date(similarFor.minOf { it.transactionDate.time } - window)
+                val endDate = Date(similarFor.maxOf { it.transactionDate.time } + window)
+                similarFor.map { it.normalizedMerchant }.distinct()
+                    .chunked(MAX_QUERY_ARGS)
+                    .flatMap { transactionDao.getMerchantTransactionsInWindow(it, startDate, endDate) }
+                    .sortedBy { it.id }
+            }
+
+            val deletedMerchants = entities.map { it.normalizedMerchant }.distinct()
+                .chunked(MAX_QUERY_ARGS)
+                .flatMap { merchantDao.getDeletedMerchantNames(it) }
+                .toHashSet()
+
+            return IngestDedupIndex(existingSmsIds, windowRows, deletedMerchants)
+        }
+    }
+}
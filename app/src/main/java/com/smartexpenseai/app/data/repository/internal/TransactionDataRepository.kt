@@ -12,14 +12,18 @@ import com.smartexpenseai.app.data.entities.CategoryEntity
 import com.smartexpenseai.app.data.entities.MerchantEntity
 import com.smartexpenseai.app.data.entities.SyncStateEntity
 import com.smartexpenseai.app.data.entities.TransactionEntity
-import com.smartexpenseai.app.data.repository.ExpenseRepository
+import com.smartexpenseai.app.domain.repository.SmsImportProgress
 import com.smartexpenseai.app.models.ParsedTransaction
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import com.smartexpenseai.app.parsing.engine.MerchantRuleEngine
+import com.smartexpenseai.app.services.SMSIngestionQueue
 import com.smartexpenseai.app.services.SMSParsingService
 import com.smartexpenseai.app.services.TransactionFilterService
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.flow.Flow
+import kotlinx.coroutines.sync.Mutex
+import kotlinx.coroutines.sync.withLock
 import kotlinx.coroutines.withContext
 import java.util.Date
 import java.util.concurrent.TimeUnit
@@ -31,6 +35,7 @@ internal class TransactionDataRepository(
     private val merchantDao: MerchantDao,
     private val syncStateDao: SyncStateDao,
     private val smsParsingService: SMSParsingService,
+    private val ingestionQueue: SMSIngestionQueue,
     private val transactionFilterService: TransactionFilterService?,
     private val merchantRuleEngine: MerchantRuleEngine
 ) {
@@ -276,14 +281,37 @@ internal class TransactionDataRepository(
     // Sync state
     // ---------------------------------------------------------------------
 
-    suspend fun syncNewSms(): Int = withContext(Dispatchers.IO) {
-        try {
+    /**
+     * Import SMS newer than the last sync, storing and checkpointing chunk by chunk
+     *
+     * After every stored chunk the scan position is written to sync_state, so an
+     * import interrupted by process death resumes after the last stored chunk on the
+     * next call instead of starting over. Re-stored SMS from a partly stored chunk are
+     * caught by the usual duplicate checks.
+     *
+     * Only one import runs per process; a concurrent call waits for the running one and
+     * then scans whatever is still new.
+     */
+    suspend fun syncNewSms(onProgress: ((SmsImportProgress) -> Unit)? = null): Int = withContext(Dispatchers.IO) {
+        importLock.withLock { runImport(onProgress) }
+    }
+
+    /**
+     * Whether an import is running in this process right now. sync_state reads
+     * IN_PROGRESS (with a checkpoint) both for a live import and for one killed
+     * mid-scan; only this tells them apart.
+     */
+    fun isImportRunning(): Boolean = importLock.isLocked
+
+    private suspend fun runImport(onProgress: ((SmsImportProgress) -> Unit)?): Int {
+        return try {
             val syncState = syncStateDao.getSyncState()
             val lastSyncTimestamp = syncState?.lastSmsSyncTimestamp ?: Date(0)
-            val repository = ExpenseRepository.getInstance(context)
+            val resumeFrom = syncState?.let { importCheckpointOf(it) }
             logger.debug(
                 where = "syncNewSms",
-                what = "Starting SMS sync - Last sync timestamp: $lastSyncTimestamp"
+                what = "Starting SMS sync - Last sync timestamp: $lastSyncTimestamp" +
+                    (resumeFrom?.let { " - resuming after ${it.processed} SMS (chunk ${it.chunkIndex})" } ?: "")
             )
 
             syncStateDao.updateSyncStatus("IN_PROGRESS")
@@ -296,76 +324,84 @@ internal class TransactionDataRepository(
                 null
             }
 
-            val allTransactions = smsParsingService.scanHistoricalSMS(sinceDate = scanSinceDate) { _, _, _ -> }
-
-            val newTransactions = allTransactions.filter { it.date.after(lastSyncTimestamp) }
-
             var insertedCount = 0
             var duplicateCount = 0
+            // Newest SMS were scanned first, possibly by the interrupted run
+            var latestDate: Date? = syncState?.importNewestDate.takeIf { resumeFrom != null }
+            var latestSmsId: String? = syncState?.importNewestSmsId.takeIf { resumeFrom != null }
+
+            // Parsed and stored chunk by chunk, so memory doesn't grow with the inbox
+            smsParsingService.scanHistoricalSMSFlow(sinceDate = scanSinceDate, resumeFrom = resumeFrom).collect { chunk ->
+                chunk.transactions.forEach { parsed ->
+                    if (latestDate.let { it == null || parsed.date.after(it) }) {
+                        latestDate = parsed.date
+                        latestSmsId = parsed.id
+                    }
+                }
 
-            newTransactions.forEach { parsed ->
-                // CRITICAL FIX: Generate consistent SMS ID using same logic as real-time receiver
-                // to prevent duplicates between real-time and incremental scans
-                val tempEntity = convertToTransactionEntity(parsed)
-
-                // Regenerate SMS ID with same algorithm used in SMSReceiver.kt:74-78
-                // Use sender address (e.g., "HDFCBK") instead of "hist_" prefix for consistency
-                val senderAddress = parsed.senderAddress ?: parsed.bankName
-                val consistentSmsId = TransactionEntity.generateSmsId(
-                    address = senderAddress,
-                    body = parsed.rawSMS,
-                    timestamp = parsed.date.time,
-                    referenceNumber = parsed.referenceNumber
-                )
-
-                val entity = tempEntity.copy(smsId = consistentSmsId)
-                logger.debug("syncNewSms", "Processing entity: ${entity.rawMerchant} - Ref: ${entity.referenceNumber} - SMS ID: ${entity.smsId} (from sender: $senderAddress)")
-
-                val existing = transactionDao.getTransactionBySmsId(entity.smsId)
-
-                val similar = findSimilarTransaction(entity)
-                if (similar != null) {
-                    logger.debug("syncNewSms", "Similar found: ${similar.rawMerchant} - Ref: ${similar.referenceNumber}")
+                val candidates = chunk.transactions.filter { it.date.after(lastSyncTimestamp) }.map { parsed ->
+                    // CRITICAL FIX: Generate consistent SMS ID using same logic as real-time receiver
+                    // to prevent duplicates between real-time and incremental scans
+                    // Use sender address (e.g., "HDFCBK") instead of "hist_" prefix for consistency
+                    val senderAddress = parsed.senderAddress ?: parsed.bankName
+                    val consistentSmsId = TransactionEntity.generateSmsId(
+                        address = senderAddress,
+                        body = parsed.rawSMS,
+                        timestamp = parsed.date.time,
+                        referenceNumber = parsed.referenceNumber
+                    )
+                    val entity = toTransactionEntity(parsed).copy(smsId = consistentSmsId)
+                    logger.debug("syncNewSms", "Processing entity: ${entity.rawMerchant} - Ref: ${entity.referenceNumber} - SMS ID: ${entity.smsId} (from sender: $senderAddress)")
+                    SMSIngestionQueue.Candidate(entity, checkSimilar = true)
                 }
 
-                if (existing == null && similar == null) {
-                    // Merchant previously deleted by the user: store the transaction
-                    // inactive so it stays hidden and is never re-imported
-                    val merchantDeleted = merchantDao.isMerchantDeleted(entity.normalizedMerchant) ?: false
-                    val toInsert = if (merchantDeleted) entity.copy(isActive = false) else entity
-
-                    val insertedId = transactionDao.insertTransaction(toInsert)
-                    if (insertedId > 0 && !merchantDeleted) {
-                        repository.autoCategorizeTransaction(insertedId)
-                        insertedCount++
-                    } else if (merchantDeleted) {
-                        logger.debug("syncNewSms", "Auto-hidden transaction from deleted merchant '${entity.normalizedMerchant}'")
-                    }
-                } else {
-                    duplicateCount++
-                    val refInfo = if (!entity.referenceNumber.isNullOrBlank()) " [Ref: ${entity.referenceNumber}]" else ""
-                    val reason = when {
-                        existing != null -> "SMS ID match (${entity.smsId})"
-                        similar != null -> {
-                            val similarRefInfo = if (!similar.referenceNumber.isNullOrBlank()) " [Ref: ${similar.referenceNumber}]" else ""
-                            "Similar transaction found (${similar.rawMerchant} - ₹${similar.amount}$similarRefInfo)"
+                // Dedup, insert and categorization happen in the queue's batched transactions;
+                // this suspends while the queue is full
+                ingestionQueue.submitAll(candidates).forEachIndexed { index, outcome ->
+                    val entity = candidates[index].entity
+                    when (outcome) {
+                        is SMSIngestionQueue.Outcome.Inserted -> insertedCount++
+                        is SMSIngestionQueue.Outcome.Hidden ->
+                            logger.debug("syncNewSms", "Auto-hidden transaction from deleted merchant '${entity.normalizedMerchant}'")
+                        is SMSIngestionQueue.Outcome.Duplicate -> {
+                            duplicateCount++
+                            val refInfo = if (!entity.referenceNumber.isNullOrBlank()) " [Ref: ${entity.referenceNumber}]" else ""
+                            logger.debug("syncNewSms", "⚠️ Duplicate: ${entity.rawMerchant} - ₹${entity.amount}$refInfo - Reason: ${outcome.reason} and smsId is ${entity.smsId}")
                         }
-                        else -> "Unknown"
+                        is SMSIngestionQueue.Outcome.Failed ->
+                            logger.warn("syncNewSms", "Failed to store ${entity.smsId}: ${outcome.error.message}")
                     }
-                    logger.debug("syncNewSms", "⚠️ Duplicate: ${entity.rawMerchant} - ₹${entity.amount}$refInfo - Reason: $reason and smsId is ${entity.smsId}")
                 }
+
+                // The chunk is stored; a restart from here skips it
+                val position = chunk.position
+                syncStateDao.updateImportCheckpoint(
+                    since = Date(position.sinceMillis),
+                    pass = position.pass,
+                    passLayout = position.passLayout,
+                    checkpointDate = Date(position.date),
+                    checkpointSmsId = position.smsId,
+                    chunkIndex = position.chunkIndex,
+                    processed = position.processed,
+                    newestDate = latestDate,
+                    newestSmsId = latestSmsId
+                )
+                onProgress?.invoke(SmsImportProgress(chunk.processed, chunk.total, chunk.resumedFrom, insertedCount))
             }
 
-            val latestTransaction = allTransactions.maxByOrNull { it.date }
-            if (latestTransaction != null) {
+            val latest = latestDate
+            if (latest != null) {
                 val totalTransactions = transactionDao.getTransactionCount()
                 syncStateDao.updateSyncState(
-                    timestamp = latestTransaction.date,
-                    smsId = latestTransaction.id,
+                    timestamp = latest,
+                    smsId = latestSmsId,
                     totalTransactions = totalTransactions,
                     status = "COMPLETED"
                 )
+            } else {
+                syncStateDao.updateSyncStatus("COMPLETED")
             }
+            syncStateDao.clearImportCheckpoint()
 
             logger.debug(
                 where = "syncNewSms",
@@ -391,8 +427,16 @@ internal class TransactionDataRepository(
 
     suspend fun updateSyncState(lastSyncDate: Date) {
         syncStateDao.updateSyncState(lastSyncDate, null, transactionDao.getTransactionCount(), "COMPLETED")
+        // A new baseline (e.g. a forced full sync) makes any interrupted import obsolete
+        syncStateDao.clearImportCheckpoint()
     }
 
+    /**
+     * SMS already scanned by an interrupted import, or null when there is nothing to resume
+     */
+    suspend fun pendingImportOffset(): Int? =
+        syncStateDao.getSyncState()?.let { importCheckpointOf(it)?.processed }
+
     suspend fun ensureSyncStateInitialized() {
         val syncState = syncStateDao.getSyncState()
         if (syncState == null) {
@@ -412,15 +456,34 @@ internal class TransactionDataRepository(
     // Helpers
     // ---------------------------------------------------------------------
 
+    private fun importCheckpointOf(state: SyncStateEntity): SMSParsingService.ScanPosition? {
+        val since = state.importSince ?: return null
+        val date = state.importCheckpointDate ?: return null
+        val smsId = state.importCheckpointSmsId ?: return null
+        return SMSParsingService.ScanPosition(
+            sinceMillis = since.time,
+            pass = state.importPass,
+            passLayout = state.importPassLayout,
+            date = date.time,
+            smsId = smsId,
+            chunkIndex = state.importChunkIndex,
+            processed = state.importProcessed
+        )
+    }
+
     suspend fun convertToTransactionEntity(parsed: ParsedTransaction): TransactionEntity {
-        val normalizedMerchant = normalizeMerchantName(parsed.merchant)
-        ensureMerchantExists(normalizedMerchant, parsed.merchant)
+        val entity = toTransactionEntity(parsed)
+        ensureMerchantExists(entity.normalizedMerchant, parsed.merchant)
+        return entity
+    }
 
-        return TransactionEntity(
+    // No database access; the ingestion batch creates the merchant when categorizing
+    private fun toTransactionEntity(parsed: ParsedTransaction): TransactionEntity =
+        TransactionEntity(
             smsId = parsed.id,
             amount = parsed.amount,
             rawMerchant = parsed.merchant,
-            normalizedMerchant = normalizedMerchant,
+            normalizedMerchant = normalizeMerchantName(parsed.merchant),
             bankName = parsed.bankName,
             transactionDate = parsed.date,
             rawSmsBody = parsed.rawSMS,
@@ -430,17 +493,13 @@ internal class TransactionDataRepository(
             createdAt = Date(),
             updatedAt = Date()
         )
-    }
 
     suspend fun findSimilarTransaction(entity: TransactionEntity): TransactionEntity? {
-        val amountTolerance = 1.0 // ₹1 cushion to account for rounding differences
-        val timeWindowMillis = TimeUnit.MINUTES.toMillis(10)
+        val minAmount = (entity.amount - SIMILAR_AMOUNT_TOLERANCE).coerceAtLeast(0.0)
+        val maxAmount = entity.amount + SIMILAR_AMOUNT_TOLERANCE
 
-        val minAmount = (entity.amount - amountTolerance).coerceAtLeast(0.0)
-        val maxAmount = entity.amount + amountTolerance
-
-        val startDate = Date(entity.transactionDate.time - timeWindowMillis)
-        val endDate = Date(entity.transactionDate.time + timeWindowMillis)
+        val startDate = Date(entity.transactionDate.time - SIMILAR_TIME_WINDOW_MILLIS)
+        val endDate = Date(entity.transactionDate.time + SIMILAR_TIME_WINDOW_MILLIS)
 
         val similarTransaction = transactionDao.findSimilarTransaction(
             normalizedMerchant = entity.normalizedMerchant,
@@ -451,29 +510,23 @@ internal class TransactionDataRepository(
             bankName = entity.bankName
         )
 
-        // Additional check: If both transactions have reference numbers and they are DIFFERENT,
-        // then they are NOT duplicates (even if merchant, amount, time, and bank match).
-        // EXCEPTION: synthetic card pseudo-refs are not authoritative - two different
-        // synthetic refs can describe the same swipe, so the similarity verdict stands.
-        if (similarTransaction != null) {
-            val newRefNumber = entity.referenceNumber?.trim()
-            val existingRefNumber = similarTransaction.referenceNumber?.trim()
-
-            if (!newRefNumber.isNullOrBlank() && !existingRefNumber.isNullOrBlank()) {
-                val eitherSynthetic = TransactionEntity.isSyntheticReference(newRefNumber) ||
-                    TransactionEntity.isSyntheticReference(existingRefNumber)
-
-                if (!eitherSynthetic && newRefNumber != existingRefNumber) {
-                    logger.debug("findSimilarTransaction",
-                        "Different reference numbers - NOT a duplicate (New: $newRefNumber vs Existing: $existingRefNumber)")
-                    return null
-                }
-            }
+        val confirmed = confirmSimilar(entity, similarTransaction)
+        if (similarTransaction != null && confirmed == null) {
+            logger.debug("findSimilarTransaction",
+                "Different reference numbers - NOT a duplicate (New: ${entity.referenceNumber?.trim()} vs Existing: ${similarTransaction.referenceNumber?.trim()})")
         }
-
-        return similarTransaction
+        return confirmed
     }
 
+    /**
+     * Load everything the duplicate checks of one ingestion batch need, with one query
+     * per check instead of one per row. Similarity rows are only loaded for [similarFor].
+     */
+    suspend fun loadDedupIndex(
+        entities: List<TransactionEntity>,
+        similarFor: List<TransactionEntity>
+    ): IngestDedupIndex = IngestDedupIndex.load(transactionDao, merchantDao, entities, similarFor)
+
     private suspend fun ensureMerchantExists(normalizedName: String, displayName: String) {
         val existing = merchantDao.getMerchantByNormalizedName(normalizedName)
         if (existing != null) return
@@ -527,17 +580,7 @@ internal class TransactionDataRepository(
     }
 
     fun normalizeMerchantName(merchant: String): String {
-        val cleaned = merchant.uppercase()
-            .replace(Regex("\\s+"), " ")
-            .trim()
-
-        return cleaned
-            .replace(Regex("\\*(ORDER|PAYMENT|TXN|TRANSACTION).*$"), "")
-            .replace(Regex("#\\d+.*$"), "")
-            .replace(Regex("@\\w+.*$"), "")
-            .replace(Regex("-{2,}.*$"), "")
-            .replace(Regex("_{2,}.*$"), "")
-            .trim()
+        return MerchantNormalizer.transactionKey(merchant)
     }
 
     private suspend fun merchantWithCategory(normalizedName: String) =
@@ -617,4 +660,34 @@ internal class TransactionDataRepository(
             !excluded.contains(normalized) && !sharedPrefs.contains(normalized)
         }
     }
+
+    companion object {
+        // Similarity window: ₹1 cushion for rounding differences, ±10 minutes
+        const val SIMILAR_AMOUNT_TOLERANCE = 1.0
+        val SIMILAR_TIME_WINDOW_MILLIS = TimeUnit.MINUTES.toMillis(10)
+
+        // Held for the whole of an import; process-wide because the Hilt-injected and
+        // getInstance() repositories each own a TransactionDataRepository
+        private val importLock = Mutex()
+
+        /**
+         * The similarity verdict for a window match: if both transactions have reference
+         * numbers and they are DIFFERENT, they are NOT duplicates (even if merchant, amount,
+         * time and bank match). EXCEPTION: synthetic card pseudo-refs are not
+         * authoritative - two different synthetic refs can describe the same swipe,
+         * so the similarity verdict stands.
+         */
+        fun confirmSimilar(entity: TransactionEntity, similar: TransactionEntity?): TransactionEntity? {
+            if (similar == null) return null
+            val newRefNumber = entity.referenceNumber?.trim()
+            val existingRefNumber = similar.referenceNumber?.trim()
+
+            if (!newRefNumber.isNullOrBlank() && !existingRefNumber.isNullOrBlank()) {
+                val eitherSynthetic = TransactionEntity.isSyntheticReference(newRefNumber) ||
+                    TransactionEntity.isSyntheticReference(existingRefNumber)
+                if (!eitherSynthetic && newRefNumber != existingRefNumber) return null
+            }
+            return similar
+        }
+    }
 }
@@ -109,6 +109,23 @@ interface TransactionRepositoryInterface {
      * Sync new SMS transactions
      */
     suspend fun syncNewSMS(): Int
+
+    /**
+     * Sync new SMS transactions, reporting progress after every stored chunk.
+     * Resumes an interrupted import where it stopped.
+     */
+    suspend fun syncNewSMS(onProgress: (SmsImportProgress) -> Unit): Int
+
+    /**
+     * SMS already scanned by an interrupted import, or null when there is nothing to resume
+     */
+    suspend fun getPendingImportOffset(): Int?
+
+    /**
+     * Whether an SMS import is running in this process. A checkpoint without a running
+     * import belongs to an interrupted one.
+     */
+    fun isImportRunning(): Boolean
     
     /**
      * Get last sync timestamp
@@ -124,4 +141,19 @@ interface TransactionRepositoryInterface {
      * Update sync state
      */
     suspend fun updateSyncState(lastSyncDate: Date)
-}
\ No newline at end of file
+}
+
+/**
+ * Progress of an SMS import after a stored chunk
+ *
+ * @property processed SMS scanned so far, including [resumedFrom]
+ * @property total SMS the import covers in all, including [resumedFrom]
+ * @property resumedFrom SMS scanned by an earlier, interrupted run (0 for a fresh import)
+ * @property inserted Transactions stored by this run so far
+ */
+data class SmsImportProgress(
+    val processed: Int,
+    val total: Int,
+    val resumedFrom: Int,
+    val inserted: Int
+)
@@ -16,6 +16,7 @@ class SyncSMSTransactionsUseCase @Inject constructor(
     
     /**
      * Sync new SMS transactions
+     * An import interrupted earlier (e.g. by process death) resumes from its checkpoint
      */
     suspend fun execute(): Result<SMSSyncResult> {
         return try {
@@ -23,8 +24,10 @@ class SyncSMSTransactionsUseCase @Inject constructor(
             
             val startTime = System.currentTimeMillis()
             val lastSyncTimestamp = repository.getLastSyncTimestamp()
+            val resumedFrom = repository.getPendingImportOffset()
 
-            logger.debug("execute","Last sync timestamp: $lastSyncTimestamp")
+            logger.debug("execute","Last sync timestamp: $lastSyncTimestamp" +
+                (resumedFrom?.let { " - resuming import after $it SMS" } ?: ""))
             
             // Perform the sync
             val newTransactionsCount = repository.syncNewSMS()
@@ -38,7 +41,8 @@ class SyncSMSTransactionsUseCase @Inject constructor(
                 lastSyncTimestamp = lastSyncTimestamp,
                 syncDurationMs = syncDuration,
                 success = true,
-                errorMessage = null
+                errorMessage = null,
+                resumedFrom = resumedFrom ?: 0
             )
 
             logger.debug("execute","SMS sync completed successfully: $newTransactionsCount new transactions in ${syncDuration}ms")
@@ -77,17 +81,30 @@ class SyncSMSTransactionsUseCase @Inject constructor(
             
             progressCallback?.invoke(SyncProgress(SyncPhase.READING_SMS, 25, "Reading SMS messages..."))
             
-            // Get current sync status
-            val currentStatus = repository.getSyncStatus()
-            if (currentStatus == "IN_PROGRESS") {
+            // sync_state reads IN_PROGRESS for a live import and for one interrupted by
+            // process death alike; only an import running in this process is refused,
+            // an interrupted one resumes from its checkpoint
+            if (repository.isImportRunning()) {
                 logger.debug("executeWithProgress","Sync already in progress")
                 return Result.failure(Exception("SMS sync already in progress"))
             }
+            val resumedFrom = repository.getPendingImportOffset()
+
+            val parsingMessage = resumedFrom?.let { "Resuming import after $it messages..." } ?: "Parsing transactions..."
+            progressCallback?.invoke(SyncProgress(SyncPhase.PARSING_TRANSACTIONS, 25, parsingMessage, resumedFrom ?: 0))
             
-            progressCallback?.invoke(SyncProgress(SyncPhase.PARSING_TRANSACTIONS, 50, "Parsing transactions..."))
-            
-            // Perform the sync
-            val newTransactionsCount = repository.syncNewSMS()
+            // Perform the sync; parsing and storing move the bar from 25% to 75%
+            val newTransactionsCount = repository.syncNewSMS { progress ->
+                val percentage = if (progress.total > 0) 25 + 50 * progress.processed / progress.total else 75
+                progressCallback?.invoke(
+                    SyncProgress(
+                        SyncPhase.PARSING_TRANSACTIONS,
+                        percentage,
+                        "Processed ${progress.processed}/${progress.total} messages • Stored ${progress.inserted} transactions",
+                        progress.resumedFrom
+                    )
+                )
+            }
             
             progressCallback?.invoke(SyncProgress(SyncPhase.UPDATING_DATABASE, 75, "Updating database..."))
             
@@ -102,7 +119,8 @@ class SyncSMSTransactionsUseCase @Inject constructor(
                 lastSyncTimestamp = lastSyncTimestamp,
                 syncDurationMs = syncDuration,
                 success = true,
-                errorMessage = null
+                errorMessage = null,
+                resumedFrom = resumedFrom ?: 0
             )
             
             logger.debug("executeWithProgress", "SMS sync with progress completed: $newTransactionsCount new transactions")
@@ -246,7 +264,7 @@ class SyncSMSTransactionsUseCase @Inject constructor(
                 currentStatus = status,
                 lastSyncTimestamp = lastSyncTimestamp,
                 totalTransactions = totalTransactions,
-                isInProgress = status == "IN_PROGRESS"
+                isInProgress = repository.isImportRunning()
             )
 
             logger.debug("getSyncStatus", "Current sync status: $status, Total transactions: $totalTransactions")
@@ -328,7 +346,8 @@ data class SMSSyncResult(
     val errorMessage: String?,
     val isFullSync: Boolean = false,
     val isCleanRescan: Boolean = false,
-    val deletedCount: Int = 0
+    val deletedCount: Int = 0,
+    val resumedFrom: Int = 0 // SMS already scanned by an interrupted import this sync resumed
 )
 
 /**
@@ -337,7 +356,8 @@ data class SMSSyncResult(
 data class SyncProgress(
     val phase: SyncPhase,
     val percentage: Int, // -1 for error
-    val message: String
+    val message: String,
+    val resumedFrom: Int = 0 // SMS scanned by an interrupted import before this run
 )
 
 /**
@@ -3,6 +3,7 @@ package com.smartexpenseai.app.domain.usecase.transaction
 import timber.log.Timber
 import com.smartexpenseai.app.data.entities.TransactionEntity
 import com.smartexpenseai.app.domain.repository.TransactionRepositoryInterface
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import java.util.Date
 import javax.inject.Inject
 
@@ -162,9 +163,6 @@ class UpdateTransactionUseCase @Inject constructor(
      * Helper method to normalize merchant names consistently
      */
     private fun normalizeMerchantName(merchant: String): String {
-        return merchant.lowercase()
-            .replace(Regex("[^a-zA-Z0-9\\s]"), "")
-            .replace(Regex("\\s+"), " ")
-            .trim()
+        return MerchantNormalizer.alnumKey(merchant)
     }
 }
\ No newline at end of file
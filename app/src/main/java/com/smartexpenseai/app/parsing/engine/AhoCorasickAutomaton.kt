@@ -0,0 +1,75 @@
+package com.smartexpenseai.app.parsing.engine
+
+/**
+ * Aho-Corasick automaton over a fixed keyword list
+ *
+ * Feed it one character at a time with [step]; [matches] lists the indices of
+ * every keyword that ends at the current state. Matching is case-sensitive -
+ * callers fold case on both the keywords and the input.
+ */
+internal class AhoCorasickAutomaton(keywords: List<String>) {
+
+    private val goto = ArrayList<HashMap<Char, Int>>()
+    private val fail = ArrayList<Int>()
+    private val outputs = ArrayList<IntArray>()
+
+    val stateCount: Int
+        get() = goto.size
+
+    init {
+        val ownOutputs = ArrayList<MutableList<Int>>()
+        fun newState(): Int {
+            goto.add(HashMap(4))
+            fail.add(0)
+            ownOutputs.add(mutableListOf())
+            return goto.size - 1
+        }
+
+        newState()
+        keywords.forEachIndexed { keywordIndex, keyword ->
+            if (keyword.isEmpty()) return@forEachIndexed
+            var state = 0
+            for (c in keyword) {
+                state = goto[state][c] ?: newState().also { goto[state][c] = it }
+            }
+            ownOutputs[state].add(keywordIndex)
+        }
+
+        // Breadth-first failure links; outputs are merged along them so a single
+        // lookup per character reports every keyword ending there
+        val merged = arrayOfNulls<IntArray>(goto.size)
+        merged[0] = ownOutputs[0].toIntArray()
+        val queue = ArrayDeque<Int>()
+        goto[0].values.forEach { child ->
+            merged[child] = ownOutputs[child].toIntArray()
+            queue.add(child)
+        }
+        while (queue.isNotEmpty()) {
+            val state = queue.removeFirst()
+            for ((c, next) in goto[state]) {
+                var f = fail[state]
+                while (f != 0 && goto[f][c] == null) f = fail[f]
+                val target = goto[f][c]
+                fail[next] = if (target != null && target != next) target else 0
+                merged[next] = ownOutputs[next].toIntArray() + merged[fail[next]]!!
+                queue.add(next)
+            }
+        }
+        merged.forEach { outputs.add(it ?: EMPTY) }
+    }
+
+    fun step(state: Int, c: Char): Int {
+        var s = state
+        while (true) {
+            goto[s][c]?.let { return it }
+            if (s == 0) return 0
+            s = fail[s]
+        }
+    }
+
+    fun matches(state: Int): IntArray = outputs[state]
+
+    companion object {
+        private val EMPTY = IntArray(0)
+    }
+}
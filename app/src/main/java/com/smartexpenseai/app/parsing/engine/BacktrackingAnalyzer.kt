@@ -0,0 +1,397 @@
+package com.smartexpenseai.app.parsing.engine
+
+/**
+ * Static check of rule regexes for backtracking blow-up in java.util.regex
+ *
+ * Parses a pattern into a small syntax tree (characters are tracked as ASCII sets,
+ * folded for IGNORE_CASE, with all non-ASCII lumped together) and looks for the
+ * shapes that make a backtracking matcher retry the same text many times:
+ * - [Risk.EXPONENTIAL]: an unbounded repeat whose body can end in another unbounded
+ *   repeat that also matches the body's first character (`(a+)+`, `(\w+\s?)*`), or
+ *   that repeats an alternation whose branches can start with the same character
+ *   (`(a|ab)*`)
+ * - [Risk.POLYNOMIAL]: two unbounded repeats that can be adjacent and match a common
+ *   character (`\s*[:\-]?\s*`), so a failing match tries every split between them
+ *
+ * The check is conservative in the usual direction: it can flag a pattern that is
+ * fine in practice, but the shapes above are the ones that blow up. Possessive
+ * repeats never backtrack and are ignored. Syntax it doesn't model (back references,
+ * Unicode properties) is treated as matching anything.
+ */
+object BacktrackingAnalyzer {
+
+    enum class Risk { EXPONENTIAL, POLYNOMIAL }
+
+    data class Finding(val risk: Risk, val reason: String)
+
+    /**
+     * Backtracking risks in [pattern] (compiled with IGNORE_CASE); empty when none
+     */
+    fun analyze(pattern: String): List<Finding> {
+        val tree = try {
+            Parser(pattern).parse()
+        } catch (e: RuntimeException) {
+            // Malformed patterns are reported by the regex compiler, not here
+            return emptyList()
+        }
+        val findings = ArrayList<Finding>()
+        walk(tree, findings)
+        return findings
+    }
+
+    // --- Character sets -------------------------------------------------------
+
+    private class CharSet(val low: Long, val high: Long, val nonAscii: Boolean) {
+        fun union(other: CharSet) = CharSet(low or other.low, high or other.high, nonAscii || other.nonAscii)
+        fun complement() = CharSet(low.inv(), high.inv(), !nonAscii)
+        fun overlaps(other: CharSet) =
+            (low and other.low) != 0L || (high and other.high) != 0L || (nonAscii && other.nonAscii)
+    }
+
+    private val NONE = CharSet(0, 0, false)
+    private val DIGIT = range('0', '9')
+    private val SPACE = listOf(' ', '\t', '\n', '\u000B', '\u000C', '\r').fold(NONE) { set, c -> set.union(single(c)) }
+    private val WORD = range('a', 'z').union(DIGIT).union(single('_'))
+    private val ANYTHING = NONE.complement()
+    private val DOT = CharSet(ANYTHING.low and ((1L shl '\n'.code) or (1L shl '\r'.code)).inv(), ANYTHING.high, true)
+
+    // IGNORE_CASE folds ASCII letters only
+    private fun single(c: Char): CharSet {
+        val code = c.code
+        return when {
+            code >= 128 -> CharSet(0, 0, true)
+            c in 'a'..'z' || c in 'A'..'Z' -> bit(c.lowercaseChar().code).union(bit(c.uppercaseChar().code))
+            else -> bit(code)
+        }
+    }
+
+    private fun bit(code: Int) =
+        if (code < 64) CharSet(1L shl code, 0, false) else CharSet(0, 1L shl (code - 64), false)
+
+    private fun range(from: Char, to: Char): CharSet {
+        var set = NONE
+        for (c in from..to) set = set.union(single(c))
+        return set
+    }
+
+    // --- Syntax tree ----------------------------------------------------------
+
+    private sealed class Node
+    private class Chars(val set: CharSet) : Node()
+    private class Sequence(val items: List<Node>) : Node()
+    private class Alternation(val branches: List<Node>) : Node()
+    private class Repeat(val body: Node, val min: Int, val unbounded: Boolean, val possessive: Boolean) : Node()
+    private class Lookaround(val body: Node) : Node()
+    private object ZeroWidth : Node()
+
+    private class Parser(private val pattern: String) {
+        private var pos = 0
+
+        fun parse(): Node = alternation()
+
+        private fun peek(offset: Int = 0): Char? = pattern.getOrNull(pos + offset)
+
+        private fun alternation(): Node {
+            val branches = mutableListOf(sequence())
+            while (peek() == '|') {
+                pos++
+                branches.add(sequence())
+            }
+            return branches.singleOrNull() ?: Alternation(branches)
+        }
+
+        private fun sequence(): Node {
+            val items = ArrayList<Node>()
+            while (pos < pattern.length && peek() != '|' && peek() != ')') {
+                items.add(quantified(atom()))
+            }
+            return Sequence(items)
+        }
+
+        private fun quantified(atom: Node): Node {
+            var node = atom
+            while (true) {
+                var min: Int
+                var unbounded: Boolean
+                when (peek()) {
+                    '*' -> { min = 0; unbounded = true; pos++ }
+                    '+' -> { min = 1; unbounded = true; pos++ }
+                    '?' -> { min = 0; unbounded = false; pos++ }
+                    '{' -> {
+                        val close = pattern.indexOf('}', pos)
+                        val bounds = if (close > 0) pattern.substring(pos + 1, close).split(',') else return node
+                        val lower = bounds[0].toIntOrNull() ?: return node
+                        if (bounds.size > 2 || (bounds.size == 2 && bounds[1].isNotEmpty() && bounds[1].toIntOrNull() == null)) {
+                            return node
+                        }
+                        min = lower
+                        unbounded = bounds.size == 2 && bounds[1].isEmpty()
+                        pos = close + 1
+                    }
+                    else -> return node
+                }
+                var possessive = false
+                when (peek()) {
+                    '?' -> pos++
+                    '+' -> { pos++; possessive = true }
+                }
+                node = Repeat(node, min, unbounded, possessive)
+            }
+        }
+
+        private fun atom(): Node {
+            return when (val c = pattern[pos++]) {
+                '(' -> group()
+                '[' -> Chars(charClass())
+                '.' -> Chars(DOT)
+                '^', '$' -> ZeroWidth
+                '\\' -> escape()
+                else -> Chars(single(c))
+            }
+        }
+
+        private fun group(): Node {
+            var lookaround = false
+            if (peek() == '?') {
+                pos++
+                when {
+                    peek() == ':' || peek() == '>' -> pos++
+                    peek() == '=' || peek() == '!' -> { pos++; lookaround = true }
+                    peek() == '<' && (peek(1) == '=' || peek(1) == '!') -> { pos += 2; lookaround = true }
+                    peek() == '<' -> pos = pattern.indexOf('>', pos) + 1
+                    else -> {
+                        // Inline flags: "(?i)" or "(?i:...)"
+                        while (peek() != null && peek() != ':' && peek() != ')') pos++
+                        if (peek() == ')') {
+                            pos++
+                            return ZeroWidth
+                        }
+                        pos++
+                    }
+                }
+            }
+            val body = alternation()
+            if (peek() == ')') pos++
+            return if (lookaround) Lookaround(body) else body
+        }
+
+        private fun escape(): Node {
+            val c = pattern[pos]
+            when (c) {
+                'b', 'B', 'A', 'z', 'Z', 'G' -> {
+                    pos++
+                    return ZeroWidth
+                }
+                'Q' -> {
+                    val end = pattern.indexOf("\\E", pos).let { if (it < 0) pattern.length else it }
+                    val literal = pattern.substring(pos + 1, end)
+                    pos = minOf(pattern.length, end + 2)
+                    return Sequence(literal.map { Chars(single(it)) })
+                }
+            }
+            if (c in '1'..'9') {
+                // Back reference: could be anything
+                pos++
+                while (peek()?.isDigit() == true) pos++
+                return Chars(ANYTHING)
+            }
+            return Chars(escapedSet())
+        }
+
+        // Escape after a backslash that stands for characters (inside or outside a class)
+        private fun escapedSet(): CharSet {
+            return when (val c = pattern[pos]) {
+                'd' -> { pos++; DIGIT }
+                's' -> { pos++; SPACE }
+                'w' -> { pos++; WORD }
+                'D' -> { pos++; DIGIT.complement() }
+                'S' -> { pos++; SPACE.complement() }
+                'W' -> { pos++; WORD.complement() }
+                'p', 'P' -> {
+                    pos++
+                    if (peek() == '{') pos = pattern.indexOf('}', pos) + 1 else pos++
+                    ANYTHING
+                }
+                else -> single(escapedChar(c))
+            }
+        }
+
+        private fun escapedChar(c: Char): Char {
+            pos++
+            return when (c) {
+                't' -> '\t'
+                'n' -> '\n'
+                'r' -> '\r'
+                'f' -> '\u000C'
+                'a' -> '\u0007'
+                'e' -> '\u001B'
+                'u' -> pattern.substring(pos, pos + 4).toInt(16).toChar().also { pos += 4 }
+                'x' -> if (peek() == '{') {
+                    val close = pattern.indexOf('}', pos)
+                    pattern.substring(pos + 1, close).toInt(16).toChar().also { pos = close + 1 }
+                } else {
+                    pattern.substring(pos, pos + 2).toInt(16).toChar().also { pos += 2 }
+                }
+                '0' -> {
+                    val start = pos
+                    while (pos < start + 3 && peek() in '0'..'7') pos++
+                    (if (pos > start) pattern.substring(start, pos).toInt(8) else 0).toChar()
+                }
+                'c' -> (pattern[pos++].code xor 64).toChar()
+                else -> c
+            }
+        }
+
+        private fun charClass(): CharSet {
+            val negated = peek() == '^'
+            if (negated) pos++
+            var set = NONE
+            var first = true
+            while (pos < pattern.length) {
+                val c = pattern[pos]
+                if (c == ']' && !first) {
+                    pos++
+                    break
+                }
+                first = false
+                when {
+                    c == '[' -> {
+                        pos++
+                        set = set.union(charClass())
+                    }
+                    // Intersections are approximated by the union
+                    c == '&' && peek(1) == '&' -> pos += 2
+                    c == '\\' && peek(1)?.let { it in CLASS_ESCAPES } == true -> {
+                        pos++
+                        set = set.union(escapedSet())
+                    }
+                    c == '\\' -> {
+                        pos++
+                        set = set.union(rangeFrom(escapedChar(pattern[pos])))
+                    }
+                    else -> {
+                        pos++
+                        set = set.union(rangeFrom(c))
+                    }
+                }
+            }
+            return if (negated) set.complement() else set
+        }
+
+        // `lo` alone, or the range `lo-hi` when one follows
+        private fun rangeFrom(lo: Char): CharSet {
+            val next = peek(1)
+            if (peek() != '-' || next == null || next == ']' || next == '[') return single(lo)
+            pos++
+            val hi = if (pattern[pos] == '\\') {
+                pos++
+                escapedChar(pattern[pos])
+            } else {
+                pattern[pos++]
+            }
+            return if (lo <= hi) range(lo, hi) else NONE
+        }
+    }
+
+    private val CLASS_ESCAPES = setOf('d', 's', 'w', 'D', 'S', 'W', 'p', 'P')
+
+    // --- Analysis -------------------------------------------------------------
+
+    private fun walk(node: Node, findings: MutableList<Finding>) {
+        when (node) {
+            is Repeat -> {
+                if (isBacktrackingLoop(node)) checkLoop(node, findings)
+                walk(node.body, findings)
+            }
+            is Sequence -> {
+                checkAdjacent(node.items, findings)
+                node.items.forEach { walk(it, findings) }
+            }
+            is Alternation -> node.branches.forEach { walk(it, findings) }
+            is Lookaround -> walk(node.body, findings)
+            is Chars, ZeroWidth -> Unit
+        }
+    }
+
+    private fun checkLoop(loop: Repeat, findings: MutableList<Finding>) {
+        val body = loop.body
+        val start = firstChars(body)
+        if (edgeLoops(body, fromEnd = true).any { allChars(it.body).overlaps(start) }) {
+            findings.add(Finding(Risk.EXPONENTIAL, "nested quantifier: an inner repeat can also match the start of the next iteration"))
+        }
+
+        val unwrapped = (body as? Sequence)?.items?.singleOrNull() ?: body
+        if (unwrapped is Alternation) {
+            val starts = unwrapped.branches.map { firstChars(it) }
+            val overlapping = starts.indices.any { i -> (i + 1 until starts.size).any { j -> starts[i].overlaps(starts[j]) } }
+            if (overlapping) {
+                findings.add(Finding(Risk.EXPONENTIAL, "repeated alternation with branches that start alike"))
+            }
+        }
+    }
+
+    private fun checkAdjacent(items: List<Node>, findings: MutableList<Finding>) {
+        for (i in items.indices) {
+            val tails = edgeLoops(items[i], fromEnd = true)
+            if (tails.isEmpty()) continue
+            for (j in i + 1 until items.size) {
+                val heads = edgeLoops(items[j], fromEnd = false)
+                if (tails.any { tail -> heads.any { head -> allChars(tail.body).overlaps(allChars(head.body)) } }) {
+                    findings.add(Finding(Risk.POLYNOMIAL, "adjacent unbounded repeats can match the same characters"))
+                    break
+                }
+                if (!isNullable(items[j])) break
+            }
+        }
+    }
+
+    private fun isBacktrackingLoop(node: Node) = node is Repeat && node.unbounded && !node.possessive
+
+    private fun isNullable(node: Node): Boolean = when (node) {
+        is Chars -> false
+        is Sequence -> node.items.all { isNullable(it) }
+        is Alternation -> node.branches.any { isNullable(it) }
+        is Repeat -> node.min == 0 || isNullable(node.body)
+        is Lookaround, ZeroWidth -> true
+    }
+
+    // Characters that can be the first one consumed
+    private fun firstChars(node: Node): CharSet = when (node) {
+        is Chars -> node.set
+        is Sequence -> {
+            var set = NONE
+            for (item in node.items) {
+                set = set.union(firstChars(item))
+                if (!isNullable(item)) break
+            }
+            set
+        }
+        is Alternation -> node.branches.fold(NONE) { set, branch -> set.union(firstChars(branch)) }
+        is Repeat -> firstChars(node.body)
+        is Lookaround, ZeroWidth -> NONE
+    }
+
+    private fun allChars(node: Node): CharSet = when (node) {
+        is Chars -> node.set
+        is Sequence -> node.items.fold(NONE) { set, item -> set.union(allChars(item)) }
+        is Alternation -> node.branches.fold(NONE) { set, branch -> set.union(allChars(branch)) }
+        is Repeat -> allChars(node.body)
+        is Lookaround, ZeroWidth -> NONE
+    }
+
+    // Backtracking loops that can consume the first (or, fromEnd, the last) character
+    private fun edgeLoops(node: Node, fromEnd: Boolean): List<Repeat> = when {
+        isBacktrackingLoop(node) -> listOf(node as Repeat)
+        node is Sequence -> {
+            val loops = ArrayList<Repeat>()
+            for (item in if (fromEnd) node.items.asReversed() else node.items) {
+                loops.addAll(edgeLoops(item, fromEnd))
+                if (!isNullable(item)) break
+            }
+            loops
+        }
+        node is Alternation -> node.branches.flatMap { edgeLoops(it, fromEnd) }
+        node is Repeat -> edgeLoops(node.body, fromEnd)
+        else -> emptyList()
+    }
+}
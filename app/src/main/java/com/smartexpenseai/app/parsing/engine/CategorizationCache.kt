@@ -0,0 +1,70 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.smartexpenseai.app.parsing.models.CategorizationResult
+import java.util.concurrent.atomic.AtomicLong
+import java.util.concurrent.atomic.AtomicReference
+
+/**
+ * Bounded LRU of [MerchantRuleEngine.categorize] results keyed by normalized merchant name
+ *
+ * The same few hundred merchants (SWIGGY, AMAZON, UPI VPAs) are categorized over
+ * and over by the repositories, CategoryManager and MerchantAliasManager.
+ *
+ * Entries live in a generation. [invalidate] swaps in an empty one atomically, so
+ * a lookup that started before a reload can only write into the discarded
+ * generation and never leaves a result from the old rules behind.
+ */
+class CategorizationCache(private val maxEntries: Int = DEFAULT_MAX_ENTRIES) {
+
+    /**
+     * One rules generation. Callers read it once per categorization and use it for
+     * both the lookup and the store.
+     */
+    inner class Generation internal constructor() {
+        private val entries = object : LinkedHashMap<String, CategorizationResult>(64, 0.75f, true) {
+            override fun removeEldestEntry(eldest: MutableMap.MutableEntry<String, CategorizationResult>?): Boolean =
+                size > maxEntries
+        }
+
+        fun get(normalizedMerchant: String): CategorizationResult? {
+            val cached = synchronized(entries) { entries[normalizedMerchant] }
+            if (cached != null) hits.incrementAndGet() else misses.incrementAndGet()
+            return cached
+        }
+
+        fun put(normalizedMerchant: String, result: CategorizationResult) {
+            synchronized(entries) { entries[normalizedMerchant] = result }
+        }
+
+        val size: Int get() = synchronized(entries) { entries.size }
+    }
+
+    private val hits = AtomicLong()
+    private val misses = AtomicLong()
+    private val current = AtomicReference(Generation())
+
+    val hitCount: Long get() = hits.get()
+    val missCount: Long get() = misses.get()
+    val size: Int get() = current.get().size
+
+    val hitRatio: Double
+        get() {
+            val total = hits.get() + misses.get()
+            return if (total == 0L) 0.0 else hits.get().toDouble() / total
+        }
+
+    fun generation(): Generation = current.get()
+
+    /**
+     * Drop every cached result, e.g. after the rules were reloaded
+     */
+    fun invalidate() {
+        current.set(Generation())
+        hits.set(0)
+        misses.set(0)
+    }
+
+    companion object {
+        const val DEFAULT_MAX_ENTRIES = 2048
+    }
+}
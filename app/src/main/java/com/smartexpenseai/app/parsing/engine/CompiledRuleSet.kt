@@ -0,0 +1,39 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+
+/**
+ * Immutable, fully prepared bank rule set
+ *
+ * Built once from bank_rules.json: validated, every pattern compiled, and the sender
+ * index, prefilter and extraction plans built. After that it is only read, so any
+ * number of parses can share it without locking. [RuleLoader] publishes it through
+ * an atomic reference; a reload builds a new instance and swaps it in.
+ */
+class CompiledRuleSet internal constructor(
+    val rules: BankRulesSchema,
+    // Identifies the rules file; parse outcomes are only reused under the same fingerprint
+    val fingerprint: String,
+    val senderIndex: SenderIndex,
+    val prefilter: SmsPrefilter,
+    // One plan per bank, in bank order, then the fallback-only plan
+    private val extractionPlans: List<ExtractionPlan>,
+    // How the plans' regexes run; each flagged pattern carries its own RegexBudget
+    val regexExecutionMode: RegexExecutionMode,
+    // Patterns flagged by BacktrackingAnalyzer for polynomial risk
+    val backtrackingRisks: List<String>,
+    // Patterns with exponential risk, left out of the extraction plans
+    val skippedPatterns: List<String> = emptyList()
+) {
+
+    /**
+     * Extraction plan for a bank index from [SenderIndex.findBankIndex]
+     * (-1 selects the fallback-only plan)
+     */
+    fun extractionPlan(bankIndex: Int): ExtractionPlan =
+        if (bankIndex in rules.banks.indices) extractionPlans[bankIndex] else extractionPlans.last()
+
+    /** Total regexes across all extraction plans */
+    val extractionRegexCount: Int
+        get() = extractionPlans.sumOf { it.size }
+}
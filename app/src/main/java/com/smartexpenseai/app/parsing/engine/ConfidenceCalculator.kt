@@ -30,7 +30,7 @@ class ConfidenceCalculator @Inject constructor() {
      * @param extractedDate The extracted date (null if not found)
      * @param extractedType The extracted transaction type (null if not found)
      * @param extractedReferenceNumber The extracted reference/transaction number (null if not found)
-     * @param smsBody The original SMS body for quality checks
+     * @param context The SMS being parsed (body and its shared derived views)
      */
     fun calculate(
         senderMatched: Boolean,
@@ -40,7 +40,7 @@ class ConfidenceCalculator @Inject constructor() {
         extractedDate: String?,
         extractedType: String?,
         extractedReferenceNumber: String?,
-        smsBody: String
+        context: ParseContext
     ): ConfidenceScore {
         val weights = bankRule?.confidenceWeights ?: getDefaultWeights()
         val breakdown = mutableMapOf<Field, FieldConfidence>()
@@ -54,7 +54,7 @@ class ConfidenceCalculator @Inject constructor() {
         )
 
         // 2. Amount extraction score
-        val amountScore = calculateAmountScore(extractedAmount, smsBody)
+        val amountScore = calculateAmountScore(extractedAmount, context)
         breakdown[Field.AMOUNT] = FieldConfidence(
             extracted = extractedAmount != null,
             score = amountScore,
@@ -62,7 +62,7 @@ class ConfidenceCalculator @Inject constructor() {
         )
 
         // 3. Merchant extraction score
-        val merchantScore = calculateMerchantScore(extractedMerchant, smsBody)
+        val merchantScore = calculateMerchantScore(extractedMerchant)
         breakdown[Field.MERCHANT] = FieldConfidence(
             extracted = extractedMerchant != null,
             score = merchantScore,
@@ -111,7 +111,7 @@ class ConfidenceCalculator @Inject constructor() {
     /**
      * Calculate quality score for extracted amount
      */
-    private fun calculateAmountScore(amount: String?, smsBody: String): Float {
+    private fun calculateAmountScore(amount: String?, context: ParseContext): Float {
         if (amount == null) return 0.0f
 
         var score = 0.5f // Base score for extraction
@@ -130,7 +130,7 @@ class ConfidenceCalculator @Inject constructor() {
         }
 
         // Bonus if amount appears early in SMS (likely more accurate)
-        val amountPosition = smsBody.indexOf(amount, ignoreCase = true)
+        val amountPosition = context.body.indexOf(amount, ignoreCase = true)
         if (amountPosition in 0..50) {
             score += 0.2f
         }
@@ -146,7 +146,7 @@ class ConfidenceCalculator @Inject constructor() {
     /**
      * Calculate quality score for extracted merchant
      */
-    private fun calculateMerchantScore(merchant: String?, smsBody: String): Float {
+    private fun calculateMerchantScore(merchant: String?): Float {
         if (merchant == null) return 0.0f
 
         var score = 0.4f // Base score for extraction
@@ -0,0 +1,151 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.smartexpenseai.app.parsing.models.BankRule
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+
+/**
+ * Precompiled field extractors for one bank (or for senders that matched no bank)
+ *
+ * Every field is a first-match-wins list: the bank's own patterns followed by the
+ * fallback patterns. Building the list once per bank lets [UnifiedSMSParser] walk
+ * plain Regex arrays instead of looking every pattern string up in the regex cache
+ * for every message, and drops fallback patterns the bank already tried (an
+ * identical regex that missed once misses again).
+ *
+ * Each pattern carries its [PatternStats.Counter]. With adaptive ordering enabled
+ * a field's patterns are sorted by how often each one supplied the value, so the
+ * common case is tried first; that can change which of two matching patterns wins,
+ * so fields whose order carries meaning are left alone.
+ *
+ * The lists are deliberately not merged into one alternation with named groups:
+ * a combined regex reports the leftmost match in the body, while the rules give
+ * priority to the first pattern in the list, and the two disagree whenever a
+ * later pattern matches earlier in the text.
+ */
+class ExtractionPlan private constructor(
+    val amount: List<Step>,
+    val merchant: List<Step>,
+    val date: List<Step>,
+    val transactionType: List<Step>,
+    val referenceNumber: List<Step>,
+    // True when adaptive ordering moved any pattern away from its rules-file position
+    internal val reordered: Boolean
+) {
+
+    /**
+     * One pattern of a field list, with the counters the parser updates when it runs
+     * and the pattern's own [RegexBudget]
+     */
+    class Step(
+        val regex: Regex,
+        val counter: PatternStats.Counter,
+        val budget: RegexBudget = RegexBudget.UNBOUNDED
+    ) {
+        /** [RegexBudget.find] with this step's pattern and budget */
+        fun find(text: String): MatchResult? = budget.find(regex, text)
+    }
+
+    /** Number of regexes in the plan (after dropping duplicates) */
+    val size: Int
+        get() = amount.size + merchant.size + date.size + transactionType.size + referenceNumber.size
+
+    companion object {
+
+        const val FIELD_AMOUNT = "amount"
+        const val FIELD_MERCHANT = "merchant"
+        const val FIELD_DATE = "date"
+        const val FIELD_TRANSACTION_TYPE = "transaction_type"
+        const val FIELD_REFERENCE_NUMBER = "reference_number"
+
+        /** Field names accepted in a rules `strict_order` list */
+        val FIELD_NAMES = setOf(FIELD_AMOUNT, FIELD_MERCHANT, FIELD_DATE, FIELD_TRANSACTION_TYPE, FIELD_REFERENCE_NUMBER)
+
+        // Never adapted: the type list puts debit before credit on purpose, and the
+        // reference number feeds sms_id, so a different capture would defeat dedup
+        private val ALWAYS_STRICT = setOf(FIELD_TRANSACTION_TYPE, FIELD_REFERENCE_NUMBER)
+
+        // A field is only reordered once its patterns have this many hits between them
+        private const val MIN_HITS_TO_ADAPT = 50
+
+        /**
+         * Build one plan per bank, in bank order, followed by the fallback-only plan
+         * used when the sender matched no bank
+         *
+         * @param compile Regex compiler (RuleLoader's cache); patterns it fails on or
+         *   refuses are left out, the same as a pattern that never matches
+         * @param stats Counters to attach to each pattern
+         * @param budgetFor Budget for a pattern; called once per distinct pattern
+         * @param adaptive Order each field's patterns by observed hits instead of file
+         *   order. Bank patterns still run before fallback patterns, and fields listed
+         *   in the rules' `strict_order` (plus type and reference number) keep file order.
+         */
+        fun buildAll(
+            rules: BankRulesSchema,
+            compile: (String) -> Regex,
+            stats: PatternStats,
+            adaptive: Boolean = false,
+            budgetFor: (String) -> RegexBudget = { RegexBudget.UNBOUNDED }
+        ): List<ExtractionPlan> {
+            val budgets = HashMap<String, RegexBudget>()
+            val budgetOnce: (String) -> RegexBudget = { pattern -> budgets.getOrPut(pattern) { budgetFor(pattern) } }
+            val compiled = HashMap<String, Regex?>()
+            val compileOnce: (String) -> Regex? = { pattern ->
+                compiled.getOrPut(pattern) {
+                    try {
+                        compile(pattern)
+                    } catch (e: Exception) {
+                        null
+                    }
+                }
+            }
+
+            return rules.banks.map { bank -> build(bank, rules, compileOnce, budgetOnce, stats, adaptive) } +
+                build(null, rules, compileOnce, budgetOnce, stats, adaptive)
+        }
+
+        private fun build(
+            bank: BankRule?,
+            rules: BankRulesSchema,
+            compile: (String) -> Regex?,
+            budgetFor: (String) -> RegexBudget,
+            stats: PatternStats,
+            adaptive: Boolean
+        ): ExtractionPlan {
+            val fallback = rules.fallbackPatterns
+            val patterns = bank?.patterns
+            val bankKey = bank?.code ?: PatternStats.FALLBACK_BANK
+            var reordered = false
+
+            // Patterns in rule order as Steps, optionally sorted by hits (stable, so
+            // ties and unseen patterns keep file order)
+            fun tier(field: String, list: List<String>, strict: Set<String>): List<Step> {
+                val steps = list.mapNotNull { pattern ->
+                    compile(pattern)?.let { Step(it, stats.counter(bankKey, field, pattern), budgetFor(pattern)) }
+                }
+                if (!adaptive || field in ALWAYS_STRICT || field in strict) return steps
+                if (steps.sumOf { it.counter.hitCount } < MIN_HITS_TO_ADAPT) return steps
+
+                val sorted = steps.sortedByDescending { it.counter.hitCount }
+                if (sorted != steps) reordered = true
+                return sorted
+            }
+
+            // Bank patterns, then the fallback patterns the bank doesn't already have
+            fun ordered(field: String, own: List<String>?, fallbackList: List<String>?): List<Step> {
+                val ownPatterns = own.orEmpty().distinct()
+                val fallbackOnly = fallbackList.orEmpty().distinct().filter { it !in ownPatterns }
+                return tier(field, ownPatterns, bank?.strictOrder.orEmpty().toSet()) +
+                    tier(field, fallbackOnly, fallback.strictOrder.orEmpty().toSet())
+            }
+
+            return ExtractionPlan(
+                amount = ordered(FIELD_AMOUNT, patterns?.amount, fallback.amount),
+                merchant = ordered(FIELD_MERCHANT, patterns?.merchant, fallback.merchant),
+                date = ordered(FIELD_DATE, patterns?.date, null),
+                transactionType = ordered(FIELD_TRANSACTION_TYPE, patterns?.transactionType, null),
+                referenceNumber = ordered(FIELD_REFERENCE_NUMBER, patterns?.referenceNumber, fallback.referenceNumber),
+                reordered = reordered
+            )
+        }
+    }
+}
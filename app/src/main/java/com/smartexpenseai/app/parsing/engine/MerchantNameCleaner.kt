@@ -32,12 +32,12 @@ object MerchantNameCleaner {
     )
 
     fun clean(merchant: String): String {
-        var collapsed = merchant.trim().replace(Regex("\\s+"), " ")
+        var collapsed = MerchantNormalizer.collapseWhitespace(merchant)
 
         // UPI VPAs ("merchant@ybl") must keep their @ and dots or they collapse
         // into unreadable strings; return them as-is minus stray symbols.
         if (collapsed.contains("@")) {
-            return collapsed.replace(Regex("[^A-Za-z0-9.@_\\s-]"), "").trim()
+            return MerchantNormalizer.retainAlnumAnd(collapsed, ".@_-")
         }
 
         // Cut the name at the first noise token so repeated messages share one name.
@@ -45,6 +45,6 @@ object MerchantNameCleaner {
             collapsed = collapsed.substring(0, it.range.first)
         }
 
-        return collapsed.replace(Regex("[^A-Za-z0-9\\s&'-]"), "").trim()
+        return MerchantNormalizer.retainAlnumAnd(collapsed, "&'-")
     }
 }
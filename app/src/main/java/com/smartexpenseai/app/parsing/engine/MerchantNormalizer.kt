@@ -0,0 +1,263 @@
+package com.smartexpenseai.app.parsing.engine
+
+/**
+ * Single-pass merchant name normalization
+ *
+ * The repository, rule engine, parser, alias manager and several screens each
+ * normalized names with their own chain of `Regex(...)` replaces, compiling every
+ * pattern on every call. Each function here reproduces one of those chains exactly
+ * (the chain is quoted in its KDoc) with a hand-written scan into one scratch buffer.
+ *
+ * Notes on exactness:
+ * - `\s` is the regex class [ \t\n\x0B\f\r]; trim() is Kotlin's (Char.isWhitespace)
+ * - uppercase()/lowercase() of non-ASCII text can change its length, so such names
+ *   are case-mapped as a whole first and then scanned
+ * - the `.*$` chains treat U+0085/U+2028/U+2029 as line ends; names containing
+ *   them take the original regex path
+ */
+object MerchantNormalizer {
+
+    private val ARTIFACT_KEYWORDS = arrayOf("ORDER", "PAYMENT", "TXN", "TRANSACTION")
+    private val CORPORATE_SUFFIXES = arrayOf("LLC", "INC", "CORP")
+
+    // Original chains, only for names containing Unicode line separators
+    private val LEGACY_WHITESPACE = Regex("\\s+")
+    private val LEGACY_ARTIFACTS = listOf(
+        Regex("\\*(ORDER|PAYMENT|TXN|TRANSACTION).*$"),
+        Regex("#\\d+.*$"),
+        Regex("@\\w+.*$"),
+        Regex("-{2,}.*$"),
+        Regex("_{2,}.*$")
+    )
+    private val LEGACY_COMPANY_SUFFIXES = listOf(
+        Regex("\\s+(PVT\\s+)?LTD\\.?$"),
+        Regex("\\s+LIMITED$"),
+        Regex("\\s+PRIVATE\\s+LIMITED$"),
+        Regex("\\s+(LLC|INC|CORP)\\.?$")
+    )
+
+    /**
+     * `uppercase().replace(Regex("\\s+"), " ").trim()`
+     *
+     * Merchant key written by the SMS parser.
+     */
+    fun canonical(name: String): String {
+        val source = upperSource(name)
+        val buffer = CharArray(source.length)
+        val length = collapseInto(source, buffer, upper = true)
+        return trimmedString(buffer, 0, length)
+    }
+
+    /**
+     * Whitespace runs to one space and trim, case unchanged:
+     * `trim().replace(Regex("\\s+"), " ")`
+     */
+    fun collapseWhitespace(text: String): String {
+        val buffer = CharArray(text.length)
+        val length = collapseInto(text, buffer, upper = false)
+        return trimmedString(buffer, 0, length)
+    }
+
+    /**
+     * Transaction-artifact key used for merchants.normalized_name:
+     * uppercase, collapse and trim, then drop everything from the first
+     * `*ORDER|*PAYMENT|*TXN|*TRANSACTION`, `#<digit>`, `@<word char>`, `--` or `__`,
+     * then trim again.
+     */
+    fun transactionKey(name: String): String {
+        val source = upperSource(name)
+        if (hasUnicodeLineSeparator(source)) return legacyTransactionKey(source, companySuffixes = false)
+
+        val buffer = CharArray(source.length)
+        var end = collapseInto(source, buffer, upper = true)
+        var start = 0
+        while (start < end && buffer[start].isWhitespace()) start++
+        while (end > start && buffer[end - 1].isWhitespace()) end--
+
+        end = artifactCut(buffer, start, end)
+        return trimmedString(buffer, start, end)
+    }
+
+    /**
+     * [transactionKey] that also strips a trailing company suffix
+     * (LTD, PVT LTD, LIMITED, PRIVATE LIMITED, LLC, INC, CORP), as the alias manager does
+     */
+    fun aliasKey(name: String): String {
+        val source = upperSource(name)
+        if (hasUnicodeLineSeparator(source)) return legacyTransactionKey(source, companySuffixes = true)
+
+        val buffer = CharArray(source.length)
+        var end = collapseInto(source, buffer, upper = true)
+        var start = 0
+        while (start < end && buffer[start].isWhitespace()) start++
+        while (end > start && buffer[end - 1].isWhitespace()) end--
+
+        end = artifactCut(buffer, start, end)
+
+        // \s+(PVT\s+)?LTD\.?$
+        val ltd = stripSuffixWord(buffer, start, end, "LTD", allowDot = true)
+        if (ltd != end) {
+            val pvt = stripSuffixWord(buffer, start, ltd, "PVT", allowDot = false)
+            end = if (pvt != ltd) pvt else ltd
+        }
+        // \s+LIMITED$, then \s+PRIVATE\s+LIMITED$ on what is left
+        end = stripSuffixWord(buffer, start, end, "LIMITED", allowDot = false)
+        val limited = stripSuffixWord(buffer, start, end, "LIMITED", allowDot = false)
+        if (limited != end) {
+            val private = stripSuffixWord(buffer, start, limited, "PRIVATE", allowDot = false)
+            if (private != limited) end = private
+        }
+        // \s+(LLC|INC|CORP)\.?$
+        for (suffix in CORPORATE_SUFFIXES) {
+            val stripped = stripSuffixWord(buffer, start, end, suffix, allowDot = true)
+            if (stripped != end) {
+                end = stripped
+                break
+            }
+        }
+
+        return trimmedString(buffer, start, end)
+    }
+
+    /**
+     * Grouping key used by the rule engine, budgets and filters:
+     * `uppercase().replace(Regex("[*#@\\-_]+.*"), "").replace(Regex("\\s+"), " ").trim()`
+     */
+    fun groupingKey(name: String): String {
+        val source = upperSource(name)
+        val buffer = CharArray(source.length)
+        var length = 0
+        var i = 0
+        while (i < source.length) {
+            val c = source[i]
+            if (c == '*' || c == '#' || c == '@' || c == '-' || c == '_') {
+                // `.` stops at a line terminator, which survives the replace
+                while (i < source.length && !isLineTerminator(source[i])) i++
+                continue
+            }
+            length = appendCollapsed(buffer, length, c, upper = true)
+            i++
+        }
+        return trimmedString(buffer, 0, length)
+    }
+
+    /**
+     * Lowercase alphanumeric key:
+     * `lowercase().replace(Regex("[^a-zA-Z0-9\\s]"), "").replace(Regex("\\s+"), " ").trim()`
+     */
+    fun alnumKey(name: String): String {
+        val source = if (isAscii(name)) name else name.lowercase()
+        val buffer = CharArray(source.length)
+        var length = 0
+        for (c in source) {
+            when {
+                c in 'A'..'Z' -> buffer[length++] = c + ('a' - 'A')
+                c in 'a'..'z' || c in '0'..'9' -> buffer[length++] = c
+                isRegexSpace(c) -> if (length == 0 || buffer[length - 1] != ' ') buffer[length++] = ' '
+            }
+        }
+        return trimmedString(buffer, 0, length)
+    }
+
+    /**
+     * Drop every character outside [A-Za-z0-9], `\s` and [allowedPunctuation], then trim:
+     * `replace(Regex("[^A-Za-z0-9<allowed>\\s]"), "").trim()`
+     */
+    fun retainAlnumAnd(text: String, allowedPunctuation: String): String {
+        val buffer = CharArray(text.length)
+        var length = 0
+        for (c in text) {
+            if (c in 'A'..'Z' || c in 'a'..'z' || c in '0'..'9' || isRegexSpace(c) || allowedPunctuation.indexOf(c) >= 0) {
+                buffer[length++] = c
+            }
+        }
+        return trimmedString(buffer, 0, length)
+    }
+
+    // Copy text into buffer, turning each run of `\s` into a single space
+    private fun collapseInto(text: String, buffer: CharArray, upper: Boolean): Int {
+        var length = 0
+        for (c in text) length = appendCollapsed(buffer, length, c, upper)
+        return length
+    }
+
+    private fun appendCollapsed(buffer: CharArray, length: Int, c: Char, upper: Boolean): Int {
+        if (isRegexSpace(c)) {
+            // Every space in the output came from a run, so a trailing space means we're in one
+            if (length > 0 && buffer[length - 1] == ' ') return length
+            buffer[length] = ' '
+            return length + 1
+        }
+        buffer[length] = if (upper && c in 'a'..'z') c - ('a' - 'A') else c
+        return length + 1
+    }
+
+    // End index after the five `.*$` artifact replaces. Each cuts at its first
+    // occurrence, and no cut can split a later pattern's match, so the chain
+    // equals one cut at the earliest occurrence of any of them.
+    private fun artifactCut(buffer: CharArray, start: Int, end: Int): Int {
+        for (i in start until end) {
+            val next = if (i + 1 < end) buffer[i + 1] else '\u0000'
+            val cut = when (buffer[i]) {
+                '*' -> ARTIFACT_KEYWORDS.any { regionEquals(buffer, i + 1, end, it) }
+                '#' -> next in '0'..'9'
+                '@' -> next in 'A'..'Z' || next in 'a'..'z' || next in '0'..'9' || next == '_'
+                '-' -> next == '-'
+                '_' -> next == '_'
+                else -> false
+            }
+            if (cut) return i
+        }
+        return end
+    }
+
+    // `\s+WORD\.?$` on buffer[start, end): new end if it matched, else end
+    private fun stripSuffixWord(buffer: CharArray, start: Int, end: Int, word: String, allowDot: Boolean): Int {
+        var wordEnd = end
+        if (allowDot && wordEnd > start && buffer[wordEnd - 1] == '.') wordEnd--
+        val wordStart = wordEnd - word.length
+        if (wordStart < start || !regionEquals(buffer, wordStart, wordEnd, word)) return end
+
+        var spaceStart = wordStart
+        while (spaceStart > start && isRegexSpace(buffer[spaceStart - 1])) spaceStart--
+        return if (spaceStart < wordStart) spaceStart else end
+    }
+
+    private fun regionEquals(buffer: CharArray, from: Int, end: Int, word: String): Boolean {
+        if (from + word.length > end) return false
+        for (k in word.indices) {
+            if (buffer[from + k] != word[k]) return false
+        }
+        return true
+    }
+
+    private fun trimmedString(buffer: CharArray, start: Int, end: Int): String {
+        var s = start
+        var e = end
+        while (s < e && buffer[s].isWhitespace()) s++
+        while (e > s && buffer[e - 1].isWhitespace()) e--
+        return String(buffer, s, e - s)
+    }
+
+    private fun upperSource(name: String): String = if (isAscii(name)) name else name.uppercase()
+
+    private fun isAscii(text: String): Boolean = text.all { it.code < 0x80 }
+
+    private fun isRegexSpace(c: Char): Boolean =
+        c == ' ' || c == '\t' || c == '\n' || c == '\u000B' || c == '\u000C' || c == '\r'
+
+    private fun isLineTerminator(c: Char): Boolean =
+        c == '\n' || c == '\r' || c == '\u0085' || c == '\u2028' || c == '\u2029'
+
+    private fun hasUnicodeLineSeparator(text: String): Boolean =
+        text.any { it == '\u0085' || it == '\u2028' || it == '\u2029' }
+
+    private fun legacyTransactionKey(upper: String, companySuffixes: Boolean): String {
+        var result = upper.replace(LEGACY_WHITESPACE, " ").trim()
+        LEGACY_ARTIFACTS.forEach { result = result.replace(it, "") }
+        if (companySuffixes) {
+            LEGACY_COMPANY_SUFFIXES.forEach { result = result.replace(it, "") }
+        }
+        return result.trim()
+    }
+}
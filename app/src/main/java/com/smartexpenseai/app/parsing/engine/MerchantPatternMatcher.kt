@@ -0,0 +1,181 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.smartexpenseai.app.parsing.models.MerchantCategoryRule
+
+/**
+ * merchant_rules.json compiled into one matcher for [MerchantRuleEngine]
+ *
+ * Most patterns are plain keywords wrapped in ".*" ("SWIGGY.*", ".*PIZZA.*"),
+ * which under containsMatchIn are just substring checks. Those go into a single
+ * Aho-Corasick automaton; the remaining real regexes ("UBER\\s*EATS.*") are kept
+ * in priority order and only evaluated when they could still beat the best
+ * keyword hit and their literal prefix was seen in the name.
+ *
+ * Result is the same as the old loop: the first category in priority order with
+ * any matching pattern, and within it the first pattern in file order.
+ */
+class MerchantPatternMatcher private constructor(
+    private val automaton: AhoCorasickAutomaton,
+    // Rank (global priority position) of each automaton keyword
+    private val keywordRanks: IntArray,
+    // Lowest keyword rank ending at each automaton state
+    private val stateBestRank: IntArray,
+    private val regexEntries: List<RegexEntry>,
+    private val locations: List<Location>
+) {
+
+    /** Which category and pattern (indices into the rule lists) matched */
+    class Location(val categoryIndex: Int, val patternIndex: Int)
+
+    private class RegexEntry(
+        val rank: Int,
+        val regex: Regex,
+        // Automaton keyword that must occur for the regex to match, or -1
+        val gateKeyword: Int
+    )
+
+    val literalCount: Int
+        get() = keywordRanks.count { it != GATE_RANK }
+
+    val regexCount: Int
+        get() = regexEntries.size
+
+    /**
+     * Find the highest-priority pattern matching an already-normalized (uppercase)
+     * merchant name, or null when no category matches
+     */
+    fun match(normalizedMerchant: String): Location? {
+        var best = NO_MATCH
+        var seenGates: BooleanArray? = null
+
+        var state = 0
+        for (c in normalizedMerchant) {
+            state = automaton.step(state, foldCase(c))
+            val rank = stateBestRank[state]
+            if (rank == NO_MATCH) continue
+            if (rank < best && rank != GATE_RANK) best = rank
+            // Remember gate keywords seen so far (rare: only names near a regex prefix)
+            for (keyword in automaton.matches(state)) {
+                if (keywordRanks[keyword] == GATE_RANK) {
+                    val gates = seenGates ?: BooleanArray(keywordRanks.size).also { seenGates = it }
+                    gates[keyword] = true
+                }
+            }
+        }
+
+        for (entry in regexEntries) {
+            if (entry.rank >= best) break
+            if (entry.gateKeyword >= 0 && seenGates?.get(entry.gateKeyword) != true) continue
+            if (entry.regex.containsMatchIn(normalizedMerchant)) {
+                best = entry.rank
+                break
+            }
+        }
+
+        return if (best == NO_MATCH) null else locations[best]
+    }
+
+    companion object {
+        private const val NO_MATCH = Int.MAX_VALUE
+
+        // Gate keywords don't match anything on their own
+        private const val GATE_RANK = Int.MAX_VALUE - 1
+
+        private const val REGEX_META_CHARS = "\\^$.|?*+()[]{}"
+        private const val QUANTIFIERS = "?*+{"
+
+        /**
+         * Compile categories that are already sorted by priority
+         */
+        fun build(categories: List<MerchantCategoryRule>): MerchantPatternMatcher {
+            val keywords = mutableListOf<String>()
+            val keywordRanks = mutableListOf<Int>()
+            val regexSpecs = mutableListOf<Triple<Int, Regex, String?>>()
+            val locations = mutableListOf<Location>()
+
+            categories.forEachIndexed { categoryIndex, category ->
+                category.patterns.forEachIndexed { patternIndex, pattern ->
+                    val rank = locations.size
+                    locations.add(Location(categoryIndex, patternIndex))
+
+                    val regex = try {
+                        Regex(pattern, RegexOption.IGNORE_CASE)
+                    } catch (e: Exception) {
+                        null
+                    }
+
+                    if (regex == null) {
+                        // Same fallback as MerchantCategoryRule: an invalid regex is a literal
+                        keywords.add(upperAscii(pattern))
+                        keywordRanks.add(rank)
+                    } else {
+                        val literal = literalCore(pattern)
+                        if (literal != null) {
+                            keywords.add(upperAscii(literal))
+                            keywordRanks.add(rank)
+                        } else {
+                            regexSpecs.add(Triple(rank, regex, literalPrefix(pattern)))
+                        }
+                    }
+                }
+            }
+
+            // Gate keywords get their own automaton entries
+            val regexEntries = regexSpecs.map { (rank, regex, prefix) ->
+                val gate = if (prefix != null) {
+                    keywords.add(upperAscii(prefix))
+                    keywordRanks.add(GATE_RANK)
+                    keywords.size - 1
+                } else {
+                    -1
+                }
+                RegexEntry(rank, regex, gate)
+            }
+
+            val automaton = AhoCorasickAutomaton(keywords)
+            val ranks = keywordRanks.toIntArray()
+            // A gate-only state maps to GATE_RANK so match() still records the gate
+            val stateBestRank = IntArray(automaton.stateCount) { state ->
+                val outputs = automaton.matches(state)
+                if (outputs.isEmpty()) NO_MATCH else outputs.minOf { ranks[it] }
+            }
+
+            return MerchantPatternMatcher(
+                automaton = automaton,
+                keywordRanks = ranks,
+                stateBestRank = stateBestRank,
+                regexEntries = regexEntries,
+                locations = locations
+            )
+        }
+
+        /**
+         * The keyword a pattern reduces to under containsMatchIn, if it has no
+         * regex syntax once leading/trailing ".*" are removed
+         */
+        internal fun literalCore(pattern: String): String? {
+            val core = pattern.removePrefix(".*").removeSuffix(".*")
+            return if (core.isNotEmpty() && core.none { it in REGEX_META_CHARS }) core else null
+        }
+
+        /**
+         * A literal run every match of the regex must contain, used to skip the
+         * regex when it cannot match. Null when the pattern has no safe prefix.
+         */
+        private fun literalPrefix(pattern: String): String? {
+            if ('|' in pattern) return null
+            val body = pattern.removePrefix(".*")
+            var end = 0
+            while (end < body.length && body[end] !in REGEX_META_CHARS) end++
+            // A quantifier right after the run makes its last character optional
+            if (end < body.length && body[end] in QUANTIFIERS) end--
+            return if (end >= 2) body.substring(0, end) else null
+        }
+
+        private fun upperAscii(text: String): String =
+            buildString(text.length) { text.forEach { append(foldCase(it)) } }
+
+        // IGNORE_CASE without UNICODE_CASE only folds US-ASCII letters
+        private fun foldCase(c: Char): Char = if (c in 'a'..'z') c - ('a' - 'A') else c
+    }
+}
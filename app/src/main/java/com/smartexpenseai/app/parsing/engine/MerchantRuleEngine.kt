@@ -5,6 +5,7 @@ import com.google.gson.Gson
 import com.smartexpenseai.app.parsing.models.CategorizationResult
 import com.smartexpenseai.app.parsing.models.MerchantRulesConfig
 import com.smartexpenseai.app.utils.logging.StructuredLogger
+import java.io.IOException
 import java.io.InputStreamReader
 import javax.inject.Inject
 import javax.inject.Singleton
@@ -31,8 +32,13 @@ class MerchantRuleEngine @Inject constructor(
 
     private val logger = StructuredLogger("MERCHANT", "MerchantRuleEngine")
 
+    @Volatile
     private var rulesConfig: MerchantRulesConfig? = null
 
+    // All category patterns compiled into one matcher (keyword automaton + ordered regexes)
+    @Volatile
+    private var patternMatcher: MerchantPatternMatcher? = null
+
     /**
      * Lazy initialization flag
      */
@@ -53,18 +59,20 @@ class MerchantRuleEngine @Inject constructor(
             }
 
             try {
-                logger.info("initialize", "[INIT] Loading merchant rules from JSON...")
-
-                val inputStream = context.assets.open("merchant_rules.json")
-                val reader = InputStreamReader(inputStream)
-                val gson = Gson()
-
-                rulesConfig = gson.fromJson(reader, MerchantRulesConfig::class.java)
-                reader.close()
+                logger.info("initialize", "[INIT] Loading merchant rules...")
+
+                // Prefer the build-time bundle; the JSON is the fallback when it isn't packaged
+                val loaded = readBundle() ?: run {
+                    val reader = InputStreamReader(context.assets.open("merchant_rules.json"))
+                    val config = Gson().fromJson(reader, MerchantRulesConfig::class.java)
+                    reader.close()
+                    config
+                }
 
-                // Sort categories by priority (lower number = higher priority)
-                rulesConfig = rulesConfig?.copy(
-                    categories = rulesConfig?.categories?.sortedBy { it.priority } ?: emptyList()
+                // Sort categories by priority (lower number = higher priority); published in
+                // one write so categorize() never sees the unsorted list
+                rulesConfig = loaded?.copy(
+                    categories = loaded.categories.sortedBy { it.priority }
                 )
 
                 logger.info(
@@ -73,15 +81,16 @@ class MerchantRuleEngine @Inject constructor(
                     "${rulesConfig?.categories?.sumOf { it.patterns.size } ?: 0} total patterns"
                 )
 
-                // Pre-compile all regex patterns for better performance
                 rulesConfig?.categories?.forEach { category ->
-                    category.getCompiledPatterns() // Trigger compilation
                     logger.debug(
                         "initialize",
                         "[CATEGORY] ${category.name}: ${category.patterns.size} patterns, priority ${category.priority}"
                     )
                 }
 
+                // Compile every category's patterns into one priority-aware matcher
+                patternMatcher = MerchantPatternMatcher.build(rulesConfig?.categories ?: emptyList())
+
                 isInitialized = true
 
             } catch (e: Exception) {
@@ -95,6 +104,14 @@ class MerchantRuleEngine @Inject constructor(
         }
     }
 
+    private fun readBundle(): MerchantRulesConfig? {
+        return try {
+            context.assets.open(RuleBundleReader.MERCHANT_RULES_BUNDLE).use { RuleBundleReader.readMerchantRules(it) }
+        } catch (e: IOException) {
+            null
+        }
+    }
+
     /**
      * Categorize a merchant name using the rule engine
      *
@@ -107,8 +124,14 @@ class MerchantRuleEngine @Inject constructor(
             initialize()
         }
 
+        // Read the generation before the rules: a reload() that swaps the rules after this
+        // point also invalidates it, so a result from the old rules lands in a discarded one
+        val generation = categorizationCache.generation()
+
         // If still not initialized (loading failed), use fallback
-        if (rulesConfig == null) {
+        val config = rulesConfig
+        val matcher = patternMatcher
+        if (config == null || matcher == null) {
             logger.warn(
                 "categorize",
                 "[FALLBACK] Rules not loaded, using default categorization for: $merchantName"
@@ -117,39 +140,50 @@ class MerchantRuleEngine @Inject constructor(
         }
 
         val normalizedMerchant = normalizeMerchantName(merchantName)
+        generation.get(normalizedMerchant)?.let { return it }
+
+        return matchRules(merchantName, normalizedMerchant, config, matcher).also {
+            generation.put(normalizedMerchant, it)
+        }
+    }
 
+    private fun matchRules(
+        merchantName: String,
+        normalizedMerchant: String,
+        config: MerchantRulesConfig,
+        matcher: MerchantPatternMatcher
+    ): CategorizationResult {
         logger.debug(
             "categorize",
             "[MATCH] Categorizing merchant: '$merchantName' (normalized: '$normalizedMerchant')"
         )
 
-        // Try to match against all categories (sorted by priority)
-        for (category in rulesConfig!!.categories) {
-            if (category.matches(normalizedMerchant)) {
-                logger.info(
-                    "categorize",
-                    "[MATCHED] '${merchantName}' → ${category.name} (emoji: ${category.emoji})"
-                )
+        // One pass over the name finds the highest-priority category and the pattern that fired
+        matcher.match(normalizedMerchant)?.let { location ->
+            val category = config.categories[location.categoryIndex]
+            logger.info(
+                "categorize",
+                "[MATCHED] '${merchantName}' → ${category.name} (emoji: ${category.emoji})"
+            )
 
-                return CategorizationResult(
-                    categoryName = category.name,
-                    emoji = category.emoji,
-                    color = category.color,
-                    matchedPattern = findMatchedPattern(normalizedMerchant, category.patterns),
-                    confidence = 100,
-                    isFallback = false
-                )
-            }
+            return CategorizationResult(
+                categoryName = category.name,
+                emoji = category.emoji,
+                color = category.color,
+                matchedPattern = category.patterns[location.patternIndex],
+                confidence = 100,
+                isFallback = false
+            )
         }
 
         // No match found - use fallback category
         logger.debug(
             "categorize",
-            "[NO_MATCH] No pattern matched for '$merchantName', using fallback: ${rulesConfig!!.fallbackCategory}"
+            "[NO_MATCH] No pattern matched for '$merchantName', using fallback: ${config.fallbackCategory}"
         )
 
         return CategorizationResult(
-            categoryName = rulesConfig!!.fallbackCategory,
+            categoryName = config.fallbackCategory,
             emoji = "📂",
             color = "#607d8b",
             matchedPattern = null,
@@ -163,23 +197,7 @@ class MerchantRuleEngine @Inject constructor(
      * Same logic as existing normalization in the codebase
      */
     private fun normalizeMerchantName(merchantName: String): String {
-        return merchantName.uppercase()
-            .replace(Regex("[*#@\\-_]+.*"), "") // Remove suffixes after special chars
-            .replace(Regex("\\s+"), " ") // Normalize spaces
-            .trim()
-    }
-
-    /**
-     * Find which specific pattern matched (for debugging/logging)
-     */
-    private fun findMatchedPattern(merchantName: String, patterns: List<String>): String? {
-        return patterns.find { pattern ->
-            try {
-                Regex(pattern, RegexOption.IGNORE_CASE).containsMatchIn(merchantName)
-            } catch (e: Exception) {
-                false
-            }
-        }
+        return MerchantNormalizer.groupingKey(merchantName)
     }
 
     /**
@@ -246,6 +264,8 @@ class MerchantRuleEngine @Inject constructor(
     fun reload() {
         isInitialized = false
         rulesConfig = null
+        patternMatcher = null
+        categorizationCache.invalidate()
         initialize()
         logger.info("reload", "[RELOAD] Merchant rules reloaded successfully")
     }
@@ -258,8 +278,22 @@ class MerchantRuleEngine @Inject constructor(
             "initialized" to isInitialized,
             "categories_count" to (rulesConfig?.categories?.size ?: 0),
             "total_patterns" to (rulesConfig?.categories?.sumOf { it.patterns.size } ?: 0),
+            "keyword_patterns" to (patternMatcher?.literalCount ?: 0),
+            "regex_patterns" to (patternMatcher?.regexCount ?: 0),
             "version" to (rulesConfig?.version ?: 0),
-            "fallback_category" to (rulesConfig?.fallbackCategory ?: "Other")
+            "fallback_category" to (rulesConfig?.fallbackCategory ?: "Other"),
+            "cache_size" to categorizationCache.size,
+            "cache_hits" to categorizationCache.hitCount,
+            "cache_misses" to categorizationCache.missCount,
+            "cache_hit_ratio" to categorizationCache.hitRatio
         )
     }
+
+    companion object {
+        /**
+         * Shared by every engine instance - most screens still construct their own
+         * engine, but they all load the same bundled merchant_rules.json
+         */
+        private val categorizationCache = CategorizationCache()
+    }
 }
@@ -0,0 +1,223 @@
+package com.smartexpenseai.app.parsing.engine
+
+import java.io.DataInputStream
+import java.io.DataOutputStream
+import java.io.File
+import java.util.concurrent.atomic.AtomicLong
+
+/**
+ * Bounded LRU of parser outcomes keyed by (rules fingerprint, sender, body hash)
+ *
+ * The parser is deterministic for a given sender, body and rule set, but rescans
+ * (24h sync overlap, force/clean full rescans of up to 5,000 messages) used to
+ * re-run every regex for messages already seen. Only the timestamp-independent
+ * part of a parse is cached - the extracted field strings or the rejection
+ * reason - so the entity, its time of day and its sms_id are still built per call.
+ *
+ * The cache can optionally be persisted to [persistFile] (app cache dir) so the
+ * first rescan after a cold start also benefits. A different rules fingerprint
+ * invalidates everything, both in memory and on disk; [RuleLoader] puts the app's
+ * version code in it, so an update with new parser code starts empty.
+ */
+class ParseCache(
+    private val maxEntries: Int = DEFAULT_MAX_ENTRIES,
+    private val persistFile: File? = null
+) {
+
+    /**
+     * Timestamp-independent result of running the extractors on one SMS
+     */
+    sealed class Extraction {
+        class Rejected(val reason: String) : Extraction()
+
+        class Extracted(
+            val bankIndex: Int,  // index into BankRulesSchema.banks, -1 for fallback
+            val amount: String,
+            val merchant: String?,
+            val dateMillis: Long,  // SmsDateParser.NO_DATE when the body has no date
+            val transactionType: String?,
+            val referenceNumber: String
+        ) : Extraction()
+    }
+
+    private data class Key(val sender: String, val bodyLength: Int, val bodyHash: Long)
+
+    private val entries = object : LinkedHashMap<Key, Extraction>(64, 0.75f, true) {
+        override fun removeEldestEntry(eldest: MutableMap.MutableEntry<Key, Extraction>?): Boolean =
+            size > maxEntries
+    }
+
+    private var fingerprint: String? = null
+    private var restored = false
+    private var dirty = false
+
+    private val hits = AtomicLong()
+    private val misses = AtomicLong()
+
+    val hitCount: Long get() = hits.get()
+    val missCount: Long get() = misses.get()
+    val size: Int get() = synchronized(this) { entries.size }
+
+    fun get(rulesFingerprint: String, sender: String, body: String): Extraction? {
+        val key = keyOf(sender, body)
+        val cached = synchronized(this) {
+            switchFingerprint(rulesFingerprint)
+            entries[key]
+        }
+        if (cached != null) hits.incrementAndGet() else misses.incrementAndGet()
+        return cached
+    }
+
+    fun put(rulesFingerprint: String, sender: String, body: String, extraction: Extraction) {
+        val key = keyOf(sender, body)
+        synchronized(this) {
+            switchFingerprint(rulesFingerprint)
+            entries[key] = extraction
+            dirty = true
+        }
+    }
+
+    fun clear() {
+        synchronized(this) {
+            entries.clear()
+            fingerprint = null
+            restored = false
+            dirty = false
+        }
+        hits.set(0)
+        misses.set(0)
+    }
+
+    /**
+     * Load the persisted cache if it was written for the same rules fingerprint.
+     * Call from a background thread; only the first call per fingerprint reads the file.
+     */
+    fun restore(rulesFingerprint: String) {
+        val file = persistFile ?: return
+        synchronized(this) {
+            switchFingerprint(rulesFingerprint)
+            if (restored) return
+            restored = true
+            if (!file.exists()) return
+
+            try {
+                DataInputStream(file.inputStream().buffered()).use { input ->
+                    if (input.readInt() != FILE_MAGIC) return
+                    if (input.readUTF() != rulesFingerprint) return
+                    val count = input.readInt()
+                    repeat(count) {
+                        val key = Key(input.readUTF(), input.readInt(), input.readLong())
+                        val extraction = readExtraction(input)
+                        if (!entries.containsKey(key)) entries[key] = extraction
+                    }
+                }
+            } catch (e: Exception) {
+                // A truncated or stale file is just a cold cache
+                file.delete()
+            }
+        }
+    }
+
+    /**
+     * Write the cache to disk if anything changed since the last write.
+     * Call from a background thread, e.g. at the end of a historical scan.
+     */
+    fun persist() {
+        val file = persistFile ?: return
+        val (currentFingerprint, snapshot) = synchronized(this) {
+            val current = fingerprint
+            if (!dirty || current == null) return
+            dirty = false
+            current to entries.entries.map { it.key to it.value }
+        }
+
+        try {
+            val tmp = File(file.parentFile, file.name + ".tmp")
+            DataOutputStream(tmp.outputStream().buffered()).use { output ->
+                output.writeInt(FILE_MAGIC)
+                output.writeUTF(currentFingerprint)
+                output.writeInt(snapshot.size)
+                snapshot.forEach { (key, extraction) ->
+                    output.writeUTF(key.sender)
+                    output.writeInt(key.bodyLength)
+                    output.writeLong(key.bodyHash)
+                    writeExtraction(output, extraction)
+                }
+            }
+            if (!tmp.renameTo(file)) {
+                tmp.delete()
+            }
+        } catch (e: Exception) {
+            synchronized(this) { dirty = true }
+        }
+    }
+
+    // Must hold the lock. A new rule set makes every cached outcome stale.
+    private fun switchFingerprint(rulesFingerprint: String) {
+        if (fingerprint == rulesFingerprint) return
+        entries.clear()
+        fingerprint = rulesFingerprint
+        restored = false
+        dirty = false
+    }
+
+    companion object {
+        const val DEFAULT_MAX_ENTRIES = 8192
+
+        private const val FILE_MAGIC = 0x50435631  // "PCV1"
+        private const val TAG_REJECTED: Byte = 0
+        private const val TAG_EXTRACTED: Byte = 1
+
+        private fun keyOf(sender: String, body: String) = Key(sender, body.length, fnv1a64(body))
+
+        // 64-bit FNV-1a over UTF-16 code units; with the length in the key,
+        // collisions across an inbox are not a practical concern
+        private fun fnv1a64(text: String): Long {
+            var hash = -0x340d631b7bdddcdbL
+            for (c in text) {
+                hash = (hash xor c.code.toLong()) * 0x100000001b3L
+            }
+            return hash
+        }
+
+        private fun writeExtraction(output: DataOutputStream, extraction: Extraction) {
+            when (extraction) {
+                is Extraction.Rejected -> {
+                    output.writeByte(TAG_REJECTED.toInt())
+                    output.writeUTF(extraction.reason)
+                }
+                is Extraction.Extracted -> {
+                    output.writeByte(TAG_EXTRACTED.toInt())
+                    output.writeInt(extraction.bankIndex)
+                    output.writeUTF(extraction.amount)
+                    writeNullableUTF(output, extraction.merchant)
+                    output.writeLong(extraction.dateMillis)
+                    writeNullableUTF(output, extraction.transactionType)
+                    output.writeUTF(extraction.referenceNumber)
+                }
+            }
+        }
+
+        private fun readExtraction(input: DataInputStream): Extraction =
+            when (input.readByte()) {
+                TAG_REJECTED -> Extraction.Rejected(input.readUTF())
+                TAG_EXTRACTED -> Extraction.Extracted(
+                    bankIndex = input.readInt(),
+                    amount = input.readUTF(),
+                    merchant = readNullableUTF(input),
+                    dateMillis = input.readLong(),
+                    transactionType = readNullableUTF(input),
+                    referenceNumber = input.readUTF()
+                )
+                else -> throw IllegalStateException("Corrupt parse cache entry")
+            }
+
+        private fun writeNullableUTF(output: DataOutputStream, value: String?) {
+            output.writeBoolean(value != null)
+            if (value != null) output.writeUTF(value)
+        }
+
+        private fun readNullableUTF(input: DataInputStream): String? =
+            if (input.readBoolean()) input.readUTF() else null
+    }
+}
@@ -0,0 +1,59 @@
+package com.smartexpenseai.app.parsing.engine
+
+/**
+ * One SMS being parsed, plus the views of its body that the extractors need
+ *
+ * Each derived view is computed lazily on first use and then shared by every
+ * extractor and by [ConfidenceCalculator], so none of them is rebuilt within a
+ * single parse. A context belongs to one parse on one thread.
+ */
+class ParseContext(
+    val sender: String,
+    val body: String,
+    private val prefilter: SmsPrefilter,
+    // Whether this parse records into ParseTimings; read once so a disabled run skips every clock read
+    internal val timed: Boolean = false
+) {
+
+    /**
+     * Set when a pattern ran out of its [RegexBudget] during this parse. The outcome then
+     * depends on load, not just on the rules, so it must not go into the parse cache.
+     */
+    internal var budgetExceeded: Boolean = false
+
+    /**
+     * Prefilter verdict: the rejection reason, or the debit/credit keyword hits
+     */
+    val verdict: SmsPrefilter.Verdict by lazy(LazyThreadSafetyMode.NONE) {
+        prefilter.classify(body)
+    }
+
+    /**
+     * Body with everything outside [A-Za-z0-9] and whitespace turned into spaces, trimmed.
+     * Same result as `body.replace(Regex("[^A-Za-z0-9\\s]"), " ").trim()`.
+     */
+    val alnumBody: String by lazy(LazyThreadSafetyMode.NONE) {
+        val chars = CharArray(body.length)
+        for (i in body.indices) {
+            val c = body[i]
+            chars[i] = if (SmsPrefilter.isAlnumOrSpace(c)) c else ' '
+        }
+        String(chars).trim()
+    }
+
+    /**
+     * Last four digits of the card the SMS names ("Card x1234", "Card ending 1234"), if any
+     */
+    val cardLast4: String? by lazy(LazyThreadSafetyMode.NONE) {
+        CARD_LAST4_REGEX.find(body)?.groupValues?.get(1)
+    }
+
+    companion object {
+        // Card identifier ("Card x1234" / "Card ending 1234" / "Card **1234") used to
+        // accept card-present transactions that carry no reference number
+        private val CARD_LAST4_REGEX = Regex(
+            "(?:card|crd)\\s*(?:no\\.?\\s*)?(?:number\\s*)?(?:ending(?:\\s+in)?\\s*|[xX*]+\\s*)?(\\d{4})\\b",
+            RegexOption.IGNORE_CASE
+        )
+    }
+}
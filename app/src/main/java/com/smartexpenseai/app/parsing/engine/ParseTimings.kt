@@ -0,0 +1,135 @@
+package com.smartexpenseai.app.parsing.engine
+
+import java.util.Locale
+import java.util.concurrent.atomic.AtomicLongArray
+
+/**
+ * Per-stage latency histograms for [UnifiedSMSParser], off by default
+ *
+ * Each stage has a fixed set of power-of-two buckets (under 256 ns, 256-511 ns, ...,
+ * up to about 2 s) kept in one [AtomicLongArray], so recording a sample is a few
+ * atomic increments and never allocates. When [enabled] is false the parser reads the
+ * flag once per message and skips every nanoTime call.
+ *
+ * Process-wide like the published rule set: the parser singletons all record here,
+ * and [LogExporter][com.smartexpenseai.app.utils.LogExporter] reads it without DI.
+ * [Stage.INGEST] is the exception to the flag: real-time ingestion records one sample
+ * per stored SMS regardless of [enabled].
+ */
+object ParseTimings {
+
+    enum class Stage(val label: String) {
+        CACHE_LOOKUP("cache lookup"),
+        PREFILTER("prefilter"),
+        SENDER_MATCH("sender match"),
+        AMOUNT("amount"),
+        MERCHANT("merchant"),
+        DATE("date"),
+        TRANSACTION_TYPE("transaction type"),
+        REFERENCE("reference"),
+        CONFIDENCE("confidence"),
+        ENTITY("entity"),
+        TOTAL("total"),
+
+        // SMS_RECEIVED to row stored, recorded by SMSIngestionService even when disabled
+        INGEST("receive to insert")
+    }
+
+    /**
+     * Aggregate for one stage; percentiles are bucket upper bounds, so they
+     * overestimate by at most 2x
+     */
+    data class StageSummary(
+        val stage: Stage,
+        val count: Long,
+        val meanMicros: Double,
+        val p50Micros: Double,
+        val p99Micros: Double,
+        val maxMicros: Double
+    )
+
+    const val BUCKET_COUNT = 24
+
+    // Bucket 0 holds everything below 2^MIN_SHIFT ns
+    private const val MIN_SHIFT = 8
+
+    private val STAGES = Stage.values()
+    private val buckets = AtomicLongArray(STAGES.size * BUCKET_COUNT)
+    private val totalNanos = AtomicLongArray(STAGES.size)
+    private val maxNanos = AtomicLongArray(STAGES.size)
+
+    @Volatile
+    var enabled: Boolean = false
+
+    fun record(stage: Stage, nanos: Long) {
+        val ordinal = stage.ordinal
+        buckets.incrementAndGet(ordinal * BUCKET_COUNT + bucketOf(nanos))
+        totalNanos.addAndGet(ordinal, nanos)
+        var max = maxNanos.get(ordinal)
+        while (nanos > max && !maxNanos.compareAndSet(ordinal, max, nanos)) {
+            max = maxNanos.get(ordinal)
+        }
+    }
+
+    /**
+     * Stages that recorded at least one sample, in pipeline order
+     */
+    fun snapshot(): List<StageSummary> = STAGES.mapNotNull { stage ->
+        val counts = LongArray(BUCKET_COUNT) { buckets.get(stage.ordinal * BUCKET_COUNT + it) }
+        val count = counts.sum()
+        if (count == 0L) return@mapNotNull null
+        StageSummary(
+            stage = stage,
+            count = count,
+            meanMicros = totalNanos.get(stage.ordinal) / 1e3 / count,
+            p50Micros = percentileNanos(counts, count, 0.50) / 1e3,
+            p99Micros = percentileNanos(counts, count, 0.99) / 1e3,
+            maxMicros = maxNanos.get(stage.ordinal) / 1e3
+        )
+    }
+
+    fun reset() {
+        for (i in 0 until buckets.length()) buckets.set(i, 0)
+        for (i in 0 until totalNanos.length()) {
+            totalNanos.set(i, 0)
+            maxNanos.set(i, 0)
+        }
+    }
+
+    /**
+     * [snapshot] as a text table for logs and the log export
+     */
+    fun format(): String = buildString {
+        val summaries = snapshot()
+        if (summaries.isEmpty()) {
+            appendLine(if (enabled) "No parse timings recorded yet" else "Parse timing is disabled")
+            return@buildString
+        }
+        appendLine("stage              count    mean_us   p50_us   p99_us    max_us")
+        summaries.forEach { s ->
+            appendLine(
+                String.format(
+                    Locale.US, "%-16s %8d %10.1f %8.1f %8.1f %9.1f",
+                    s.stage.label, s.count, s.meanMicros, s.p50Micros, s.p99Micros, s.maxMicros
+                )
+            )
+        }
+    }
+
+    private fun bucketOf(nanos: Long): Int {
+        if (nanos < (1L shl MIN_SHIFT)) return 0
+        val log2 = 63 - java.lang.Long.numberOfLeadingZeros(nanos)
+        return minOf(log2 - MIN_SHIFT + 1, BUCKET_COUNT - 1)
+    }
+
+    // Upper bound of the bucket holding the p-th sample
+    private fun percentileNanos(counts: LongArray, total: Long, p: Double): Double {
+        val rank = maxOf(1L, Math.ceil(total * p).toLong())
+        var seen = 0L
+        for (i in counts.indices) {
+            seen += counts[i]
+            if (seen >= rank) return (1L shl (MIN_SHIFT + i)).toDouble()
+        }
+        return (1L shl (MIN_SHIFT + BUCKET_COUNT - 1)).toDouble()
+    }
+}
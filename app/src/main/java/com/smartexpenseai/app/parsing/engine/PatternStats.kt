@@ -0,0 +1,199 @@
+package com.smartexpenseai.app.parsing.engine
+
+import java.io.DataInputStream
+import java.io.DataOutputStream
+import java.io.File
+import java.util.Locale
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.atomic.AtomicLong
+
+/**
+ * Hit/miss counters for every extraction pattern, per bank and field
+ *
+ * [ExtractionPlan] resolves one [Counter] per (bank, field, pattern) when it is built,
+ * so the parser only bumps an atomic per regex it runs. A miss is a regex that ran and
+ * produced nothing usable; a hit is the regex whose capture was used. Messages served
+ * from [ParseCache] run no regex and count nothing.
+ *
+ * Counters are aggregated across rule reloads and, via [persist]/[restore], across
+ * process restarts. They feed the adaptive pattern order and [export], which lists
+ * patterns that cost a regex run on every message but never hit.
+ */
+class PatternStats(private val persistFile: File? = null) {
+
+    /**
+     * Counters for one pattern in one bank's extraction plan
+     *
+     * @property bank Bank code, or [FALLBACK_BANK] for senders that matched no bank
+     * @property field Rules field name ("amount", "merchant", ...)
+     */
+    class Counter internal constructor(
+        val bank: String,
+        val field: String,
+        val pattern: String
+    ) {
+        private val hits = AtomicLong()
+        private val misses = AtomicLong()
+
+        val hitCount: Long get() = hits.get()
+        val missCount: Long get() = misses.get()
+
+        fun hit() {
+            hits.incrementAndGet()
+        }
+
+        fun miss() {
+            misses.incrementAndGet()
+        }
+
+        internal fun add(hitCount: Long, missCount: Long) {
+            hits.addAndGet(hitCount)
+            misses.addAndGet(missCount)
+        }
+
+        internal fun reset() {
+            hits.set(0)
+            misses.set(0)
+        }
+    }
+
+    /**
+     * Point-in-time copy of one counter
+     */
+    data class Entry(
+        val bank: String,
+        val field: String,
+        val pattern: String,
+        val hits: Long,
+        val misses: Long
+    ) {
+        val attempts: Long get() = hits + misses
+        val hitRate: Double get() = if (attempts == 0L) 0.0 else hits.toDouble() / attempts
+    }
+
+    private val counters = ConcurrentHashMap<String, Counter>()
+
+    @Volatile
+    private var restored = false
+
+    // Sum of all counts at the last write; counting never touches this
+    @Volatile
+    private var persistedTotal = 0L
+
+    /**
+     * Counter for a pattern, created on first use; the same instance is returned for
+     * the same (bank, field, pattern) so counts carry over when the rules are reloaded
+     */
+    fun counter(bank: String, field: String, pattern: String): Counter =
+        counters.getOrPut(keyOf(bank, field, pattern)) { Counter(bank, field, pattern) }
+
+    /**
+     * All counters, most-run patterns first
+     */
+    fun export(): List<Entry> =
+        counters.values
+            .map { Entry(it.bank, it.field, it.pattern, it.hitCount, it.missCount) }
+            .sortedWith(compareByDescending<Entry> { it.attempts }.thenBy { it.bank }.thenBy { it.field })
+
+    /**
+     * [export] as CSV (bank, field, hits, misses, hit_rate, pattern)
+     */
+    fun exportCsv(): String = buildString {
+        appendLine("bank,field,hits,misses,hit_rate,pattern")
+        export().forEach { entry ->
+            append(entry.bank).append(',')
+            append(entry.field).append(',')
+            append(entry.hits).append(',')
+            append(entry.misses).append(',')
+            append(String.format(Locale.US, "%.4f", entry.hitRate)).append(',')
+            append('"').append(entry.pattern.replace("\"", "\"\"")).append('"')
+            appendLine()
+        }
+    }
+
+    val size: Int get() = counters.size
+
+    /**
+     * Zero every counter (the counter instances held by built plans stay valid)
+     */
+    fun clear() {
+        counters.values.forEach { it.reset() }
+        persistedTotal = -1L
+    }
+
+    /**
+     * Add the persisted totals to the in-memory counters. Only the first call reads
+     * the file. Call from a background thread, before plans are built.
+     */
+    fun restore() {
+        val file = persistFile ?: return
+        synchronized(this) {
+            if (restored) return
+            restored = true
+            if (!file.exists()) return
+
+            try {
+                DataInputStream(file.inputStream().buffered()).use { input ->
+                    if (input.readInt() != FILE_MAGIC) return
+                    repeat(input.readInt()) {
+                        val bank = input.readUTF()
+                        val field = input.readUTF()
+                        val pattern = input.readUTF()
+                        val hits = input.readLong()
+                        val misses = input.readLong()
+                        counters.getOrPut(keyOf(bank, field, pattern)) { Counter(bank, field, pattern) }
+                            .add(hits, misses)
+                    }
+                }
+                persistedTotal = total(export())
+            } catch (e: Exception) {
+                // Losing telemetry is harmless; start counting again
+                file.delete()
+            }
+        }
+    }
+
+    /**
+     * Write the aggregate counts to disk if anything was counted since the last write.
+     * Blocking I/O - call from a background thread.
+     */
+    fun persist() {
+        val file = persistFile ?: return
+        val snapshot = export()
+        val total = total(snapshot)
+        if (total == persistedTotal) return
+
+        try {
+            val tmp = File(file.parentFile, file.name + ".tmp")
+            DataOutputStream(tmp.outputStream().buffered()).use { output ->
+                output.writeInt(FILE_MAGIC)
+                output.writeInt(snapshot.size)
+                snapshot.forEach { entry ->
+                    output.writeUTF(entry.bank)
+                    output.writeUTF(entry.field)
+                    output.writeUTF(entry.pattern)
+                    output.writeLong(entry.hits)
+                    output.writeLong(entry.misses)
+                }
+            }
+            if (tmp.renameTo(file)) {
+                persistedTotal = total
+            } else {
+                tmp.delete()
+            }
+        } catch (e: Exception) {
+            // Retried on the next persist
+        }
+    }
+
+    companion object {
+        /** Bank key of the plan used for senders that matched no bank */
+        const val FALLBACK_BANK = "*"
+
+        private const val FILE_MAGIC = 0x50535431  // "PST1"
+
+        private fun total(entries: List<Entry>): Long = entries.sumOf { it.attempts }
+
+        private fun keyOf(bank: String, field: String, pattern: String) = "$bank\u0000$field\u0000$pattern"
+    }
+}
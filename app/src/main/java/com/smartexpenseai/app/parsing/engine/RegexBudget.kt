@@ -0,0 +1,160 @@
+package com.smartexpenseai.app.parsing.engine
+
+import java.util.concurrent.Callable
+import java.util.concurrent.ExecutionException
+import java.util.concurrent.ExecutorService
+import java.util.concurrent.LinkedBlockingQueue
+import java.util.concurrent.ThreadPoolExecutor
+import java.util.concurrent.TimeUnit
+import java.util.concurrent.TimeoutException
+import java.util.concurrent.atomic.AtomicInteger
+
+/**
+ * How rule regexes are run against SMS bodies
+ */
+enum class RegexExecutionMode {
+    /** Plain java.util.regex on the parsing thread, no limit on backtracking */
+    DIRECT,
+
+    /** Patterns [BacktrackingAnalyzer] flags run under a per-pattern time limit */
+    BUDGETED
+}
+
+/**
+ * Time limit for the searches of one rule pattern
+ *
+ * A running java.util.regex search can't be stopped from outside. On Android the
+ * Matcher is backed by ICU: it copies the input with toString() and matches natively,
+ * so neither a counting CharSequence nor thread interruption ever reaches it. A bounded
+ * search therefore runs on a small pool of daemon threads while the parsing thread waits
+ * for it. The [timeoutMillis] clock starts when a worker picks the search up, so time
+ * spent queued behind other searches is not charged to the pattern; a search no worker
+ * has started by then is taken back and run on the calling thread instead. A search
+ * that runs out of time throws [RegexBudgetExceededException] and disables its pattern
+ * for the life of the rule set: the stuck search keeps its thread until it finishes on
+ * its own, so each bad pattern can hold at most one worker, and the pool size caps the
+ * total. Once the pool is full of stuck searches, every other bounded search runs on
+ * its caller, unbounded but still answered.
+ *
+ * Budgets belong to patterns, not rule sets. [RuleLoader] gives a bounded one only to
+ * patterns the analyzer flags for polynomial backtracking; the rest run directly on the
+ * parsing thread ([UNBOUNDED]), where handing them to a worker would cost more than the
+ * search. Exponential patterns never get this far.
+ */
+class RegexBudget private constructor(
+    val timeoutMillis: Long,
+    private val executor: ExecutorService
+) {
+
+    // Set once a search of this pattern runs out of time; never cleared
+    @Volatile
+    var isDisabled: Boolean = false
+        private set
+
+    val isBounded: Boolean
+        get() = timeoutMillis > 0
+
+    /**
+     * [Regex.find] on [text], throwing [RegexBudgetExceededException] when the search
+     * runs out of time or the pattern was disabled by an earlier one
+     */
+    fun find(regex: Regex, text: String): MatchResult? {
+        if (!isBounded) return regex.find(text)
+        if (isDisabled) throw RegexBudgetExceededException(regex.pattern, timeoutMillis)
+
+        val search = Search(regex, text)
+        val future = executor.submit(search)
+        var waitMillis = timeoutMillis
+        while (true) {
+            try {
+                return future.get(waitMillis, TimeUnit.MILLISECONDS)
+            } catch (e: TimeoutException) {
+                // Still queued behind busy workers: that says nothing about the pattern
+                if (search.takeBack()) return regex.find(text)
+
+                val remainingNanos = search.startedAtNanos + TimeUnit.MILLISECONDS.toNanos(timeoutMillis) - System.nanoTime()
+                if (remainingNanos <= 0) {
+                    future.cancel(true)
+                    isDisabled = true
+                    throw RegexBudgetExceededException(regex.pattern, timeoutMillis)
+                }
+                waitMillis = TimeUnit.NANOSECONDS.toMillis(remainingNanos) + 1
+            } catch (e: ExecutionException) {
+                throw e.cause ?: e
+            }
+        }
+    }
+
+    // One search handed to the pool; either the worker starts it or the caller takes it back
+    private class Search(private val regex: Regex, private val text: String) : Callable<MatchResult?> {
+        private val state = AtomicInteger(QUEUED)
+
+        // Written before the state leaves QUEUED, so a caller that sees RUNNING sees it too
+        @Volatile
+        var startedAtNanos: Long = 0L
+            private set
+
+        override fun call(): MatchResult? {
+            startedAtNanos = System.nanoTime()
+            if (!state.compareAndSet(QUEUED, RUNNING)) return null
+            return regex.find(text)
+        }
+
+        /** True when no worker had started the search; it will then never run there */
+        fun takeBack(): Boolean = state.compareAndSet(QUEUED, TAKEN_BACK)
+
+        private companion object {
+            const val QUEUED = 0
+            const val RUNNING = 1
+            const val TAKEN_BACK = 2
+        }
+    }
+
+    companion object {
+        // Generous for an SMS body: a well-behaved search takes well under a millisecond
+        const val DEFAULT_TIMEOUT_MS = 50L
+
+        private const val WATCHDOG_THREADS = 2
+        private const val WATCHDOG_KEEP_ALIVE_SECONDS = 30L
+
+        private val threadCount = AtomicInteger(0)
+
+        // Daemon threads that go away when idle, so an app that never meets a flagged
+        // pattern never starts one
+        private val WATCHDOG = ThreadPoolExecutor(
+            WATCHDOG_THREADS,
+            WATCHDOG_THREADS,
+            WATCHDOG_KEEP_ALIVE_SECONDS,
+            TimeUnit.SECONDS,
+            LinkedBlockingQueue<Runnable>()
+        ) { runnable ->
+            Thread(runnable, "regex-budget-${threadCount.incrementAndGet()}").apply { isDaemon = true }
+        }.apply { allowCoreThreadTimeOut(true) }
+
+        val UNBOUNDED = RegexBudget(0, WATCHDOG)
+
+        /**
+         * Fresh budget for one pattern; each call returns its own instance so disabling
+         * one pattern leaves the others alone
+         */
+        fun bounded(timeoutMillis: Long = DEFAULT_TIMEOUT_MS): RegexBudget = bounded(timeoutMillis, WATCHDOG)
+
+        // Tests pass their own pool so they can fill it
+        internal fun bounded(timeoutMillis: Long, executor: ExecutorService): RegexBudget {
+            require(timeoutMillis > 0) { "timeoutMillis must be positive" }
+            return RegexBudget(timeoutMillis, executor)
+        }
+
+        /**
+         * Budget for a pattern with [findings] from [BacktrackingAnalyzer] under [mode]
+         */
+        fun forPattern(mode: RegexExecutionMode, findings: List<BacktrackingAnalyzer.Finding>): RegexBudget =
+            if (mode == RegexExecutionMode.BUDGETED && findings.isNotEmpty()) bounded() else UNBOUNDED
+    }
+}
+
+/**
+ * Thrown when a regex search exceeds its [RegexBudget]
+ */
+class RegexBudgetExceededException(val pattern: String, val timeoutMillis: Long) :
+    RuntimeException("Regex exceeded $timeoutMillis ms: $pattern")
@@ -0,0 +1,117 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.smartexpenseai.app.parsing.models.BankRule
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import com.smartexpenseai.app.parsing.models.ConfidenceWeights
+import com.smartexpenseai.app.parsing.models.FallbackPatterns
+import com.smartexpenseai.app.parsing.models.MerchantCategoryRule
+import com.smartexpenseai.app.parsing.models.MerchantRulesConfig
+import com.smartexpenseai.app.parsing.models.TransactionPatterns
+import java.io.DataInputStream
+import java.io.IOException
+import java.io.InputStream
+
+/**
+ * Reader for the binary rule bundles produced at build time
+ *
+ * The `compileRuleBundles` Gradle task validates bank_rules.json and
+ * merchant_rules.json and writes them as length-prefixed binary files
+ * (DataOutputStream layout) into the generated assets. Reading those is a
+ * straight stream of primitives: no JSON tokenizing and no Gson reflection on
+ * the first SMS. The JSON files stay the source of truth; the bundle layout
+ * must match the writer in app/build.gradle.
+ */
+object RuleBundleReader {
+
+    const val BANK_RULES_BUNDLE = "bank_rules.bin"
+    const val MERCHANT_RULES_BUNDLE = "merchant_rules.bin"
+
+    private const val BANK_MAGIC = 0x53524231      // "SRB1"
+    private const val MERCHANT_MAGIC = 0x534d5231  // "SMR1"
+    private const val FORMAT_VERSION = 2
+
+    /**
+     * Bank rules read from a bundle, with the fingerprint of the JSON it was built from
+     */
+    class BankBundle(val rules: BankRulesSchema, val fingerprint: String)
+
+    fun readBankRules(input: InputStream): BankBundle {
+        DataInputStream(input.buffered()).use { data ->
+            readHeader(data, BANK_MAGIC)
+            val fingerprint = data.readUTF()
+            val version = data.readInt()
+            val banks = List(data.readInt()) {
+                BankRule(
+                    code = data.readUTF(),
+                    displayName = data.readUTF(),
+                    senderPatterns = readStrings(data),
+                    patterns = TransactionPatterns(
+                        amount = readStrings(data),
+                        merchant = readStrings(data),
+                        date = readOptionalStrings(data),
+                        transactionType = readOptionalStrings(data),
+                        referenceNumber = readOptionalStrings(data)
+                    ),
+                    confidenceWeights = if (data.readBoolean()) {
+                        ConfidenceWeights(
+                            senderMatch = data.readFloat(),
+                            amountExtraction = data.readFloat(),
+                            merchantExtraction = data.readFloat(),
+                            dateExtraction = data.readFloat(),
+                            referenceNumberExtraction = data.readFloat()
+                        )
+                    } else {
+                        null
+                    },
+                    strictOrder = readOptionalStrings(data)
+                )
+            }
+            val fallback = FallbackPatterns(
+                amount = readStrings(data),
+                merchant = readStrings(data),
+                referenceNumber = readOptionalStrings(data),
+                debitKeywords = readStrings(data),
+                creditKeywords = readStrings(data),
+                strictOrder = readOptionalStrings(data)
+            )
+            return BankBundle(BankRulesSchema(version, banks, fallback), fingerprint)
+        }
+    }
+
+    fun readMerchantRules(input: InputStream): MerchantRulesConfig {
+        DataInputStream(input.buffered()).use { data ->
+            readHeader(data, MERCHANT_MAGIC)
+            val version = data.readInt()
+            val lastUpdated = data.readUTF()
+            val description = if (data.readBoolean()) data.readUTF() else null
+            val categories = List(data.readInt()) {
+                MerchantCategoryRule(
+                    name = data.readUTF(),
+                    emoji = data.readUTF(),
+                    color = data.readUTF(),
+                    priority = data.readInt(),
+                    patterns = readStrings(data)
+                )
+            }
+            return MerchantRulesConfig(
+                version = version,
+                lastUpdated = lastUpdated,
+                description = description,
+                categories = categories,
+                fallbackCategory = data.readUTF()
+            )
+        }
+    }
+
+    private fun readHeader(data: DataInputStream, magic: Int) {
+        if (data.readInt() != magic) throw IOException("Not a rule bundle")
+        val format = data.readInt()
+        if (format != FORMAT_VERSION) throw IOException("Unsupported rule bundle format $format")
+    }
+
+    private fun readStrings(data: DataInputStream): List<String> =
+        List(data.readInt()) { data.readUTF() }
+
+    private fun readOptionalStrings(data: DataInputStream): List<String>? =
+        if (data.readBoolean()) readStrings(data) else null
+}
@@ -1,12 +1,15 @@
 package com.smartexpenseai.app.parsing.engine
 
 import android.content.Context
+import com.smartexpenseai.app.BuildConfig
 import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import com.smartexpenseai.app.utils.logging.StructuredLogger
 import com.google.gson.Gson
 import com.google.gson.JsonParseException
 import dagger.hilt.android.qualifiers.ApplicationContext
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.withContext
+import java.io.File
 import java.io.IOException
 import java.util.concurrent.ConcurrentHashMap
 import java.util.concurrent.atomic.AtomicReference
@@ -14,70 +17,122 @@ import javax.inject.Inject
 import javax.inject.Singleton
 
 /**
- * Thread-safe loader for bank SMS parsing rules with caching
- * Loads rules from assets/bank_rules.json and compiles regex patterns
+ * Thread-safe loader for bank SMS parsing rules
+ *
+ * Loads assets/bank_rules.json once into an immutable [CompiledRuleSet] (validated,
+ * patterns compiled, indexes built) and publishes it through an atomic reference.
+ * Parsers read it with the non-suspending [current]; [reload] builds a replacement
+ * off to the side and swaps it in, so readers never see a half-built rule set.
+ *
+ * The published rule set is process-wide: every RuleLoader instance (including the
+ * ones created outside Hilt) shares it instead of re-reading the JSON.
  */
 @Singleton
 class RuleLoader @Inject constructor(
     @ApplicationContext private val context: Context
 ) {
-    // Thread-safe cache for loaded rules
-    private val rulesCache = AtomicReference<BankRulesSchema?>(null)
+    private val logger = StructuredLogger("SMS_PARSING", "RuleLoader")
 
     // Cache for compiled regex patterns to avoid recompilation
     private val compiledRegexCache = ConcurrentHashMap<String, Regex>()
 
-    // Track if rules have been validated
-    private var isValidated = false
+    /**
+     * How extraction regexes run against SMS bodies. BUDGETED (the default) gives each
+     * pattern [BacktrackingAnalyzer] flags its own time limit so a pathological body
+     * can't stall parsing; applies to rule sets built after the change (next [load]
+     * after [clearCache], or [reload]).
+     */
+    @Volatile
+    var regexExecutionMode: RegexExecutionMode = RegexExecutionMode.BUDGETED
+
+    /**
+     * Cache of parse outcomes for messages already seen (rescans, sync overlap).
+     * Process-wide like the published rules it is keyed on, so every loader instance
+     * restores, fills and persists the same one.
+     */
+    val parseCache: ParseCache = sharedParseCache(context)
+
+    /**
+     * Hit/miss counters of every extraction pattern (process-wide, persisted in aggregate)
+     */
+    val patternStats: PatternStats = sharedPatternStats(context)
 
     companion object {
         private const val RULES_FILE_NAME = "bank_rules.json"
+        private const val PARSE_CACHE_FILE_NAME = "sms_parse_cache.bin"
+        private const val PATTERN_STATS_FILE_NAME = "sms_pattern_stats.bin"
+        private const val PREFS_NAME = "sms_parsing"
+        private const val PREF_ADAPTIVE_ORDER = "adaptive_pattern_order"
         private const val SUPPORTED_VERSION = 1
         private const val TAG = "RuleLoader"
-    }
 
-    /**
-     * Load bank rules from JSON file with caching
-     * Thread-safe and uses cached value if available
-     */
-    suspend fun loadRules(): Result<BankRulesSchema> = withContext(Dispatchers.IO) {
-        try {
-            // Return cached rules if available and validated
-            rulesCache.get()?.let { cached ->
-                if (isValidated) {
-                    return@withContext Result.success(cached)
-                }
+        // Currently published rule set, shared by all loader instances
+        private val published = AtomicReference<CompiledRuleSet?>(null)
+
+        // Serializes cold loads so concurrent first parses read the JSON once
+        private val loadLock = Any()
+
+        // Parse outcomes and counters outlive loader instances, like the published rules
+        @Volatile
+        private var patternStatsInstance: PatternStats? = null
+
+        @Volatile
+        private var parseCacheInstance: ParseCache? = null
+
+        private fun sharedParseCache(context: Context): ParseCache =
+            parseCacheInstance ?: synchronized(loadLock) {
+                parseCacheInstance ?: ParseCache(persistFile = File(context.cacheDir, PARSE_CACHE_FILE_NAME))
+                    .also { parseCacheInstance = it }
             }
 
-            // Load from assets
-            val json = context.assets.open(RULES_FILE_NAME).bufferedReader().use { it.readText() }
-            val rules = Gson().fromJson(json, BankRulesSchema::class.java)
+        private fun sharedPatternStats(context: Context): PatternStats =
+            patternStatsInstance ?: synchronized(loadLock) {
+                patternStatsInstance ?: PatternStats(File(context.filesDir, PATTERN_STATS_FILE_NAME))
+                    .also { patternStatsInstance = it }
+            }
+    }
 
-            // Validate schema
-            validateRules(rules)
+    /**
+     * The published rule set, or null if rules have not been loaded yet
+     * Never blocks or suspends
+     */
+    fun current(): CompiledRuleSet? = published.get()
 
-            // Cache the validated rules
-            rulesCache.set(rules)
-            isValidated = true
+    /**
+     * Get the published rule set, loading it on first use
+     * Returns immediately (no dispatcher hop) once rules are loaded
+     */
+    suspend fun load(): Result<CompiledRuleSet> {
+        published.get()?.let { return Result.success(it) }
 
-            // Pre-compile commonly used patterns
-            preCompilePatterns(rules)
+        return withContext(Dispatchers.IO) {
+            synchronized(loadLock) {
+                published.get()?.let { return@withContext Result.success(it) }
+                buildRuleSet().onSuccess { publish(it) }
+            }
+        }
+    }
 
-            Result.success(rules)
-        } catch (e: IOException) {
-            Result.failure(RuleLoadException("Failed to read rules file: ${e.message}", e))
-        } catch (e: JsonParseException) {
-            Result.failure(RuleLoadException("Invalid JSON format in rules file: ${e.message}", e))
-        } catch (e: ValidationException) {
-            Result.failure(e)
-        } catch (e: Exception) {
-            Result.failure(RuleLoadException("Unexpected error loading rules: ${e.message}", e))
+    /**
+     * Re-read the rules file and swap in the new rule set
+     * On failure the previously published rule set stays in place
+     */
+    suspend fun reload(): Result<CompiledRuleSet> = withContext(Dispatchers.IO) {
+        synchronized(loadLock) {
+            buildRuleSet().onSuccess { publish(it) }
         }
     }
 
+    /**
+     * Load bank rules from JSON file with caching
+     * Thread-safe and uses cached value if available
+     */
+    suspend fun loadRules(): Result<BankRulesSchema> = load().map { it.rules }
+
     /**
      * Get or compile a regex pattern with caching
-     * Thread-safe using ConcurrentHashMap
+     * Thread-safe using ConcurrentHashMap. Run extraction searches through the plan's
+     * [ExtractionPlan.Step.find] rather than calling find() directly, so budgets apply.
      */
     fun getCompiledRegex(pattern: String): Regex {
         return compiledRegexCache.getOrPut(pattern) {
@@ -89,26 +144,184 @@ class RuleLoader @Inject constructor(
         }
     }
 
+    /**
+     * Whether extraction patterns are ordered by observed hits (see [ExtractionPlan])
+     */
+    fun isAdaptiveOrderingEnabled(): Boolean =
+        context.getSharedPreferences(PREFS_NAME, Context.MODE_PRIVATE).getBoolean(PREF_ADAPTIVE_ORDER, false)
+
+    /**
+     * Turn adaptive pattern ordering on or off; takes effect on the next [reload]
+     */
+    fun setAdaptiveOrderingEnabled(enabled: Boolean) {
+        context.getSharedPreferences(PREFS_NAME, Context.MODE_PRIVATE)
+            .edit()
+            .putBoolean(PREF_ADAPTIVE_ORDER, enabled)
+            .apply()
+    }
+
+    /**
+     * Fingerprint of the currently loaded rules file (null until rules are loaded)
+     */
+    fun getRulesFingerprint(): String? = published.get()?.fingerprint
+
     /**
      * Clear all caches (useful for testing or force reload)
      */
     fun clearCache() {
-        rulesCache.set(null)
+        published.set(null)
         compiledRegexCache.clear()
-        isValidated = false
+        parseCache.clear()
     }
 
     /**
      * Get cache statistics for debugging
      */
     fun getCacheStats(): CacheStats {
+        val ruleSet = published.get()
         return CacheStats(
-            rulesLoaded = rulesCache.get() != null,
+            rulesLoaded = ruleSet != null,
             compiledPatternsCount = compiledRegexCache.size,
-            isValidated = isValidated
+            isValidated = ruleSet != null,
+            literalSenderCodes = ruleSet?.senderIndex?.literalCount ?: 0,
+            regexSenderPatterns = ruleSet?.senderIndex?.regexCount ?: 0,
+            extractionPlanRegexes = ruleSet?.extractionRegexCount ?: 0,
+            parseCacheSize = parseCache.size,
+            parseCacheHits = parseCache.hitCount,
+            parseCacheMisses = parseCache.missCount,
+            patternCounters = patternStats.size,
+            regexBudgeted = ruleSet?.regexExecutionMode == RegexExecutionMode.BUDGETED,
+            backtrackingRisks = ruleSet?.backtrackingRisks?.size ?: 0,
+            skippedPatterns = ruleSet?.skippedPatterns?.size ?: 0,
+            parseTimingEnabled = ParseTimings.enabled
         )
     }
 
+    /**
+     * Per-stage parse latencies recorded since the last [resetParseTimings]
+     * (empty unless timing was turned on with [setParseTimingEnabled])
+     */
+    fun getParseTimings(): List<ParseTimings.StageSummary> = ParseTimings.snapshot()
+
+    /**
+     * Turn per-stage parse timing on or off for this process; off costs one flag read per SMS
+     */
+    fun setParseTimingEnabled(enabled: Boolean) {
+        ParseTimings.enabled = enabled
+    }
+
+    fun resetParseTimings() {
+        ParseTimings.reset()
+    }
+
+    /**
+     * Read and compile the rules into a new rule set. Does not publish it.
+     *
+     * @param preferBundle Read the build-time bundle (validated by the compileRuleBundles
+     *   Gradle task) when it is packaged; otherwise, or when false, parse and validate the JSON
+     * @param stats Counters the extraction plans record into; the unit-test benchmark
+     *   passes its own to time builds without touching the persisted counts
+     */
+    internal fun buildRuleSet(
+        preferBundle: Boolean = true,
+        stats: PatternStats = patternStats
+    ): Result<CompiledRuleSet> {
+        return try {
+            val bundle = if (preferBundle) readBundle() else null
+            val rules: BankRulesSchema
+            val rulesFingerprint: String
+            if (bundle != null) {
+                rules = bundle.rules
+                rulesFingerprint = bundle.fingerprint
+            } else {
+                // Load from assets
+                val json = context.assets.open(RULES_FILE_NAME).bufferedReader().use { it.readText() }
+                rules = Gson().fromJson(json, BankRulesSchema::class.java)
+
+                // Validate schema
+                validateRules(rules)
+                rulesFingerprint = "${rules.version}:${Integer.toHexString(json.hashCode())}:${json.length}"
+            }
+            // Outcomes depend on the parser code as well as the rules, so an app update
+            // must not be served outcomes persisted by the previous version
+            val fingerprint = "$rulesFingerprint:app${BuildConfig.VERSION_CODE}"
+
+            // Runs for the bundle too: it is cheap, and a rules file edited outside the
+            // build (or a bundle from an older build) hasn't been through the Gradle check
+            val backtracking = checkBacktracking(rules)
+            val executionMode = regexExecutionMode
+
+            // Pre-compile commonly used patterns
+            preCompilePatterns(rules)
+
+            // Adaptive ordering needs the counts from earlier runs
+            stats.restore()
+            // Exponential patterns are left out of the plans like patterns that don't compile
+            val extractionPlans = ExtractionPlan.buildAll(
+                rules,
+                compile = { pattern ->
+                    if (pattern in backtracking.skipped) {
+                        throw RegexCompilationException("Skipped for catastrophic backtracking: $pattern")
+                    }
+                    getCompiledRegex(pattern)
+                },
+                stats = stats,
+                adaptive = isAdaptiveOrderingEnabled()
+            ) { pattern -> RegexBudget.forPattern(executionMode, backtracking.risky[pattern].orEmpty()) }
+
+            val setFingerprint = orderedFingerprint(fingerprint, extractionPlans)
+
+            Result.success(
+                CompiledRuleSet(
+                    rules = rules,
+                    fingerprint = setFingerprint,
+                    senderIndex = SenderIndex.build(rules, ::getCompiledRegex),
+                    prefilter = SmsPrefilter.build(rules.fallbackPatterns),
+                    extractionPlans = extractionPlans,
+                    regexExecutionMode = executionMode,
+                    backtrackingRisks = backtracking.risky.keys.toList(),
+                    skippedPatterns = backtracking.skipped.toList()
+                )
+            )
+        } catch (e: IOException) {
+            Result.failure(RuleLoadException("Failed to read rules file: ${e.message}", e))
+        } catch (e: JsonParseException) {
+            Result.failure(RuleLoadException("Invalid JSON format in rules file: ${e.message}", e))
+        } catch (e: ValidationException) {
+            Result.failure(e)
+        } catch (e: Exception) {
+            Result.failure(RuleLoadException("Unexpected error loading rules: ${e.message}", e))
+        }
+    }
+
+    // Null when the bundle isn't packaged (e.g. an IDE build that skipped the Gradle task)
+    private fun readBundle(): RuleBundleReader.BankBundle? {
+        return try {
+            context.assets.open(RuleBundleReader.BANK_RULES_BUNDLE).use { RuleBundleReader.readBankRules(it) }
+        } catch (e: IOException) {
+            null
+        }
+    }
+
+    // A reordered plan can extract differently, so cached outcomes must not be shared
+    // with file-order plans (or with a different adaptive order)
+    private fun orderedFingerprint(fingerprint: String, plans: List<ExtractionPlan>): String {
+        if (plans.none { it.reordered }) return fingerprint
+        val order = plans.joinToString("\n") { plan ->
+            listOf(plan.amount, plan.merchant, plan.date).joinToString("\t") { steps ->
+                steps.joinToString("\u0001") { it.regex.pattern }
+            }
+        }
+        return "$fingerprint:adaptive:${Integer.toHexString(order.hashCode())}"
+    }
+
+    private fun publish(ruleSet: CompiledRuleSet) {
+        published.set(ruleSet)
+
+        // Reuse parse outcomes persisted by a previous scan with the same rules
+        parseCache.restore(ruleSet.fingerprint)
+    }
+
     /**
      * Validate the loaded rules schema
      */
@@ -140,6 +353,8 @@ class RuleLoader @Inject constructor(
                 throw ValidationException("Bank ${bank.code} has no merchant patterns")
             }
 
+            validateStrictOrder(bank.strictOrder, "Bank ${bank.code}")
+
             // Validate confidence weights sum to reasonable value
             bank.confidenceWeights?.let { weights ->
                 val sum = weights.senderMatch + weights.amountExtraction +
@@ -160,6 +375,60 @@ class RuleLoader @Inject constructor(
         if (rules.fallbackPatterns.merchant.isEmpty()) {
             throw ValidationException("No fallback merchant patterns defined")
         }
+        validateStrictOrder(rules.fallbackPatterns.strictOrder, "Fallback patterns")
+    }
+
+    /**
+     * Patterns with polynomial risk (and their findings), which get a time budget, and
+     * patterns with exponential risk, which are left out of the extraction plans
+     */
+    private class BacktrackingCheck(
+        val risky: Map<String, List<BacktrackingAnalyzer.Finding>>,
+        val skipped: Set<String>
+    )
+
+    /**
+     * Run [BacktrackingAnalyzer] over every extraction pattern. Nothing here fails the
+     * load: the compileRuleBundles Gradle task rejects exponential patterns at build
+     * time, so one found at runtime is logged and skipped rather than taking every other
+     * rule down with it.
+     */
+    private fun checkBacktracking(rules: BankRulesSchema): BacktrackingCheck {
+        val owners = LinkedHashMap<String, String>()
+        rules.banks.forEach { bank ->
+            val patterns = bank.patterns
+            listOf(patterns.amount, patterns.merchant, patterns.date, patterns.transactionType, patterns.referenceNumber)
+                .forEach { list -> list?.forEach { owners.putIfAbsent(it, "Bank ${bank.code}") } }
+        }
+        val fallback = rules.fallbackPatterns
+        listOf(fallback.amount, fallback.merchant, fallback.referenceNumber)
+            .forEach { list -> list?.forEach { owners.putIfAbsent(it, "Fallback") } }
+
+        val risky = LinkedHashMap<String, List<BacktrackingAnalyzer.Finding>>()
+        val skipped = LinkedHashSet<String>()
+        owners.forEach { (pattern, owner) ->
+            val findings = BacktrackingAnalyzer.analyze(pattern)
+            val exponential = findings.firstOrNull { it.risk == BacktrackingAnalyzer.Risk.EXPONENTIAL }
+            if (exponential != null) {
+                skipped.add(pattern)
+                logger.error("checkBacktracking", "$owner pattern '$pattern' risks catastrophic backtracking (${exponential.reason}); skipping it")
+            } else if (findings.isNotEmpty()) {
+                risky[pattern] = findings
+                logger.debug("checkBacktracking", "$owner pattern '$pattern': ${findings.first().reason}")
+            }
+        }
+        if (risky.isNotEmpty()) {
+            logger.warn("checkBacktracking", "${risky.size} rule patterns risk polynomial backtracking on long bodies")
+        }
+        return BacktrackingCheck(risky, skipped)
+    }
+
+    private fun validateStrictOrder(fields: List<String>?, owner: String) {
+        fields?.forEach { field ->
+            if (field !in ExtractionPlan.FIELD_NAMES) {
+                throw ValidationException("$owner strict_order names unknown field '$field'")
+            }
+        }
     }
 
     /**
@@ -186,7 +455,18 @@ class RuleLoader @Inject constructor(
     data class CacheStats(
         val rulesLoaded: Boolean,
         val compiledPatternsCount: Int,
-        val isValidated: Boolean
+        val isValidated: Boolean,
+        val literalSenderCodes: Int = 0,
+        val regexSenderPatterns: Int = 0,
+        val extractionPlanRegexes: Int = 0,
+        val parseCacheSize: Int = 0,
+        val parseCacheHits: Long = 0,
+        val parseCacheMisses: Long = 0,
+        val patternCounters: Int = 0,
+        val regexBudgeted: Boolean = false,
+        val backtrackingRisks: Int = 0,
+        val skippedPatterns: Int = 0,
+        val parseTimingEnabled: Boolean = false
     )
 }
 
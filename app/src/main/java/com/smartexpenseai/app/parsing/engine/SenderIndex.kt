@@ -0,0 +1,138 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.smartexpenseai.app.parsing.models.BankRule
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+
+/**
+ * Prebuilt sender-to-bank lookup for [UnifiedSMSParser]
+ *
+ * Almost every `sender_patterns` entry in bank_rules.json is a literal sender code
+ * ("HDFCBK", "YESBNK", "VM-HDFC"), so instead of running every bank's patterns as
+ * regexes against every sender, literal codes are stored in a character trie and
+ * matched with a single walk over the sender. Only patterns that really use regex
+ * syntax fall back to [Regex.containsMatchIn].
+ *
+ * Semantics match the old linear scan exactly:
+ * - a pattern matches when it occurs anywhere in the sender (containsMatchIn)
+ * - matching is ASCII case-insensitive (RegexOption.IGNORE_CASE)
+ * - when several banks match, the one listed first in bank_rules.json wins
+ */
+class SenderIndex private constructor(
+    private val banks: List<BankRule>,
+    private val root: Node,
+    private val maxLiteralLength: Int,
+    private val regexPatterns: List<IndexedRegex>
+) {
+
+    private class Node {
+        val children = HashMap<Char, Node>(4)
+
+        // Lowest bank index whose literal code ends at this node
+        var bankIndex = NO_MATCH
+    }
+
+    private class IndexedRegex(val bankIndex: Int, val regex: Regex)
+
+    /** Number of literal sender codes stored in the trie */
+    var literalCount: Int = 0
+        private set
+
+    /** Distinct literal sender codes, upper-cased, in bank order */
+    var literalCodes: List<String> = emptyList()
+        private set
+
+    /** Number of sender patterns that need regex evaluation */
+    val regexCount: Int
+        get() = regexPatterns.size
+
+    /**
+     * Resolve the bank for an SMS sender, or null for non-bank senders.
+     * Cost is O(sender length x longest literal code) plus any true regex patterns
+     * belonging to banks listed before the best literal hit.
+     */
+    fun findBank(sender: String): BankRule? = banks.getOrNull(findBankIndex(sender))
+
+    /**
+     * Same as [findBank], returning the bank's index in the rules (-1 for non-bank senders)
+     */
+    fun findBankIndex(sender: String): Int {
+        var best = NO_MATCH
+
+        for (start in sender.indices) {
+            var node = root
+            var i = start
+            val end = minOf(sender.length, start + maxLiteralLength)
+            while (i < end) {
+                node = node.children[foldCase(sender[i])] ?: break
+                if (node.bankIndex < best) best = node.bankIndex
+                i++
+            }
+            // Bank 0 cannot be beaten
+            if (best == 0) return 0
+        }
+
+        // Regex patterns are kept in bank order, so only banks listed before the
+        // current best literal hit can still change the answer
+        for (entry in regexPatterns) {
+            if (entry.bankIndex >= best) break
+            if (entry.regex.containsMatchIn(sender)) {
+                best = entry.bankIndex
+                break
+            }
+        }
+
+        return if (best == NO_MATCH) -1 else best
+    }
+
+    private fun insertLiteral(code: String, bankIndex: Int) {
+        var node = root
+        for (c in code) {
+            node = node.children.getOrPut(foldCase(c)) { Node() }
+        }
+        if (bankIndex < node.bankIndex) node.bankIndex = bankIndex
+        literalCount++
+    }
+
+    companion object {
+        private const val NO_MATCH = Int.MAX_VALUE
+
+        // Any of these makes a sender pattern a real regex rather than a literal code
+        private const val REGEX_META_CHARS = "\\^$.|?*+()[]{}"
+
+        /**
+         * Build the index for a validated rule set
+         *
+         * @param compile Regex compiler for non-literal patterns (RuleLoader's cache)
+         */
+        fun build(rules: BankRulesSchema, compile: (String) -> Regex): SenderIndex {
+            val literals = mutableListOf<Pair<String, Int>>()
+            val regexes = mutableListOf<IndexedRegex>()
+
+            rules.banks.forEachIndexed { bankIndex, bank ->
+                bank.senderPatterns.forEach { pattern ->
+                    if (isLiteral(pattern)) {
+                        literals.add(pattern to bankIndex)
+                    } else {
+                        regexes.add(IndexedRegex(bankIndex, compile(pattern)))
+                    }
+                }
+            }
+
+            val index = SenderIndex(
+                banks = rules.banks,
+                root = Node(),
+                maxLiteralLength = literals.maxOfOrNull { it.first.length } ?: 0,
+                regexPatterns = regexes
+            )
+            literals.forEach { (code, bankIndex) -> index.insertLiteral(code, bankIndex) }
+            index.literalCodes = literals.map { (code, _) -> code.map(::foldCase).joinToString("") }.distinct()
+            return index
+        }
+
+        internal fun isLiteral(pattern: String): Boolean =
+            pattern.isNotEmpty() && pattern.none { it in REGEX_META_CHARS }
+
+        // IGNORE_CASE without UNICODE_CASE only folds US-ASCII letters
+        private fun foldCase(c: Char): Char = if (c in 'a'..'z') c - ('a' - 'A') else c
+    }
+}
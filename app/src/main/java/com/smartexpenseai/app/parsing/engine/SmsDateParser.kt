@@ -0,0 +1,158 @@
+package com.smartexpenseai.app.parsing.engine
+
+import java.util.TimeZone
+
+/**
+ * Hand-written tokenizer for the dates banks put in SMS bodies
+ *
+ * Replaces the SimpleDateFormat trial loop in [UnifiedSMSParser] (11 formats,
+ * a new formatter per attempt and an exception per miss). Accepts exactly what
+ * that loop accepted:
+ * - numeric dd-MM-yy, dd/MM/yy, dd.MM.yy
+ * - alpha-month dd-MMM-yy, dd/MMM/yy, dd MMM yy ("04-Jul-25", "4 July 2025")
+ * - both separators must be the same; anything after the year (a time) is ignored
+ * - a 2-digit year means 20yy, any other digit count is taken literally
+ * - day/month are validated strictly (no 31-Feb rollover)
+ *
+ * Returns local-midnight epoch millis, or [NO_DATE] when the text is not a date.
+ */
+object SmsDateParser {
+
+    const val NO_DATE = Long.MIN_VALUE
+
+    private const val MILLIS_PER_DAY = 86_400_000L
+
+    private val MONTH_NAMES = arrayOf(
+        "january", "february", "march", "april", "may", "june",
+        "july", "august", "september", "october", "november", "december"
+    )
+
+    fun parseEpochMillis(text: CharSequence): Long {
+        var i = skipBlanks(text, 0)
+
+        // Day
+        var day = 0
+        val dayStart = i
+        while (i < text.length && text[i].isAsciiDigit()) {
+            day = day * 10 + (text[i] - '0')
+            if (day > 31) return NO_DATE
+            i++
+        }
+        if (i == dayStart || i >= text.length) return NO_DATE
+
+        // First separator decides which month styles are allowed
+        val separator = text[i]
+        val allowNumericMonth = separator == '-' || separator == '/' || separator == '.'
+        val allowAlphaMonth = separator == '-' || separator == '/' || separator == ' '
+        if (!allowNumericMonth && !allowAlphaMonth) return NO_DATE
+        i = skipBlanks(text, i + 1)
+
+        // Month
+        var month = 0
+        if (i < text.length && text[i].isAsciiDigit()) {
+            if (!allowNumericMonth) return NO_DATE
+            while (i < text.length && text[i].isAsciiDigit()) {
+                month = month * 10 + (text[i] - '0')
+                if (month > 12) return NO_DATE
+                i++
+            }
+        } else {
+            if (!allowAlphaMonth) return NO_DATE
+            val matched = matchMonthName(text, i)
+            if (matched == 0) return NO_DATE
+            month = (matched shr 8)
+            i += matched and 0xFF
+        }
+        if (month < 1) return NO_DATE
+
+        // Second separator must repeat the first
+        if (i >= text.length || text[i] != separator) return NO_DATE
+        i = skipBlanks(text, i + 1)
+
+        // Year
+        var year = 0
+        var yearDigits = 0
+        while (i < text.length && text[i].isAsciiDigit()) {
+            if (yearDigits == 9) return NO_DATE
+            year = year * 10 + (text[i] - '0')
+            yearDigits++
+            i++
+        }
+        if (yearDigits == 0) return NO_DATE
+        if (yearDigits == 2) year += 2000
+        if (year < 1) return NO_DATE
+
+        if (day < 1 || day > daysInMonth(year, month)) return NO_DATE
+
+        return localMidnight(daysFromCivil(year, month, day))
+    }
+
+    /**
+     * Match a full or 3-letter English month name at [start], case-insensitively.
+     * Returns (month shl 8) or matchedLength, or 0 when nothing matches.
+     */
+    private fun matchMonthName(text: CharSequence, start: Int): Int {
+        for (m in MONTH_NAMES.indices) {
+            val name = MONTH_NAMES[m]
+            if (regionMatchesIgnoreCase(text, start, name, name.length)) {
+                return ((m + 1) shl 8) or name.length
+            }
+            if (regionMatchesIgnoreCase(text, start, name, 3)) {
+                return ((m + 1) shl 8) or 3
+            }
+        }
+        return 0
+    }
+
+    private fun regionMatchesIgnoreCase(text: CharSequence, start: Int, name: String, length: Int): Boolean {
+        if (start + length > text.length) return false
+        for (k in 0 until length) {
+            val c = text[start + k]
+            val lower = if (c in 'A'..'Z') c + ('a' - 'A') else c
+            if (lower != name[k]) return false
+        }
+        return true
+    }
+
+    // SimpleDateFormat skips spaces and tabs in front of every field
+    private fun skipBlanks(text: CharSequence, from: Int): Int {
+        var i = from
+        while (i < text.length && (text[i] == ' ' || text[i] == '\t')) i++
+        return i
+    }
+
+    private fun Char.isAsciiDigit(): Boolean = this in '0'..'9'
+
+    private fun daysInMonth(year: Int, month: Int): Int = when (month) {
+        2 -> if (isLeapYear(year)) 29 else 28
+        4, 6, 9, 11 -> 30
+        else -> 31
+    }
+
+    private fun isLeapYear(year: Int): Boolean =
+        (year % 4 == 0 && year % 100 != 0) || year % 400 == 0
+
+    /**
+     * Days since 1970-01-01 for a proleptic Gregorian date (Hinnant's algorithm)
+     */
+    private fun daysFromCivil(year: Int, month: Int, day: Int): Long {
+        val y = (if (month <= 2) year - 1 else year).toLong()
+        val era = (if (y >= 0) y else y - 399) / 400
+        val yearOfEra = y - era * 400
+        val monthIndex = (month + 9) % 12
+        val dayOfYear = (153 * monthIndex + 2) / 5 + day - 1
+        val dayOfEra = yearOfEra * 365 + yearOfEra / 4 - yearOfEra / 100 + dayOfYear
+        return era * 146097 + dayOfEra - 719468
+    }
+
+    /**
+     * Convert a day number to the epoch millis of local midnight, matching what
+     * SimpleDateFormat produced in the default time zone (second pass handles DST)
+     */
+    private fun localMidnight(epochDay: Long): Long {
+        val zone = TimeZone.getDefault()
+        val wallClock = epochDay * MILLIS_PER_DAY
+        val guess = wallClock - zone.getOffset(wallClock)
+        return wallClock - zone.getOffset(guess)
+    }
+}
@@ -0,0 +1,140 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.smartexpenseai.app.parsing.models.FallbackPatterns
+
+/**
+ * Single-pass classifier run before any field extraction
+ *
+ * Replaces the six separate NON_TRANSACTION_PATTERNS scans and the repeated
+ * `body.lowercase().contains(keyword)` loops in [UnifiedSMSParser]:
+ * - all non-transaction regexes are joined into one alternation, so OTP/promo
+ *   spam (most of the inbox) is rejected after a single regex scan
+ * - debit/credit keywords are matched with an Aho-Corasick automaton that
+ *   walks the body once, feeding both views the parser used to build:
+ *   the lowercased raw body and the lowercased alnum-only body
+ *
+ * Results are identical to the old checks, including which rejection reason
+ * is reported when several non-transaction patterns match.
+ */
+class SmsPrefilter private constructor(
+    private val keywords: AhoCorasickAutomaton,
+    // Bitmask of DEBIT / CREDIT keyword classes ending at each automaton state
+    private val stateMasks: IntArray
+) {
+
+    enum class Kind { REJECT, DEBIT, CREDIT, UNKNOWN }
+
+    /**
+     * @param kind Rejection, or the debit/credit keyword verdict on the alnum-only body
+     * @param rejectReason Human-readable reason when [kind] is [Kind.REJECT]
+     * @param hasTxnKeyword Whether the raw body contains any debit or credit keyword
+     */
+    class Verdict(
+        val kind: Kind,
+        val rejectReason: String?,
+        val hasTxnKeyword: Boolean
+    )
+
+    fun classify(body: String): Verdict {
+        rejectReason(body)?.let { reason ->
+            return Verdict(Kind.REJECT, reason, hasTxnKeyword = false)
+        }
+
+        var rawState = 0
+        var alnumState = 0
+        var rawHits = 0
+        var alnumHits = 0
+
+        for (c in body) {
+            val lower = c.lowercaseChar()
+            rawState = keywords.step(rawState, lower)
+            rawHits = rawHits or stateMasks[rawState]
+            if (c == CAPITAL_I_WITH_DOT) {
+                // String.lowercase() turns it into "i" + combining dot, not a bare 'i'
+                rawState = keywords.step(rawState, COMBINING_DOT_ABOVE)
+                rawHits = rawHits or stateMasks[rawState]
+            }
+
+            // Same mapping as body.replace(Regex("[^A-Za-z0-9\\s]"), " ")
+            val alnum = if (isAlnumOrSpace(c)) lower else ' '
+            alnumState = keywords.step(alnumState, alnum)
+            alnumHits = alnumHits or stateMasks[alnumState]
+        }
+
+        val kind = when {
+            alnumHits and DEBIT != 0 -> Kind.DEBIT
+            alnumHits and CREDIT != 0 -> Kind.CREDIT
+            else -> Kind.UNKNOWN
+        }
+        return Verdict(kind, rejectReason = null, hasTxnKeyword = rawHits != 0)
+    }
+
+    companion object {
+        private const val DEBIT = 1
+        private const val CREDIT = 2
+
+        private const val CAPITAL_I_WITH_DOT = '\u0130'
+        private const val COMBINING_DOT_ABOVE = '\u0307'
+
+        // SMS that mention amounts but are not completed transactions. Checked before
+        // extraction so future-autopay notices, UPI collect requests, bill reminders,
+        // OTPs and declined payments never enter the database. Order is priority order
+        // for the reported reason.
+        private val NON_TRANSACTION_PATTERNS = listOf(
+            "future autopay notice" to "will\\s+be\\s+debited",
+            "UPI collect request" to "has\\s+requested|requested\\s+money|payment\\s+request|collect\\s+request",
+            "OTP message" to "\\botp\\b|one\\s*time\\s*password",
+            "bill/due reminder" to "payment\\s+due|min(?:imum)?\\s+(?:amount\\s+)?due|due\\s+on|is\\s+due",
+            "declined transaction" to "insufficient\\s+balance|transaction\\s+(?:declined|failed)",
+            // Promotional offers name an amount and a card but are not spends. Markers
+            // (voucher / coupon / reward points / "T&C" / "by doing N Trxns") do not
+            // appear in genuine debit alerts, so this will not drop real transactions.
+            "promotional offer" to
+                "\\b(?:e-?voucher|voucher|gift\\s*card|coupon|reward\\s*points?)\\b" +
+                "|\\bt&c\\b|\\bterms\\s+(?:and|&)\\s+conditions\\b" +
+                "|\\bby\\s+doing\\s+\\d+\\s+(?:txn|trxn|transaction)s?\\b"
+        )
+
+        private val REJECT_REASONS = NON_TRANSACTION_PATTERNS.map { it.first }
+
+        private val REJECT_PATTERNS = NON_TRANSACTION_PATTERNS.map { (_, pattern) ->
+            Regex(pattern, RegexOption.IGNORE_CASE)
+        }
+
+        // One capturing group per pattern (the patterns themselves only use (?:...)),
+        // so the group index identifies which pattern produced the leftmost match
+        private val COMBINED_REJECT_REGEX = Regex(
+            NON_TRANSACTION_PATTERNS.joinToString("|") { (_, pattern) -> "($pattern)" },
+            RegexOption.IGNORE_CASE
+        )
+
+        fun build(fallbackPatterns: FallbackPatterns): SmsPrefilter {
+            val classified = fallbackPatterns.debitKeywords.map { it to DEBIT } +
+                fallbackPatterns.creditKeywords.map { it to CREDIT }
+            val automaton = AhoCorasickAutomaton(classified.map { it.first })
+            val stateMasks = IntArray(automaton.stateCount) { state ->
+                automaton.matches(state).fold(0) { mask, keyword -> mask or classified[keyword].second }
+            }
+            return SmsPrefilter(automaton, stateMasks)
+        }
+
+        private fun rejectReason(body: String): String? {
+            val match = COMBINED_REJECT_REGEX.find(body) ?: return null
+            val hit = (1..REJECT_PATTERNS.size).first { match.groups[it] != null } - 1
+
+            // The alternation reports the leftmost match; an earlier (higher priority)
+            // pattern may still match further along the body
+            for (i in 0 until hit) {
+                if (REJECT_PATTERNS[i].containsMatchIn(body)) return REJECT_REASONS[i]
+            }
+            return REJECT_REASONS[hit]
+        }
+
+        /**
+         * True for the characters `[A-Za-z0-9\s]` keeps; shared with [ParseContext.alnumBody]
+         */
+        internal fun isAlnumOrSpace(c: Char): Boolean =
+            c in 'a'..'z' || c in 'A'..'Z' || c in '0'..'9' ||
+                c == ' ' || c == '\t' || c == '\n' || c == '\u000B' || c == '\u000C' || c == '\r'
+    }
+}
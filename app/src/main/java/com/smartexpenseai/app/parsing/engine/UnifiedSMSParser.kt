@@ -1,13 +1,17 @@
 package com.smartexpenseai.app.parsing.engine
 
 import com.smartexpenseai.app.data.entities.TransactionEntity
-import com.smartexpenseai.app.parsing.models.BankRule
+import com.smartexpenseai.app.models.HistoricalSMS
 import com.smartexpenseai.app.parsing.models.BankRulesSchema
 import com.smartexpenseai.app.parsing.models.ConfidenceScore
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.ExperimentalCoroutinesApi
+import kotlinx.coroutines.async
+import kotlinx.coroutines.awaitAll
+import kotlinx.coroutines.flow.Flow
+import kotlinx.coroutines.flow.flow
 import kotlinx.coroutines.withContext
-import java.text.SimpleDateFormat
 import java.util.*
 import javax.inject.Inject
 import javax.inject.Singleton
@@ -24,53 +28,22 @@ class UnifiedSMSParser @Inject constructor(
     private val logger = StructuredLogger("SMS_PARSING", "UnifiedSMSParser")
 
     companion object {
-        // IMPORTANT: 2-digit year patterns MUST come first to prevent "yyyy" from accepting 2 digits as year 0-99
-        private val DATE_FORMATS = listOf(
-            "dd-MM-yy",      // Try 2-digit patterns first
-            "dd/MM/yy",
-            "dd.MM.yy",
-            "dd-MMM-yy",     // Alpha-month 2-digit ("04-Jul-25", common in SBI/HDFC/ICICI)
-            "dd/MMM/yy",
-            "dd MMM yy",
-            "dd-MM-yyyy",    // Then 4-digit patterns
-            "dd/MM/yyyy",
-            "dd-MMM-yyyy",
-            "dd/MMM/yyyy",
-            "dd MMM yyyy"
-        )
+        // Regex extraction is CPU-bound, so batches run on Default capped at the core count
+        private val PARSE_PARALLELISM = Runtime.getRuntime().availableProcessors().coerceAtLeast(1)
+
+        @OptIn(ExperimentalCoroutinesApi::class)
+        private val parseDispatcher = Dispatchers.Default.limitedParallelism(PARSE_PARALLELISM)
+
+        // Below this a slice isn't worth a coroutine of its own
+        private const val MIN_SLICE_SIZE = 16
+
+        private const val FLOW_BATCH_SIZE = 200
 
         // Alpha-month dates ("04-Jul-25") that the numeric bank date regexes miss
         private val ALPHA_MONTH_DATE_REGEX = Regex(
             "\\b(\\d{1,2}[-/ ](?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*[-/ ]\\d{2,4})\\b",
             RegexOption.IGNORE_CASE
         )
-
-        // Card identifier ("Card x1234" / "Card ending 1234" / "Card **1234") used to
-        // accept card-present transactions that carry no reference number
-        private val CARD_LAST4_REGEX = Regex(
-            "(?:card|crd)\\s*(?:no\\.?\\s*)?(?:number\\s*)?(?:ending(?:\\s+in)?\\s*|[xX*]+\\s*)?(\\d{4})\\b",
-            RegexOption.IGNORE_CASE
-        )
-
-        // SMS that mention amounts but are not completed transactions. Checked before
-        // extraction so future-autopay notices, UPI collect requests, bill reminders,
-        // OTPs and declined payments never enter the database.
-        private val NON_TRANSACTION_PATTERNS = listOf(
-            "future autopay notice" to Regex("will\\s+be\\s+debited", RegexOption.IGNORE_CASE),
-            "UPI collect request" to Regex("has\\s+requested|requested\\s+money|payment\\s+request|collect\\s+request", RegexOption.IGNORE_CASE),
-            "OTP message" to Regex("\\botp\\b|one\\s*time\\s*password", RegexOption.IGNORE_CASE),
-            "bill/due reminder" to Regex("payment\\s+due|min(?:imum)?\\s+(?:amount\\s+)?due|due\\s+on|is\\s+due", RegexOption.IGNORE_CASE),
-            "declined transaction" to Regex("insufficient\\s+balance|transaction\\s+(?:declined|failed)", RegexOption.IGNORE_CASE),
-            // Promotional offers name an amount and a card but are not spends. Markers
-            // (voucher / coupon / reward points / "T&C" / "by doing N Trxns") do not
-            // appear in genuine debit alerts, so this will not drop real transactions.
-            "promotional offer" to Regex(
-                "\\b(?:e-?voucher|voucher|gift\\s*card|coupon|reward\\s*points?)\\b" +
-                    "|\\bt&c\\b|\\bterms\\s+(?:and|&)\\s+conditions\\b" +
-                    "|\\bby\\s+doing\\s+\\d+\\s+(?:txn|trxn|transaction)s?\\b",
-                RegexOption.IGNORE_CASE
-            )
-        )
     }
 
     /**
@@ -81,277 +54,407 @@ class UnifiedSMSParser @Inject constructor(
         body: String,
         timestamp: Long
     ): ParseResult = withContext(Dispatchers.IO) {
-        try {
-            // Load rules
-            val rulesResult = ruleLoader.loadRules()
-            if (rulesResult.isFailure) {
-                logger.error("parseSMS", "Failed to load rules", rulesResult.exceptionOrNull())
-                return@withContext ParseResult.Failed("Rule loading failed")
-            }
+        // Published rule set; only the very first parse has to load it
+        val ruleSet = ruleLoader.current() ?: ruleLoader.load().getOrElse { e ->
+            logger.error("parseSMS", "Failed to load rules", e)
+            return@withContext ParseResult.Failed("Rule loading failed")
+        }
 
-            val rules = rulesResult.getOrNull()!!
+        parseWithRules(sender, body, timestamp, ruleSet)
+    }
 
-            // 0. Reject non-transactional SMS early (future autopay notices, UPI collect
-            // requests, OTPs, bill reminders) - these contain amounts but are not spends
-            NON_TRANSACTION_PATTERNS.forEach { (reason, pattern) ->
-                if (pattern.containsMatchIn(body)) {
-                    logger.debug("parseSMS", "Rejected non-transactional SMS ($reason): ${body.take(50)}...")
-                    return@withContext ParseResult.Failed("Non-transactional SMS: $reason")
+    /**
+     * Parse a batch of historical SMS, preserving input order
+     *
+     * The rule snapshot is resolved once for the whole batch and the CPU-bound regex
+     * work is split into contiguous slices that run on [parseDispatcher], so a large
+     * rescan scales with cores instead of running one message at a time on the IO pool.
+     */
+    suspend fun parseBatch(messages: List<HistoricalSMS>): List<ParseResult> {
+        if (messages.isEmpty()) return emptyList()
+
+        val ruleSet = ruleLoader.current() ?: ruleLoader.load().getOrElse { e ->
+            logger.error("parseBatch", "Failed to load rules", e)
+            return List(messages.size) { ParseResult.Failed("Rule loading failed") }
+        }
+
+        return withContext(parseDispatcher) {
+            val sliceSize = maxOf(MIN_SLICE_SIZE, (messages.size + PARSE_PARALLELISM - 1) / PARSE_PARALLELISM)
+            messages.chunked(sliceSize)
+                .map { slice ->
+                    async {
+                        slice.map { sms -> parseWithRules(sms.address, sms.body, sms.date.time, ruleSet) }
+                    }
                 }
-            }
+                .awaitAll()
+                .flatten()
+        }
+    }
 
-            // 1. Try to match sender to a bank
-            val bankRule = findMatchingBank(sender, rules)
-            val senderMatched = bankRule != null
-
-            // 2. Extract transaction fields
-            // NOTE: merchant extraction uses the RAW body - UPI VPA patterns ("merchant@ybl")
-            // need the '@' that the old special-character stripping removed
-            val amount = extractAmount(body, bankRule, rules)
-            val merchant = extractMerchant(body, bankRule, rules)
-            val date = extractDate(body, bankRule, timestamp)
-            val transactionType = extractTransactionType(body.replace(Regex("[^A-Za-z0-9\\s]"), " ").trim(), bankRule, rules)
-            var referenceNumber = extractReferenceNumber(body, bankRule, rules)
-
-            logger.debug("parseSMS", "Extracted referenceNumber: $referenceNumber for amount: $amount, merchant: $merchant")
-
-            // 3. Validate required fields (HARD REQUIREMENTS)
-            if (amount == null) {
-                logger.warn("parseSMS", "No amount found in SMS: ${body.take(50)}...")
-                return@withContext ParseResult.Failed("Amount not found")
-            }
+    /**
+     * Streaming variant of [parseBatch]: collects up to [batchSize] messages, parses
+     * them as one batch and emits each message with its result in input order
+     */
+    fun parseFlow(
+        messages: Flow<HistoricalSMS>,
+        batchSize: Int = FLOW_BATCH_SIZE
+    ): Flow<Pair<HistoricalSMS, ParseResult>> = flow {
+        val pending = ArrayList<HistoricalSMS>(batchSize)
+
+        suspend fun drain() {
+            val results = parseBatch(pending)
+            pending.forEachIndexed { index, sms -> emit(sms to results[index]) }
+            pending.clear()
+        }
 
-            // Zero/negative amounts are noise (fee reversals of 0, malformed SMS)
-            val numericAmount = amount.replace(",", "").toDoubleOrNull()
-            if (numericAmount == null || numericAmount <= 0.0) {
-                logger.warn("parseSMS", "Invalid amount '$amount' in SMS: ${body.take(50)}...")
-                return@withContext ParseResult.Failed("Invalid amount: $amount")
-            }
+        messages.collect { sms ->
+            pending.add(sms)
+            if (pending.size >= batchSize) drain()
+        }
+        if (pending.isNotEmpty()) drain()
+    }
 
-            // Card-present (POS) transactions frequently carry no reference number.
-            // If the SMS names a card AND uses an explicit debit/credit keyword,
-            // synthesize a pseudo-reference instead of rejecting it as promotional.
-            // IMPORTANT: derived from the SMS body hash, NOT the arrival timestamp,
-            // so the same SMS always produces the same ref and dedup keeps working
-            // across re-delivery and history rescans.
-            if (referenceNumber == null) {
-                val cardLast4 = CARD_LAST4_REGEX.find(body)?.groupValues?.get(1)
-                val bodyLower = body.lowercase()
-                val hasTxnKeyword = rules.fallbackPatterns.debitKeywords.any { bodyLower.contains(it) } ||
-                    rules.fallbackPatterns.creditKeywords.any { bodyLower.contains(it) }
-                if (cardLast4 != null && hasTxnKeyword) {
-                    val bodyHash = Integer.toHexString(body.trim().hashCode())
-                    referenceNumber = "CARD${cardLast4}H$bodyHash"
-                    logger.debug("parseSMS", "Card SMS without ref number - synthesized pseudo-ref $referenceNumber")
-                }
-            }
+    /**
+     * Write the parse-outcome cache to disk so the next cold-start rescan can reuse it
+     * Blocking I/O - call from a background dispatcher
+     */
+    fun persistParseCache() {
+        ruleLoader.parseCache.persist()
+    }
+
+    /**
+     * Write the aggregate per-pattern hit/miss counters to disk
+     * Blocking I/O - call from a background dispatcher
+     */
+    fun persistPatternStats() {
+        ruleLoader.patternStats.persist()
+    }
+
+    /**
+     * Literal bank sender codes, for narrowing an inbox query to plausible bank senders
+     * (an SMS can only match a bank if its sender contains one of them, ASCII case-insensitive).
+     * Null when rules failed to load or some sender pattern is a true regex.
+     */
+    suspend fun literalSenderCodes(): List<String>? {
+        val ruleSet = ruleLoader.current() ?: ruleLoader.load().getOrNull() ?: return null
+        val index = ruleSet.senderIndex
+        return if (index.regexCount == 0) index.literalCodes else null
+    }
+
+    /**
+     * Per-pattern hit/miss counters, most-run patterns first. Patterns with many
+     * misses and no hits cost a regex run on every message and are pruning candidates.
+     */
+    fun getPatternStats(): List<PatternStats.Entry> = ruleLoader.patternStats.export()
 
-            // CRITICAL: Reference number is MANDATORY for transaction SMS
-            if (referenceNumber == null) {
-                logger.warn("parseSMS", "No reference number found - likely promotional SMS: ${body.take(50)}...")
-                return@withContext ParseResult.Failed("Reference number not found (required for transaction SMS)")
+    /**
+     * Parse one SMS against an already-loaded rule snapshot
+     * Pure CPU work - safe to call concurrently from several threads
+     */
+    private fun parseWithRules(
+        sender: String,
+        body: String,
+        timestamp: Long,
+        ruleSet: CompiledRuleSet
+    ): ParseResult {
+        try {
+            // Derived body views are built lazily and shared by every step below
+            val context = ParseContext(sender, body, ruleSet.prefilter, timed = ParseTimings.enabled)
+            val start = startMark(context)
+
+            // Rescans see the same messages again; reuse the extraction when the
+            // rules haven't changed since it was computed
+            val fingerprint = ruleSet.fingerprint
+            val cached = ruleLoader.parseCache.get(fingerprint, sender, body)
+            lap(context, ParseTimings.Stage.CACHE_LOOKUP, start)
+            val extraction = cached ?: extractFields(context, ruleSet).also { fresh ->
+                // A search cut short by its budget may have missed a match
+                if (!context.budgetExceeded) ruleLoader.parseCache.put(fingerprint, sender, body, fresh)
             }
 
-            // 4. Calculate confidence score
-            val confidence = confidenceCalculator.calculate(
-                senderMatched = senderMatched,
-                bankRule = bankRule,
-                extractedAmount = amount,
-                extractedMerchant = merchant,
-                extractedDate = date.toString(),
-                extractedType = transactionType,
-                extractedReferenceNumber = referenceNumber,
-                smsBody = body
-            )
-
-            // 5. Create transaction entity
-            val transaction = createTransactionEntity(
-                sender = sender,
-                body = body,
-                timestamp = timestamp,
-                amount = amount,
-                merchant = merchant,
-                date = date,
-                transactionType = transactionType,
-                bankName = bankRule?.displayName,
-                referenceNumber = referenceNumber
-            )
-
-            // 6. Update transaction with calculated confidence score
-            val transactionWithConfidence = transaction.copy(
-                confidenceScore = confidence.overall
-            )
-
-            logger.debug("parseSMS", "Created TransactionEntity with referenceNumber: ${transactionWithConfidence.referenceNumber}")
-
-            ParseResult.Success(transactionWithConfidence, confidence)
+            val result = when (extraction) {
+                is ParseCache.Extraction.Rejected -> ParseResult.Failed(extraction.reason)
+                is ParseCache.Extraction.Extracted -> buildResult(extraction, context, timestamp, ruleSet.rules)
+            }
+            lap(context, ParseTimings.Stage.TOTAL, start)
+            return result
 
         } catch (e: Exception) {
             logger.error("parseSMS", "Parse error", e)
-            ParseResult.Failed("Parse exception: ${e.message}")
+            return ParseResult.Failed("Parse exception: ${e.message}")
         }
     }
 
     /**
-     * Find matching bank rule for sender
+     * Run the prefilter and field extractors - everything that does not depend on
+     * the arrival timestamp, so the outcome can be cached per (sender, body)
      */
-    private fun findMatchingBank(sender: String, rules: BankRulesSchema): BankRule? {
-        return rules.banks.firstOrNull { bank ->
-            bank.senderPatterns.any { pattern ->
-                try {
-                    val regex = ruleLoader.getCompiledRegex(pattern)
-                    regex.containsMatchIn(sender)
-                } catch (e: Exception) {
-                    logger.warn("findMatchingBank", "Invalid sender pattern: $pattern")
-                    false
-                }
+    private fun extractFields(
+        context: ParseContext,
+        ruleSet: CompiledRuleSet
+    ): ParseCache.Extraction {
+        val body = context.body
+        var mark = startMark(context)
+
+        // 0. Reject non-transactional SMS early (future autopay notices, UPI collect
+        // requests, OTPs, bill reminders) - these contain amounts but are not spends.
+        // The same pass collects the debit/credit keyword hits used further down.
+        val verdict = context.verdict
+        mark = lap(context, ParseTimings.Stage.PREFILTER, mark)
+        if (verdict.kind == SmsPrefilter.Kind.REJECT) {
+            logger.debug("parseSMS", "Rejected non-transactional SMS (${verdict.rejectReason}): ${body.take(50)}...")
+            return ParseCache.Extraction.Rejected("Non-transactional SMS: ${verdict.rejectReason}")
+        }
+
+        // 1. Try to match sender to a bank
+        val bankIndex = findMatchingBank(context.sender, ruleSet)
+        mark = lap(context, ParseTimings.Stage.SENDER_MATCH, mark)
+
+        val plan = ruleSet.extractionPlan(bankIndex)
+
+        // 2. Extract transaction fields
+        // NOTE: merchant extraction uses the RAW body - UPI VPA patterns ("merchant@ybl")
+        // need the '@' that the old special-character stripping removed
+        val amount = extractAmount(context, plan)
+        mark = lap(context, ParseTimings.Stage.AMOUNT, mark)
+        val merchant = extractMerchant(context, plan)
+        mark = lap(context, ParseTimings.Stage.MERCHANT, mark)
+        val dateMillis = extractDate(context, plan)
+        mark = lap(context, ParseTimings.Stage.DATE, mark)
+        val transactionType = extractTransactionType(context, plan)
+        mark = lap(context, ParseTimings.Stage.TRANSACTION_TYPE, mark)
+        var referenceNumber = extractReferenceNumber(context, plan)
+        lap(context, ParseTimings.Stage.REFERENCE, mark)
+
+        logger.debug("parseSMS", "Extracted referenceNumber: $referenceNumber for amount: $amount, merchant: $merchant")
+
+        // 3. Validate required fields (HARD REQUIREMENTS)
+        if (amount == null) {
+            logger.warn("parseSMS", "No amount found in SMS: ${body.take(50)}...")
+            return ParseCache.Extraction.Rejected("Amount not found")
+        }
+
+        // Zero/negative amounts are noise (fee reversals of 0, malformed SMS)
+        val numericAmount = amount.replace(",", "").toDoubleOrNull()
+        if (numericAmount == null || numericAmount <= 0.0) {
+            logger.warn("parseSMS", "Invalid amount '$amount' in SMS: ${body.take(50)}...")
+            return ParseCache.Extraction.Rejected("Invalid amount: $amount")
+        }
+
+        // Card-present (POS) transactions frequently carry no reference number.
+        // If the SMS names a card AND uses an explicit debit/credit keyword,
+        // synthesize a pseudo-reference instead of rejecting it as promotional.
+        // IMPORTANT: derived from the SMS body hash, NOT the arrival timestamp,
+        // so the same SMS always produces the same ref and dedup keeps working
+        // across re-delivery and history rescans.
+        if (referenceNumber == null) {
+            val cardLast4 = context.cardLast4
+            if (cardLast4 != null && verdict.hasTxnKeyword) {
+                val bodyHash = Integer.toHexString(body.trim().hashCode())
+                referenceNumber = "CARD${cardLast4}H$bodyHash"
+                logger.debug("parseSMS", "Card SMS without ref number - synthesized pseudo-ref $referenceNumber")
             }
         }
+
+        // CRITICAL: Reference number is MANDATORY for transaction SMS
+        if (referenceNumber == null) {
+            logger.warn("parseSMS", "No reference number found - likely promotional SMS: ${body.take(50)}...")
+            return ParseCache.Extraction.Rejected("Reference number not found (required for transaction SMS)")
+        }
+
+        return ParseCache.Extraction.Extracted(
+            bankIndex = bankIndex,
+            amount = amount,
+            merchant = merchant,
+            dateMillis = dateMillis,
+            transactionType = transactionType,
+            referenceNumber = referenceNumber
+        )
     }
 
     /**
-     * Extract amount from SMS body
+     * Turn extracted fields into a scored TransactionEntity for this delivery
      */
-    private fun extractAmount(
-        body: String,
-        bankRule: BankRule?,
+    private fun buildResult(
+        fields: ParseCache.Extraction.Extracted,
+        context: ParseContext,
+        timestamp: Long,
         rules: BankRulesSchema
-    ): String? {
-        // Try bank-specific patterns first
-        bankRule?.patterns?.amount?.forEach { pattern ->
-            val amount = tryExtractWithPattern(body, pattern)
-            if (amount != null) return amount
-        }
+    ): ParseResult {
+        val bankRule = rules.banks.getOrNull(fields.bankIndex)
+        var mark = startMark(context)
+
+        // Default to SMS timestamp when the body carries no date
+        val date = if (fields.dateMillis == SmsDateParser.NO_DATE) Date(timestamp) else Date(fields.dateMillis)
+
+        // 4. Calculate confidence score
+        val confidence = confidenceCalculator.calculate(
+            senderMatched = bankRule != null,
+            bankRule = bankRule,
+            extractedAmount = fields.amount,
+            extractedMerchant = fields.merchant,
+            extractedDate = date.toString(),
+            extractedType = fields.transactionType,
+            extractedReferenceNumber = fields.referenceNumber,
+            context = context
+        )
+        mark = lap(context, ParseTimings.Stage.CONFIDENCE, mark)
+
+        // 5. Create transaction entity
+        val transaction = createTransactionEntity(
+            sender = context.sender,
+            body = context.body,
+            timestamp = timestamp,
+            amount = fields.amount,
+            merchant = fields.merchant,
+            date = date,
+            transactionType = fields.transactionType,
+            bankName = bankRule?.displayName,
+            referenceNumber = fields.referenceNumber
+        )
 
-        // Fall back to generic patterns
-        rules.fallbackPatterns.amount.forEach { pattern ->
-            val amount = tryExtractWithPattern(body, pattern)
-            if (amount != null) return amount
-        }
+        // 6. Update transaction with calculated confidence score
+        val transactionWithConfidence = transaction.copy(
+            confidenceScore = confidence.overall
+        )
+        lap(context, ParseTimings.Stage.ENTITY, mark)
 
-        return null
+        logger.debug("parseSMS", "Created TransactionEntity with referenceNumber: ${transactionWithConfidence.referenceNumber}")
+
+        return ParseResult.Success(transactionWithConfidence, confidence)
     }
 
+    private fun startMark(context: ParseContext): Long = if (context.timed) System.nanoTime() else 0L
+
     /**
-     * Extract merchant from SMS body
+     * Record the time since [since] under [stage] and return the new mark
+     * (a no-op when the parse isn't timed)
      */
-    private fun extractMerchant(
-        body: String,
-        bankRule: BankRule?,
-        rules: BankRulesSchema
-    ): String? {
-        // Try bank-specific patterns first
-        bankRule?.patterns?.merchant?.forEach { pattern ->
-            val merchant = tryExtractWithPattern(body, pattern)
-            if (merchant != null) {
-                return cleanMerchantName(merchant)
-            }
-        }
+    private fun lap(context: ParseContext, stage: ParseTimings.Stage, since: Long): Long {
+        if (!context.timed) return 0L
+        val now = System.nanoTime()
+        ParseTimings.record(stage, now - since)
+        return now
+    }
 
-        // Fall back to generic patterns
-        rules.fallbackPatterns.merchant.forEach { pattern ->
-            val merchant = tryExtractWithPattern(body, pattern)
-            if (merchant != null) {
-                return cleanMerchantName(merchant)
-            }
+    /**
+     * Find matching bank for sender
+     * Uses the prebuilt sender index - literal codes are matched in one trie walk
+     *
+     * @return Index into [BankRulesSchema.banks], or -1 when no bank matched
+     */
+    private fun findMatchingBank(sender: String, ruleSet: CompiledRuleSet): Int {
+        return try {
+            ruleSet.senderIndex.findBankIndex(sender)
+        } catch (e: Exception) {
+            logger.warn("findMatchingBank", "Sender lookup failed for $sender: ${e.message}")
+            -1
         }
+    }
 
-        return null
+    /**
+     * Extract amount from SMS body (bank patterns, then generic fallbacks)
+     */
+    private fun extractAmount(context: ParseContext, plan: ExtractionPlan): String? {
+        return firstCapture(context, context.body, plan.amount)
+    }
+
+    /**
+     * Extract merchant from SMS body (bank patterns, then generic fallbacks)
+     */
+    private fun extractMerchant(context: ParseContext, plan: ExtractionPlan): String? {
+        return firstCapture(context, context.body, plan.merchant)?.let { cleanMerchantName(it) }
     }
 
     /**
      * Extract date from SMS body
+     * Returns local-midnight epoch millis, or SmsDateParser.NO_DATE if none is found
      */
-    private fun extractDate(
-        body: String,
-        bankRule: BankRule?,
-        defaultTimestamp: Long
-    ): Date {
+    private fun extractDate(context: ParseContext, plan: ExtractionPlan): Long {
+        val body = context.body
+
         // Try bank-specific date patterns
-        bankRule?.patterns?.date?.forEach { pattern ->
-            val dateStr = tryExtractWithPattern(body, pattern)
-            if (dateStr != null) {
-                val parsedDate = tryParseDate(dateStr)
-                if (parsedDate != null) return parsedDate
+        for (step in plan.date) {
+            val dateStr = tryExtract(context, body, step)
+            val parsed = if (dateStr != null) SmsDateParser.parseEpochMillis(dateStr) else SmsDateParser.NO_DATE
+            if (parsed != SmsDateParser.NO_DATE) {
+                step.counter.hit()
+                return parsed
             }
+            step.counter.miss()
         }
 
         // Alpha-month dates ("04-Jul-25") - the per-bank regexes are numeric-only
         ALPHA_MONTH_DATE_REGEX.find(body)?.groupValues?.get(1)?.let { dateStr ->
-            tryParseDate(dateStr)?.let { return it }
+            val parsed = SmsDateParser.parseEpochMillis(dateStr)
+            if (parsed != SmsDateParser.NO_DATE) return parsed
         }
 
-        // Default to SMS timestamp
-        return Date(defaultTimestamp)
+        return SmsDateParser.NO_DATE
     }
 
     /**
      * Extract transaction type (debit/credit)
      */
-    private fun extractTransactionType(
-        body: String,
-        bankRule: BankRule?,
-        rules: BankRulesSchema
-    ): String? {
-        val bodyLower = body.lowercase()
-
-        // Try bank-specific type patterns
-        bankRule?.patterns?.transactionType?.forEach { pattern ->
-            val type = tryExtractWithPattern(body, pattern)
-            if (type != null) {
-                // Handle BOB abbreviations (Dr. -> debit, Cr. -> credit)
-                val normalized = type.lowercase().trim('.', ' ')
-                return when (normalized) {
-                    "dr" -> "debit"
-                    "cr" -> "credit"
-                    else -> normalized
-                }
+    private fun extractTransactionType(context: ParseContext, plan: ExtractionPlan): String? {
+        // Try bank-specific type patterns (against the alnum-only view of the body)
+        firstCapture(context, context.alnumBody, plan.transactionType)?.let { type ->
+            // Handle BOB abbreviations (Dr. -> debit, Cr. -> credit)
+            val normalized = type.lowercase().trim('.', ' ')
+            return when (normalized) {
+                "dr" -> "debit"
+                "cr" -> "credit"
+                else -> normalized
             }
         }
 
-        // Check fallback keywords
-        if (rules.fallbackPatterns.debitKeywords.any { bodyLower.contains(it) }) {
-            return "debit"
-        }
-        if (rules.fallbackPatterns.creditKeywords.any { bodyLower.contains(it) }) {
-            return "credit"
+        // Fall back to the keyword verdict from the prefilter pass
+        when (context.verdict.kind) {
+            SmsPrefilter.Kind.DEBIT -> return "debit"
+            SmsPrefilter.Kind.CREDIT -> return "credit"
+            else -> Unit
         }
 
         return "debit" // Default to debit if unclear
     }
 
     /**
-     * Extract reference number from SMS body
+     * Extract reference number from SMS body (bank patterns, then generic fallbacks)
      */
-    private fun extractReferenceNumber(
-        body: String,
-        bankRule: BankRule?,
-        rules: BankRulesSchema
-    ): String? {
-        // Try bank-specific patterns first
-        bankRule?.patterns?.referenceNumber?.forEach { pattern ->
-            val refNum = tryExtractWithPattern(body, pattern)
-            if (refNum != null) return refNum
-        }
+    private fun extractReferenceNumber(context: ParseContext, plan: ExtractionPlan): String? {
+        return firstCapture(context, context.body, plan.referenceNumber)
+    }
 
-        // Fall back to generic patterns
-        rules.fallbackPatterns.referenceNumber?.forEach { pattern ->
-            val refNum = tryExtractWithPattern(body, pattern)
-            if (refNum != null) return refNum
+    /**
+     * First group-1 capture of the first pattern in the list that matches,
+     * counting a miss for every pattern tried before it
+     */
+    private fun firstCapture(context: ParseContext, text: String, steps: List<ExtractionPlan.Step>): String? {
+        for (step in steps) {
+            val value = tryExtract(context, text, step)
+            if (value != null) {
+                step.counter.hit()
+                return value
+            }
+            step.counter.miss()
         }
-
         return null
     }
 
     /**
-     * Try to extract value using a regex pattern
+     * Try to extract value using a precompiled regex
+     * A search that runs out of its pattern's time budget counts as no match, and
+     * marks the parse as not cacheable
      */
-    private fun tryExtractWithPattern(body: String, pattern: String): String? {
+    private fun tryExtract(context: ParseContext, text: String, step: ExtractionPlan.Step): String? {
         return try {
-            val regex = ruleLoader.getCompiledRegex(pattern)
-            regex.find(body)?.groupValues?.get(1)?.trim()
+            step.find(text)?.groupValues?.get(1)?.trim()
+        } catch (e: RegexBudgetExceededException) {
+            context.budgetExceeded = true
+            logger.warn("tryExtract", "Pattern gave up after ${e.timeoutMillis} ms on a ${text.length}-char body: ${step.regex.pattern}")
+            null
         } catch (e: Exception) {
-            logger.warn("tryExtractWithPattern", "Pattern match failed: $pattern")
+            logger.warn("tryExtract", "Pattern match failed: ${step.regex.pattern}")
             null
         }
     }
@@ -365,40 +468,6 @@ class UnifiedSMSParser @Inject constructor(
         return cleaned
     }
 
-    /**
-     * Try to parse date string with multiple formats
-     * Creates new SimpleDateFormat instances for thread safety
-     */
-    private fun tryParseDate(dateStr: String): Date? {
-        // Calendar for 2-digit year interpretation
-        val calendar = java.util.Calendar.getInstance()
-        calendar.set(2000, 0, 1) // Jan 1, 2000
-        val yearStartDate = calendar.time
-
-        // Title-case alpha months ("04-JUL-25" -> "04-Jul-25") so SimpleDateFormat
-        // matches them reliably, and normalize "/" or space separators to "-"
-        val normalized = dateStr.replace(
-            Regex("(?i)\\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)")
-        ) { m -> m.value.lowercase().replaceFirstChar { it.uppercase() } }
-        val candidates = if (normalized == dateStr) listOf(dateStr) else listOf(dateStr, normalized)
-
-        candidates.forEach { candidate ->
-            DATE_FORMATS.forEach { pattern ->
-                try {
-                    // Create new SimpleDateFormat for thread safety
-                    val format = SimpleDateFormat(pattern, Locale.ENGLISH)
-                    format.isLenient = false
-                    // Set 2-digit year start to interpret "yy" as 2000-2099
-                    format.set2DigitYearStart(yearStartDate)
-                    return format.parse(candidate)
-                } catch (e: Exception) {
-                    // Try next format
-                }
-            }
-        }
-        return null
-    }
-
     /**
      * Create TransactionEntity from parsed data
      */
@@ -416,7 +485,7 @@ class UnifiedSMSParser @Inject constructor(
         val cleanAmount = amount.replace(",", "").toDoubleOrNull() ?: 0.0
         val merchantName = merchant ?: "Unknown Merchant"
         // FIX: Use spaces instead of underscores to match repository normalization
-        val normalizedMerchant = merchantName.uppercase().replace(Regex("\\s+"), " ").trim()
+        val normalizedMerchant = MerchantNormalizer.canonical(merchantName)
         val now = Date()
 
         // FIX: Combine parsed date (from SMS) with current system time for accurate timestamp
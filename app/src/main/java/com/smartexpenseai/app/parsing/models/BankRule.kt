@@ -34,7 +34,10 @@ data class BankRule(
     val patterns: TransactionPatterns,
 
     @SerializedName("confidence_weights")
-    val confidenceWeights: ConfidenceWeights? = null
+    val confidenceWeights: ConfidenceWeights? = null,
+
+    @SerializedName("strict_order")
+    val strictOrder: List<String>? = null  // Fields whose pattern order must never be adapted
 )
 
 /**
@@ -94,7 +97,10 @@ data class FallbackPatterns(
     val debitKeywords: List<String>,
 
     @SerializedName("credit_keywords")
-    val creditKeywords: List<String>
+    val creditKeywords: List<String>,
+
+    @SerializedName("strict_order")
+    val strictOrder: List<String>? = null
 )
 
 /**
@@ -0,0 +1,162 @@
+package com.smartexpenseai.app.services
+
+import com.smartexpenseai.app.data.entities.TransactionEntity
+import com.smartexpenseai.app.utils.logging.StructuredLogger
+import kotlinx.coroutines.CompletableDeferred
+import kotlinx.coroutines.CoroutineScope
+import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.SupervisorJob
+import kotlinx.coroutines.channels.Channel
+import kotlinx.coroutines.channels.ClosedSendChannelException
+import kotlinx.coroutines.coroutineScope
+import kotlinx.coroutines.delay
+import kotlinx.coroutines.launch
+import kotlinx.coroutines.selects.select
+
+/**
+ * Bounded queue that stores parsed SMS transactions in group-committed batches
+ *
+ * Both ingestion paths feed it: the real-time receiver one message at a time and the
+ * historical scan a chunk at a time. A single consumer takes whatever is queued, waits
+ * up to [maxBatchWaitMillis] for more while the batch is below [maxBatchSize], and hands
+ * the batch to [writer], which stores it in one database transaction. A burst of SMS
+ * then costs one commit instead of one per row, and only one coroutine writes at a time.
+ *
+ * The channel holds at most `capacity` messages; [submitAll] suspends while it is full,
+ * so a fast scan is slowed to the writer's pace instead of buffering the inbox.
+ * Every message gets its own [Outcome], in submission order.
+ *
+ * The consumer runs in [scope]. Once that is cancelled, every message not yet stored
+ * completes with [Outcome.Failed], and so does every later submit.
+ */
+class SMSIngestionQueue(
+    private val writer: suspend (List<Candidate>) -> List<Outcome>,
+    private val maxBatchSize: Int = MAX_BATCH_SIZE,
+    private val maxBatchWaitMillis: Long = MAX_BATCH_WAIT_MS,
+    capacity: Int = CAPACITY,
+    scope: CoroutineScope = CoroutineScope(SupervisorJob() + Dispatchers.IO)
+) {
+    private val logger = StructuredLogger(
+        featureTag = "DATABASE",
+        className = "SMSIngestionQueue"
+    )
+
+    /**
+     * One parsed SMS to store
+     *
+     * @property checkSimilar Also reject it when a merchant/amount/bank/time-window lookup
+     *   finds a similar row (historical scans); the sms_id check always applies
+     */
+    data class Candidate(
+        val entity: TransactionEntity,
+        val checkSimilar: Boolean
+    )
+
+    sealed class Outcome {
+        /** Stored active and auto-categorized */
+        data class Inserted(val transactionId: Long) : Outcome()
+
+        /** Stored inactive because the user deleted the merchant */
+        data class Hidden(val transactionId: Long) : Outcome()
+
+        data class Duplicate(val reason: String) : Outcome()
+
+        data class Failed(val error: Throwable) : Outcome()
+    }
+
+    private class Pending(
+        val candidate: Candidate,
+        val outcome: CompletableDeferred<Outcome> = CompletableDeferred()
+    )
+
+    // An element the consumer never gets (channel closed, or cancelled while receiving)
+    // still resolves its caller instead of leaving submitAll waiting forever
+    private val channel = Channel<Pending>(
+        capacity = capacity,
+        onUndeliveredElement = { pending ->
+            pending.outcome.complete(Outcome.Failed(IllegalStateException("SMS ingestion queue dropped the message")))
+        }
+    )
+
+    init {
+        scope.launch { drain() }
+    }
+
+    suspend fun submit(candidate: Candidate): Outcome = submitAll(listOf(candidate)).single()
+
+    /**
+     * Queue [candidates] and wait until all of them are stored (or rejected)
+     */
+    suspend fun submitAll(candidates: List<Candidate>): List<Outcome> {
+        val pending = candidates.map { Pending(it) }
+        pending.forEach {
+            try {
+                channel.send(it)
+            } catch (e: ClosedSendChannelException) {
+                it.outcome.complete(Outcome.Failed(e))
+            }
+        }
+        return pending.map { it.outcome.await() }
+    }
+
+    private suspend fun drain() {
+        try {
+            for (first in channel) {
+                val batch = mutableListOf(first)
+                try {
+                    nextBatch(batch)
+                    val start = System.nanoTime()
+                    val outcomes = try {
+                        writer(batch.map { it.candidate })
+                    } catch (e: Exception) {
+                        logger.error("drain", "Failed to store batch of ${batch.size} SMS", e)
+                        List(batch.size) { Outcome.Failed(e) }
+                    }
+                    batch.forEachIndexed { index, pending ->
+                        pending.outcome.complete(outcomes.getOrElse(index) { Outcome.Failed(IllegalStateException("No outcome")) })
+                    }
+                    logger.debug("drain", "Committed batch of ${batch.size} SMS in ${(System.nanoTime() - start) / 1_000_000} ms")
+                } finally {
+                    // Cancelled mid-batch: these already left the channel, so nothing else will answer them
+                    batch.forEach { if (!it.outcome.isCompleted) it.outcome.complete(stopped()) }
+                }
+            }
+        } finally {
+            // Nothing will read the channel again: refuse new messages and fail the queued ones
+            channel.close()
+            while (true) {
+                val left = channel.tryReceive().getOrNull() ?: break
+                left.outcome.complete(stopped())
+            }
+        }
+    }
+
+    private fun stopped() = Outcome.Failed(IllegalStateException("SMS ingestion queue stopped"))
+
+    // Take what is already queued, then linger briefly for stragglers of the same burst.
+    // select either receives an element or doesn't; withTimeoutOrNull around receive
+    // could cancel after the element left the channel and lose it. The window is a
+    // delay on the consumer's dispatcher, not the wall clock, so it follows test time.
+    private suspend fun nextBatch(batch: MutableList<Pending>) = coroutineScope {
+        val deadline = launch { delay(maxBatchWaitMillis) }
+        while (batch.size < maxBatchSize) {
+            val queued = channel.tryReceive().getOrNull()
+            if (queued != null) {
+                batch += queued
+                continue
+            }
+            val next = select<Pending?> {
+                channel.onReceiveCatching { it.getOrNull() }
+                deadline.onJoin { null }
+            } ?: break
+            batch += next
+        }
+        deadline.cancel()
+    }
+
+    companion object {
+        const val MAX_BATCH_SIZE = 64
+        const val MAX_BATCH_WAIT_MS = 20L
+        const val CAPACITY = 256
+    }
+}
@@ -0,0 +1,166 @@
+package com.smartexpenseai.app.services
+
+import android.content.Context
+import android.content.Intent
+import com.smartexpenseai.app.data.entities.TransactionEntity
+import com.smartexpenseai.app.data.models.Transaction
+import com.smartexpenseai.app.data.repository.ExpenseRepository
+import com.smartexpenseai.app.notifications.TransactionNotificationManager
+import com.smartexpenseai.app.parsing.engine.ParseTimings
+import com.smartexpenseai.app.parsing.engine.RuleLoader
+import com.smartexpenseai.app.parsing.engine.UnifiedSMSParser
+import com.smartexpenseai.app.utils.logging.StructuredLogger
+import dagger.hilt.android.qualifiers.ApplicationContext
+import kotlinx.coroutines.CoroutineScope
+import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.SupervisorJob
+import kotlinx.coroutines.launch
+import kotlinx.coroutines.supervisorScope
+import javax.inject.Inject
+import javax.inject.Singleton
+
+/**
+ * Real-time SMS ingestion: reassemble, parse, store through the repository's
+ * [SMSIngestionQueue], notify
+ *
+ * One instance per process, so the parser, the published rule set and the repository
+ * stay warm between broadcasts; [warmUp] loads the rules at application start so the
+ * first SMS doesn't pay for the JSON read and regex compilation either. All work runs
+ * as children of this component's [SupervisorJob], so one failing message never cancels
+ * the others and nothing outlives the process-wide scope.
+ *
+ * Receiver-to-insert latency is recorded for every stored SMS under
+ * [ParseTimings.Stage.INGEST], whether or not per-stage parse timing is enabled.
+ */
+@Singleton
+class SMSIngestionService @Inject constructor(
+    @ApplicationContext private val context: Context,
+    private val unifiedParser: UnifiedSMSParser,
+    private val ruleLoader: RuleLoader,
+    private val repository: ExpenseRepository
+) {
+    private val logger = StructuredLogger(
+        featureTag = "SMSReceiver",
+        className = "SMSIngestionService"
+    )
+
+    private val scope = CoroutineScope(SupervisorJob() + Dispatchers.IO)
+    private val reassembler = SMSReassembler()
+
+    /**
+     * One logical SMS, all of its PDUs joined
+     *
+     * @property receivedAtNanos [System.nanoTime] when the receiver got the first part
+     */
+    data class IncomingSms(
+        val sender: String,
+        val body: String,
+        val timestamp: Long,
+        val receivedAtNanos: Long
+    )
+
+    /**
+     * Load and publish the rule set in the background; safe to call more than once
+     */
+    fun warmUp() {
+        scope.launch {
+            ruleLoader.load()
+                .onSuccess { logger.debug("warmUp", "Rules warm: ${it.rules.banks.size} banks") }
+                .onFailure { logger.error("warmUp", "Failed to preload rules", it) }
+        }
+    }
+
+    /**
+     * Reassemble multipart messages from [parts], ingest the resulting messages
+     * concurrently and call [onComplete] once all of them are done, successfully or not.
+     * Receivers pass `PendingResult::finish` here.
+     */
+    fun submit(parts: List<SMSReassembler.Part>, onComplete: () -> Unit) {
+        scope.launch {
+            try {
+                val messages = reassembler.assemble(parts)
+                if (messages.size < parts.size) {
+                    logger.debug("submit", "Joined ${parts.size} PDUs into ${messages.size} messages")
+                }
+                supervisorScope {
+                    messages.forEach { sms -> launch { ingest(sms) } }
+                }
+            } finally {
+                onComplete()
+            }
+        }
+    }
+
+    private suspend fun ingest(sms: IncomingSms) {
+        try {
+            val result = unifiedParser.parseSMS(sms.sender, sms.body, sms.timestamp)
+            if (result !is UnifiedSMSParser.ParseResult.Success) {
+                logger.warn("ingest", "Failed to parse transaction data from SMS: ${sms.sender}")
+                return
+            }
+            val transaction = result.transaction
+            logger.debug("ingest", "PARSED_FROM_SMS: ${transaction.normalizedMerchant} - ₹${transaction.amount} on Date ${transaction.createdAt}")
+
+            // Dedup by SMS ID only (reference number is already part of SMS ID), insert and
+            // categorization run in the ingestion queue's next batch
+            when (val outcome = repository.storeSmsTransaction(SMSIngestionQueue.Candidate(transaction, checkSimilar = false))) {
+                is SMSIngestionQueue.Outcome.Inserted -> {
+                    val latencyMillis = recordLatency(sms)
+                    logger.debug("ingest", "[SUCCESS] New transaction saved: ${transaction.normalizedMerchant} - ₹${transaction.amount} (${latencyMillis} ms after receipt)")
+                }
+                is SMSIngestionQueue.Outcome.Hidden -> {
+                    // Merchant previously deleted by the user: stored inactive silently -
+                    // no notification, no broadcast
+                    recordLatency(sms)
+                    logger.debug("ingest", "[AUTO-HIDDEN] Transaction from deleted merchant '${transaction.normalizedMerchant}' stored inactive")
+                    return
+                }
+                is SMSIngestionQueue.Outcome.Duplicate -> {
+                    logger.warn("ingest", "Duplicate transaction detected (${outcome.reason}), skipping: ${transaction.smsId}")
+                    return
+                }
+                is SMSIngestionQueue.Outcome.Failed -> {
+                    logger.error("ingest", "Failed to insert transaction into database", outcome.error)
+                    return
+                }
+            }
+
+            announce(transaction)
+        } catch (e: Exception) {
+            logger.error("ingest", "Error ingesting SMS from ${sms.sender}", e)
+        }
+    }
+
+    private fun recordLatency(sms: IncomingSms): Long {
+        val nanos = System.nanoTime() - sms.receivedAtNanos
+        ParseTimings.record(ParseTimings.Stage.INGEST, nanos)
+        return nanos / 1_000_000
+    }
+
+    private fun announce(transaction: TransactionEntity) {
+        TransactionNotificationManager(context).showNewTransactionNotification(
+            Transaction(
+                id = transaction.smsId,
+                amount = transaction.amount,
+                merchant = transaction.rawMerchant,
+                bankName = transaction.bankName,
+                category = "Pending", // Will be categorized by merchant mapping
+                date = transaction.transactionDate.time,
+                rawSMS = transaction.rawSmsBody,
+                confidence = transaction.confidenceScore
+            )
+        )
+
+        // Let other parts of the app know about the new transaction
+        val updateIntent = Intent(ACTION_NEW_TRANSACTION_ADDED)
+        updateIntent.putExtra("transaction_id", transaction.smsId)
+        updateIntent.putExtra("amount", transaction.amount)
+        updateIntent.putExtra("merchant", transaction.rawMerchant)
+        context.sendBroadcast(updateIntent)
+        logger.debug("announce", "[BROADCAST] Broadcast sent for new transaction: ${transaction.smsId}")
+    }
+
+    companion object {
+        private const val ACTION_NEW_TRANSACTION_ADDED = "com.expensemanager.NEW_TRANSACTION_ADDED"
+    }
+}
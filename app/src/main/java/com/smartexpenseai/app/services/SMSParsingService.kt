@@ -9,10 +9,16 @@ import com.smartexpenseai.app.models.ParsedTransaction
 import com.smartexpenseai.app.models.RejectedSMS
 import com.smartexpenseai.app.parsing.engine.UnifiedSMSParser
 import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.flow.Flow
+import kotlinx.coroutines.flow.buffer
+import kotlinx.coroutines.flow.flow
+import kotlinx.coroutines.flow.flowOn
 import kotlinx.coroutines.withContext
+import java.io.BufferedWriter
 import java.io.File
 import java.text.SimpleDateFormat
 import java.util.*
+import java.util.concurrent.TimeUnit
 import javax.inject.Inject
 import javax.inject.Singleton
 @Singleton
@@ -25,14 +31,61 @@ class SMSParsingService @Inject constructor(
         className = "SMSParsingService"
     )
     companion object {
-        private const val MONTHS_TO_SCAN = 6 // Scan last 6 months
-        private const val MAX_SMS_TO_PROCESS = 5000 // Limit SMS processing to prevent ANR
+        private const val MONTHS_TO_SCAN = 6 // Default range of a full scan
+        private const val SCAN_CHUNK_SIZE = 200 // Messages read, parsed and emitted together
+        private const val FALLBACK_SCAN_DAYS = 30L // Range of the non-bank-sender pass
+        private const val MAX_SENDER_CODES_IN_QUERY = 400 // Stay well below SQLite's 999 bound arguments
+        private val WHITESPACE_REGEX = Regex("\\s+")
     }
-    
+
+    /**
+     * Where a streaming scan stands after a chunk; pass it back as `resumeFrom`
+     * to continue the same scan after the last SMS of that chunk
+     *
+     * @property sinceMillis Lower DATE bound of the scan
+     * @property pass Sender pass the last SMS belongs to (see [scanHistoricalSMSFlow])
+     * @property passLayout Identifies the pass list [pass] indexes into
+     * @property date DATE of the last SMS scanned
+     * @property smsId Telephony _ID of the last SMS scanned (breaks DATE ties)
+     * @property chunkIndex Index of the chunk this position ends
+     * @property processed Messages scanned from the start of the scan, including earlier runs
+     */
+    data class ScanPosition(
+        val sinceMillis: Long,
+        val pass: Int,
+        val passLayout: Int,
+        val date: Long,
+        val smsId: Long,
+        val chunkIndex: Int,
+        val processed: Int
+    )
+
+    /**
+     * One chunk of a streaming scan
+     *
+     * @property transactions Accepted transactions from this chunk only
+     * @property processed Messages scanned so far, including this chunk and any resumed offset
+     * @property total Messages the scan covers in all, including any resumed offset
+     * @property accepted Transactions accepted by this run so far, including this chunk
+     * @property resumedFrom Messages already scanned by an earlier run (0 for a fresh scan)
+     * @property position Checkpoint after this chunk
+     */
+    data class ScanChunk(
+        val transactions: List<ParsedTransaction>,
+        val processed: Int,
+        val total: Int,
+        val accepted: Int,
+        val resumedFrom: Int,
+        val position: ScanPosition
+    )
+
     /**
      * Main method to scan historical SMS and extract valid transactions
      * This replaces both SMSHistoryReader.scanHistoricalSMS() and ExpenseRepository.readSMSTransactionsDirectly()
      *
+     * Collects [scanHistoricalSMSFlow] into one list; only accepted transactions are kept.
+     * Callers that store the results should collect the flow and insert per chunk instead.
+     *
      * @param sinceDate when provided, only SMS received after this date are read from the
      *                  content provider (incremental scan). Defaults to the last 6 months.
      */
@@ -41,141 +94,228 @@ class SMSParsingService @Inject constructor(
         progressCallback: ((current: Int, total: Int, status: String) -> Unit)? = null
     ): List<ParsedTransaction> = withContext(Dispatchers.IO) {
         val transactions = mutableListOf<ParsedTransaction>()
-        val rejectedSMSList = mutableListOf<RejectedSMS>()
-        var acceptedCount = 0
-        var rejectedCount = 0
-        var processedCount = 0
-        
+        var total = 0
+
         try {
             logger.debug(
                 where = "scanHistoricalSMS",
                 what = "[UNIFIED] Starting SMS scan using unified parsing service..."
             )
             progressCallback?.invoke(0, 100, "Reading SMS history...")
-            
-            val historicalSMS = readSMSHistory(sinceDate)
-            logger.debug(
+
+            scanHistoricalSMSFlow(sinceDate).collect { chunk ->
+                transactions.addAll(chunk.transactions)
+                total = chunk.total
+                val status = "Processed ${chunk.processed}/${chunk.total} messages • Found ${chunk.accepted} transactions"
+                progressCallback?.invoke(chunk.processed, chunk.total, status)
+            }
+
+            // Final progress update
+            progressCallback?.invoke(total, total, "Scan complete! Found ${transactions.size} transactions")
+
+        } catch (e: Exception) {
+            logger.error(
                 where = "scanHistoricalSMS",
-                what = "[UNIFIED] Found ${historicalSMS.size} historical SMS messages (limited to $MAX_SMS_TO_PROCESS)"
+                what = "[UNIFIED] Error scanning historical SMS",
+                throwable = e
             )
-            
-            val totalSMS = historicalSMS.size
-            progressCallback?.invoke(0, totalSMS, "Found $totalSMS messages, analyzing...")
-            
-            for (sms in historicalSMS) {
-                processedCount++
-
-                // Update progress callback every 100 messages for performance
-                if (processedCount % 100 == 0) {
-                    val status = "Processed $processedCount/$totalSMS messages • Found $acceptedCount transactions"
-                    progressCallback?.invoke(processedCount, totalSMS, status)
-                }
+            progressCallback?.invoke(0, 100, "Error: ${e.message}")
+        }
 
-                // Use new unified parser
-                val parseResult = unifiedParser.parseSMS(
-                    sender = sms.address,
-                    body = sms.body,
-                    timestamp = sms.date.time
-                )
+        return@withContext transactions
+    }
 
-                when (parseResult) {
-                    is UnifiedSMSParser.ParseResult.Success -> {
-                        // CRITICAL: Double-check reference number exists (additional safety)
-                        if (parseResult.transaction.referenceNumber.isNullOrBlank()) {
-                            logger.warn(
-                                where = "scanHistoricalSMS",
-                                what = "[REJECTED] Transaction has no reference number (conf=${String.format("%.2f", parseResult.confidence.overall)}) - likely promotional: ${sms.body.take(50)}..."
+    /**
+     * Stream the inbox as parsed chunks, newest SMS first
+     *
+     * The Telephony cursor is read [chunkSize] rows at a time; each chunk is parsed as
+     * one batch, its rejected SMS are appended to the rejected-SMS CSV, and the accepted
+     * transactions are emitted. At most one chunk is parsed ahead of the collector, so
+     * memory is bounded by the chunk size rather than the inbox size and there is no cap
+     * on the number of messages. Runs on [Dispatchers.IO]; errors reach the collector.
+     *
+     * When every bank sender pattern is a literal code, the scan runs in two passes so
+     * the content provider filters out personal SMS instead of copying them over:
+     * 1. SMS whose ADDRESS contains a bank code (the same test as the parser's sender index)
+     * 2. all other senders, for the generic fallback patterns, over the last
+     *    [FALLBACK_SCAN_DAYS] days only
+     *
+     * Within a pass SMS are read in (DATE, _ID) descending order, so a [ScanPosition]
+     * identifies exactly which messages are left.
+     *
+     * @param sinceDate Read only SMS received after this date; defaults to the last 6 months
+     * @param resumeFrom Continue an earlier scan after this position (its bound replaces [sinceDate]).
+     *   When the passes have changed since, e.g. new rules made a sender pattern a true
+     *   regex, the position means nothing in the new passes and the scan starts over.
+     */
+    fun scanHistoricalSMSFlow(
+        sinceDate: Date? = null,
+        resumeFrom: ScanPosition? = null,
+        chunkSize: Int = SCAN_CHUNK_SIZE
+    ): Flow<ScanChunk> = flow {
+        val startDate = resumeFrom?.sinceMillis
+            ?: sinceDate?.time
+            ?: Calendar.getInstance().apply { add(Calendar.MONTH, -MONTHS_TO_SCAN) }.timeInMillis
+        val passes = scanPasses(startDate)
+        val passLayout = passLayoutOf(passes)
+        val resume = resumeFrom?.takeIf { it.pass < passes.size && it.passLayout == passLayout }
+        if (resumeFrom != null && resume == null) {
+            logger.warn(
+                where = "scanHistoricalSMSFlow",
+                what = "Checkpoint in pass ${resumeFrom.pass} of another pass layout; rescanning from the first pass"
+            )
+        }
+        val resumedFrom = resume?.processed ?: 0
+        val firstPass = resume?.pass ?: 0
+        logger.debug(
+            where = "scanHistoricalSMSFlow",
+            what = "[UNIFIED] Querying SMS newer than ${Date(startDate)} in chunks of $chunkSize, ${passes.size} pass(es)" +
+                (resume?.let { " (resuming after ${it.processed} messages, pass ${it.pass}, chunk ${it.chunkIndex})" } ?: "")
+        )
+
+        val cursors = ArrayList<Pair<Int, Cursor>>(passes.size)
+        val rejectedLog = RejectedSmsLog()
+        try {
+            // Open every remaining pass up front so progress has a total from the start
+            for (passIndex in firstPass until passes.size) {
+                val after = resume?.takeIf { passIndex == firstPass }
+                querySMSHistory(passes[passIndex], after)?.let { cursors.add(passIndex to it) }
+            }
+            val total = resumedFrom + cursors.sumOf { (_, cursor) -> cursor.count }
+
+            val chunk = ArrayList<HistoricalSMS>(chunkSize)
+            var processed = resumedFrom
+            var accepted = 0
+            var chunkIndex = resume?.let { position -> position.chunkIndex + 1 } ?: 0
+
+            for ((passIndex, cursor) in cursors) {
+                val idIndex = cursor.getColumnIndexOrThrow(Telephony.Sms._ID)
+                val addressIndex = cursor.getColumnIndexOrThrow(Telephony.Sms.ADDRESS)
+                val bodyIndex = cursor.getColumnIndexOrThrow(Telephony.Sms.BODY)
+                val dateIndex = cursor.getColumnIndexOrThrow(Telephony.Sms.DATE)
+                val typeIndex = cursor.getColumnIndexOrThrow(Telephony.Sms.TYPE)
+
+                while (true) {
+                    chunk.clear()
+                    while (chunk.size < chunkSize && cursor.moveToNext()) {
+                        chunk.add(
+                            HistoricalSMS(
+                                id = cursor.getString(idIndex),
+                                address = cursor.getString(addressIndex) ?: "",
+                                body = cursor.getString(bodyIndex) ?: "",
+                                date = Date(cursor.getLong(dateIndex)),
+                                type = cursor.getInt(typeIndex)
                             )
-                            rejectedSMSList.add(RejectedSMS(
-                                sender = sms.address,
-                                body = sms.body.replace(Regex("\\s+"), " ").trim(),
-                                date = sms.date,
-                                reason = "No reference number (required for transaction SMS)"
-                            ))
-                            rejectedCount++
-                            continue
-                        }
-
-                        // Convert TransactionEntity to ParsedTransaction
-                        val transaction = ParsedTransaction(
-                            id = "hist_${sms.id}",
-                            amount = parseResult.transaction.amount,
-                            merchant = parseResult.transaction.rawMerchant,
-                            bankName = parseResult.transaction.bankName,
-                            date = parseResult.transaction.transactionDate,
-                            rawSMS = parseResult.transaction.rawSmsBody,
-                            confidence = parseResult.confidence.overall,
-                            isDebit = parseResult.transaction.isDebit,
-                            referenceNumber = parseResult.transaction.referenceNumber,
-                            senderAddress = sms.address  // CRITICAL: Pass SMS sender for consistent ID generation
                         )
-
-                        // Only accept if confidence is reasonable
-                        // Threshold: 0.65 minimum confidence score
-                        if (parseResult.confidence.overall >= 0.65f) {
-                            transactions.add(transaction)
-                            acceptedCount++
-                        } else {
-                            rejectedSMSList.add(RejectedSMS(
-                                sender = sms.address,
-                                body = sms.body.replace(Regex("\\s+"), " ").trim(),
-                                date = sms.date,
-                                reason = "Low confidence (${String.format("%.2f", parseResult.confidence.overall)})"
-                            ))
-                            rejectedCount++
-                        }
                     }
-                    is UnifiedSMSParser.ParseResult.Failed -> {
-                        // Failed parsing - could be non-bank SMS or parsing error
-                        rejectedSMSList.add(RejectedSMS(
-                            sender = sms.address,
-                            body = sms.body.replace(Regex("\\s+"), " ").trim(),
-                            date = sms.date,
-                            reason = "Parse failed: ${parseResult.reason}"
-                        ))
-                        // Otherwise, skip silently (not a bank SMS)
+                    if (chunk.isEmpty()) break
+
+                    // The parser resolves rules once per batch and spreads the regex work across cores
+                    val results = unifiedParser.parseBatch(chunk)
+                    val transactions = chunk.indices.mapNotNull { index ->
+                        acceptOrReject(chunk[index], results[index], rejectedLog)
                     }
+
+                    processed += chunk.size
+                    accepted += transactions.size
+                    val last = chunk.last()
+                    val position = ScanPosition(startDate, passIndex, passLayout, last.date.time, last.id.toLong(), chunkIndex++, processed)
+                    emit(ScanChunk(transactions, processed, total, accepted, resumedFrom, position))
                 }
+            }
 
-                // Yield occasionally to prevent ANR
-                if (processedCount % 100 == 0) {
-                    kotlinx.coroutines.yield()
+            // Keep parse outcomes so overlapping rescans skip the regex work
+            unifiedParser.persistParseCache()
+            unifiedParser.persistPatternStats()
+        } finally {
+            cursors.forEach { (_, cursor) -> cursor.close() }
+            rejectedLog.close()
+        }
+    }.buffer(1).flowOn(Dispatchers.IO)
+
+    /**
+     * Which senders one pass of a scan reads, and from when
+     *
+     * @property senderCodes Bank codes matched against ADDRESS; null reads every sender
+     * @property excludeCodes Read senders matching none of [senderCodes] instead
+     */
+    private class ScanPass(
+        val sinceMillis: Long,
+        val senderCodes: List<String>?,
+        val excludeCodes: Boolean
+    )
+
+    private suspend fun scanPasses(startDate: Long): List<ScanPass> {
+        // Null when a sender pattern is a true regex, which LIKE can't express exactly
+        val codes = unifiedParser.literalSenderCodes()
+        if (codes.isNullOrEmpty() || codes.size > MAX_SENDER_CODES_IN_QUERY) {
+            return listOf(ScanPass(startDate, senderCodes = null, excludeCodes = false))
+        }
+        val fallbackSince = maxOf(startDate, System.currentTimeMillis() - TimeUnit.DAYS.toMillis(FALLBACK_SCAN_DAYS))
+        return listOf(
+            ScanPass(startDate, codes, excludeCodes = false),
+            ScanPass(fallbackSince, codes, excludeCodes = true)
+        )
+    }
+
+    // Which senders each pass reads, in order. Pass bounds are left out: the fallback
+    // pass's window follows the clock, so it differs between runs of the same scan.
+    private fun passLayoutOf(passes: List<ScanPass>): Int =
+        passes.map { it.senderCodes to it.excludeCodes }.hashCode()
+
+    /**
+     * Convert one parse result to a transaction, or record why the SMS was rejected
+     */
+    private fun acceptOrReject(
+        sms: HistoricalSMS,
+        parseResult: UnifiedSMSParser.ParseResult,
+        rejectedLog: RejectedSmsLog
+    ): ParsedTransaction? {
+        return when (parseResult) {
+            is UnifiedSMSParser.ParseResult.Success -> {
+                // CRITICAL: Double-check reference number exists (additional safety)
+                if (parseResult.transaction.referenceNumber.isNullOrBlank()) {
+                    logger.warn(
+                        where = "scanHistoricalSMS",
+                        what = "[REJECTED] Transaction has no reference number (conf=${String.format("%.2f", parseResult.confidence.overall)}) - likely promotional: ${sms.body.take(50)}..."
+                    )
+                    rejectedLog.add(sms, "No reference number (required for transaction SMS)")
+                    return null
+                }
+
+                // Only accept if confidence is reasonable
+                // Threshold: 0.65 minimum confidence score
+                if (parseResult.confidence.overall < 0.65f) {
+                    rejectedLog.add(sms, "Low confidence (${String.format("%.2f", parseResult.confidence.overall)})")
+                    return null
                 }
+
+                // Convert TransactionEntity to ParsedTransaction
+                ParsedTransaction(
+                    id = "hist_${sms.id}",
+                    amount = parseResult.transaction.amount,
+                    merchant = parseResult.transaction.rawMerchant,
+                    bankName = parseResult.transaction.bankName,
+                    date = parseResult.transaction.transactionDate,
+                    rawSMS = parseResult.transaction.rawSmsBody,
+                    confidence = parseResult.confidence.overall,
+                    isDebit = parseResult.transaction.isDebit,
+                    referenceNumber = parseResult.transaction.referenceNumber,
+                    senderAddress = sms.address  // CRITICAL: Pass SMS sender for consistent ID generation
+                )
             }
-            
-            // Save rejected SMS to CSV file
-            if (rejectedSMSList.isNotEmpty()) {
-                saveRejectedSMSToCSV(rejectedSMSList)
+            is UnifiedSMSParser.ParseResult.Failed -> {
+                // Failed parsing - could be non-bank SMS or parsing error
+                rejectedLog.add(sms, "Parse failed: ${parseResult.reason}")
+                null
             }
-            
-            // Final progress update
-            progressCallback?.invoke(totalSMS, totalSMS, "Scan complete! Found $acceptedCount transactions")
-            
-        } catch (e: Exception) {
-            logger.error(
-                where = "scanHistoricalSMS",
-                what = "[UNIFIED] Error scanning historical SMS",
-                throwable = e
-            )
-            progressCallback?.invoke(0, 100, "Error: ${e.message}")
         }
-        
-        return@withContext transactions
     }
-    
+
     /**
-     * Read SMS history from device content provider
+     * Query the inbox for one pass (and after [resumeFrom]), newest first
      */
-    private fun readSMSHistory(sinceDate: Date? = null): List<HistoricalSMS> {
-        val smsList = mutableListOf<HistoricalSMS>()
-
-        // Default range: last 6 months. Incremental scans pass the last sync date so the
-        // content provider only returns SMS newer than what is already in the database.
-        val calendar = Calendar.getInstance()
-        calendar.add(Calendar.MONTH, -MONTHS_TO_SCAN)
-        val sixMonthsAgo = calendar.timeInMillis
-        val startDate = sinceDate?.time?.coerceAtLeast(sixMonthsAgo) ?: sixMonthsAgo
-        
+    private fun querySMSHistory(pass: ScanPass, resumeFrom: ScanPosition?): Cursor? {
         val uri = Telephony.Sms.CONTENT_URI
         val projection = arrayOf(
             Telephony.Sms._ID,
@@ -184,53 +324,109 @@ class SMSParsingService @Inject constructor(
             Telephony.Sms.DATE,
             Telephony.Sms.TYPE
         )
-        
-        val selection = "${Telephony.Sms.DATE} > ? AND ${Telephony.Sms.TYPE} = ?"
-        val selectionArgs = arrayOf(
-            startDate.toString(),
+
+        var selection = "${Telephony.Sms.DATE} > ? AND ${Telephony.Sms.TYPE} = ?"
+        var selectionArgs = arrayOf(
+            pass.sinceMillis.toString(),
             Telephony.Sms.MESSAGE_TYPE_INBOX.toString()
         )
-        val sortOrder = "${Telephony.Sms.DATE} DESC LIMIT $MAX_SMS_TO_PROCESS" // Newest first, limited
-        
-        var cursor: Cursor? = null
-        try {
-            logger.debug(
-                where = "readSMSHistory",
-                what = "[UNIFIED] Querying SMS newer than ${Date(startDate)} (max $MAX_SMS_TO_PROCESS messages)"
-            )
-            cursor = context.contentResolver.query(
-                uri, projection, selection, selectionArgs, sortOrder
+        pass.senderCodes?.let { codes ->
+            // LIKE is ASCII case-insensitive, like the sender index's contains test
+            val anyCode = codes.joinToString(" OR ") { "${Telephony.Sms.ADDRESS} LIKE ? ESCAPE '\\'" }
+            // A NULL address matches no LIKE, so it belongs to the excluded pass
+            selection += if (pass.excludeCodes) {
+                " AND (${Telephony.Sms.ADDRESS} IS NULL OR NOT ($anyCode))"
+            } else {
+                " AND ($anyCode)"
+            }
+            selectionArgs += codes.map { "%" + escapeLike(it) + "%" }
+        }
+        if (resumeFrom != null) {
+            // Everything after the checkpoint in (DATE, _ID) descending order
+            selection += " AND (${Telephony.Sms.DATE} < ? OR (${Telephony.Sms.DATE} = ? AND ${Telephony.Sms._ID} < ?))"
+            selectionArgs += arrayOf(resumeFrom.date.toString(), resumeFrom.date.toString(), resumeFrom.smsId.toString())
+        }
+        val sortOrder = "${Telephony.Sms.DATE} DESC, ${Telephony.Sms._ID} DESC"
+
+        return context.contentResolver.query(uri, projection, selection, selectionArgs, sortOrder)
+    }
+
+    private fun escapeLike(code: String): String =
+        code.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    /**
+     * Rejected SMS of one scan, appended to a CSV as they occur
+     * The file is created on the first rejection
+     */
+    private inner class RejectedSmsLog {
+        private var writer: BufferedWriter? = null
+        private var failed = false
+        private val dateFormat = SimpleDateFormat("yyyy-MM-dd HH:mm:ss", Locale.getDefault())
+
+        fun add(sms: HistoricalSMS, reason: String) {
+            val out = writer ?: open() ?: return
+            val rejectedSMS = RejectedSMS(
+                sender = sms.address,
+                body = sms.body.replace(WHITESPACE_REGEX, " ").trim(),
+                date = sms.date,
+                reason = reason
             )
-            
-            cursor?.let {
-                val idIndex = it.getColumnIndexOrThrow(Telephony.Sms._ID)
-                val addressIndex = it.getColumnIndexOrThrow(Telephony.Sms.ADDRESS)
-                val bodyIndex = it.getColumnIndexOrThrow(Telephony.Sms.BODY)
-                val dateIndex = it.getColumnIndexOrThrow(Telephony.Sms.DATE)
-                val typeIndex = it.getColumnIndexOrThrow(Telephony.Sms.TYPE)
-                
-                while (it.moveToNext()) {
-                    val sms = HistoricalSMS(
-                        id = it.getString(idIndex),
-                        address = it.getString(addressIndex) ?: "",
-                        body = it.getString(bodyIndex) ?: "",
-                        date = Date(it.getLong(dateIndex)),
-                        type = it.getInt(typeIndex)
-                    )
-                    smsList.add(sms)
+            try {
+                val dateStr = dateFormat.format(rejectedSMS.date)
+                val sender = rejectedSMS.sender.replace(",", ";") // Escape commas
+                val body = rejectedSMS.body.replace(",", ";").replace("\n", " ").replace("\"", "'") // Escape special characters
+                val escapedReason = rejectedSMS.reason.replace(",", ";")
+
+                out.write("\"$dateStr\",\"$sender\",\"$body\",\"$escapedReason\"\n")
+            } catch (e: Exception) {
+                logger.error(
+                    where = "saveRejectedSMSToCSV",
+                    what = "[CSV] Error saving rejected SMS to CSV",
+                    throwable = e
+                )
+                failed = true
+                close()
+            }
+        }
+
+        fun close() {
+            try {
+                writer?.close()
+            } catch (e: Exception) {
+                // Nothing useful to do with a failed close of a debug file
+            }
+            writer = null
+        }
+
+        private fun open(): BufferedWriter? {
+            if (failed) return null
+            val externalDir = context.getExternalFilesDir(null)
+            if (externalDir == null) {
+                logger.warn(
+                    where = "saveRejectedSMSToCSV",
+                    what = "External storage not available for CSV export"
+                )
+                failed = true
+                return null
+            }
+
+            return try {
+                val csvFile = File(externalDir, "rejected_sms_${System.currentTimeMillis()}.csv")
+                csvFile.bufferedWriter().also {
+                    // Write CSV header
+                    it.write("Date,Sender,Body,Rejection_Reason\n")
+                    writer = it
                 }
+            } catch (e: Exception) {
+                logger.error(
+                    where = "saveRejectedSMSToCSV",
+                    what = "[CSV] Error creating rejected SMS CSV",
+                    throwable = e
+                )
+                failed = true
+                null
             }
-        } catch (e: Exception) {
-            logger.error(
-                where = "readSMSHistory",
-                what = "[UNIFIED] Error reading SMS history",
-                throwable = e
-            )
-        } finally {
-            cursor?.close()
         }
-        
-        return smsList
     }
 
     private fun calculateConfidence(messageBody: String): Float {
@@ -252,41 +448,4 @@ class SMSParsingService @Inject constructor(
         
         return minOf(confidence, 1.0f)
     }
-
-    private fun saveRejectedSMSToCSV(rejectedSMSList: List<RejectedSMS>) {
-        try {
-            val externalDir = context.getExternalFilesDir(null)
-            if (externalDir == null) {
-                logger.warn(
-                    where = "saveRejectedSMSToCSV",
-                    what = "External storage not available for CSV export"
-                )
-                return
-            }
-            
-            val csvFile = File(externalDir, "rejected_sms_${System.currentTimeMillis()}.csv")
-            val dateFormat = SimpleDateFormat("yyyy-MM-dd HH:mm:ss", Locale.getDefault())
-            
-            csvFile.bufferedWriter().use { writer ->
-                // Write CSV header
-                writer.write("Date,Sender,Body,Rejection_Reason\n")
-                
-                // Write rejected SMS data
-                for (rejectedSMS in rejectedSMSList) {
-                    val dateStr = dateFormat.format(rejectedSMS.date)
-                    val sender = rejectedSMS.sender.replace(",", ";") // Escape commas
-                    val body = rejectedSMS.body.replace(",", ";").replace("\n", " ").replace("\"", "'") // Escape special characters
-                    val reason = rejectedSMS.reason.replace(",", ";")
-                    
-                    writer.write("\"$dateStr\",\"$sender\",\"$body\",\"$reason\"\n")
-                }
-            }
-        } catch (e: Exception) {
-            logger.error(
-                where = "saveRejectedSMSToCSV",
-                what = "[CSV] Error saving rejected SMS to CSV",
-                throwable = e
-            )
-        }
-    }
 }
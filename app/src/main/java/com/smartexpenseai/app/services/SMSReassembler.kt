@@ -0,0 +1,155 @@
+package com.smartexpenseai.app.services
+
+import kotlinx.coroutines.CompletableDeferred
+import kotlinx.coroutines.sync.Mutex
+import kotlinx.coroutines.sync.withLock
+import kotlinx.coroutines.withTimeoutOrNull
+
+/**
+ * Joins the PDUs of a multipart (concatenated) SMS back into one message
+ *
+ * Parts that carry a concatenation header (see [concatHeader]) are keyed by sender and
+ * reference number and joined in sequence order. The platform normally delivers all of
+ * them in one broadcast; when it doesn't, the caller that saw the first part waits up to
+ * [windowMillis] for the rest and then takes whatever arrived, so a lost part delays
+ * a message but never drops it. Parts without a header are grouped by sender and
+ * timestamp within their broadcast and joined in PDU order.
+ */
+class SMSReassembler(
+    private val windowMillis: Long = REASSEMBLY_WINDOW_MS
+) {
+    /**
+     * One PDU as decoded by the receiver
+     *
+     * @property concat Concatenation header, or null for single-part and 3GPP2 messages
+     */
+    data class Part(
+        val sender: String,
+        val body: String,
+        val timestamp: Long,
+        val receivedAtNanos: Long,
+        val concat: ConcatHeader?
+    )
+
+    /**
+     * @property reference Same for every part of one message from one sender
+     * @property total Number of parts in the message
+     * @property sequence 1-based position of this part
+     */
+    data class ConcatHeader(
+        val reference: Int,
+        val total: Int,
+        val sequence: Int
+    )
+
+    private data class Key(val sender: String, val reference: Int, val total: Int)
+
+    private class PendingMessage(val total: Int) {
+        val parts = sortedMapOf<Int, Part>()
+        val complete = CompletableDeferred<Unit>()
+    }
+
+    private val lock = Mutex()
+    private val pending = HashMap<Key, PendingMessage>()
+
+    /**
+     * Logical messages for the parts of one broadcast. Suspends up to [windowMillis] when
+     * a multipart message is incomplete; messages finished by a later broadcast are
+     * returned to the caller that started them, not to the one that completed them.
+     */
+    suspend fun assemble(parts: List<Part>): List<SMSIngestionService.IncomingSms> {
+        val messages = parts.filter { it.concat == null }
+            .groupBy { it.sender to it.timestamp }
+            .values
+            .map { join(it) }
+            .toMutableList()
+
+        val owned = mutableListOf<Pair<Key, PendingMessage>>()
+        lock.withLock {
+            parts.filter { it.concat != null }.forEach { part ->
+                val header = part.concat!!
+                val key = Key(part.sender, header.reference, header.total)
+                val entry = pending[key] ?: PendingMessage(header.total).also {
+                    pending[key] = it
+                    owned += key to it
+                }
+                entry.parts.putIfAbsent(header.sequence, part)
+                if (entry.parts.size == entry.total) entry.complete.complete(Unit)
+            }
+        }
+
+        owned.forEach { (key, entry) ->
+            withTimeoutOrNull(windowMillis) { entry.complete.await() }
+            val joined = lock.withLock {
+                pending.remove(key)
+                join(entry.parts.values.toList())
+            }
+            messages += joined
+        }
+        return messages
+    }
+
+    // Parts are already in order; the earliest receipt starts the latency clock
+    private fun join(parts: List<Part>): SMSIngestionService.IncomingSms {
+        val first = parts.first()
+        return SMSIngestionService.IncomingSms(
+            sender = first.sender,
+            body = parts.joinToString("") { it.body },
+            timestamp = parts.minOf { it.timestamp },
+            receivedAtNanos = parts.minOf { it.receivedAtNanos }
+        )
+    }
+
+    companion object {
+        const val REASSEMBLY_WINDOW_MS = 3_000L
+
+        private const val FORMAT_3GPP = "3gpp"
+
+        /**
+         * Read the concatenation information element from a raw SMS-DELIVER PDU
+         *
+         * Only the 3GPP format carries it in a user data header; returns null for 3GPP2,
+         * for messages without a header and for anything malformed.
+         */
+        fun concatHeader(pdu: ByteArray, format: String?): ConcatHeader? {
+            if (format != null && format != FORMAT_3GPP) return null
+            return try {
+                var i = 1 + (pdu[0].toInt() and 0xFF) // SMSC address
+                val firstOctet = pdu[i++].toInt() and 0xFF
+                if (firstOctet and 0x03 != 0) return null // not SMS-DELIVER
+                if (firstOctet and 0x40 == 0) return null // no user data header
+                val addressDigits = pdu[i++].toInt() and 0xFF
+                i += 1 + (addressDigits + 1) / 2 // type of address + address
+                i += 1 + 1 + 7 + 1 // PID, DCS, timestamp, user data length
+                val headerEnd = i + 1 + (pdu[i].toInt() and 0xFF)
+                i++
+                while (i + 1 < headerEnd) {
+                    val id = pdu[i].toInt() and 0xFF
+                    val length = pdu[i + 1].toInt() and 0xFF
+                    i += 2
+                    if (i + length > headerEnd) return null // element overruns the header
+                    val header = when {
+                        id == 0x00 && length == 3 -> ConcatHeader(
+                            reference = pdu[i].toInt() and 0xFF,
+                            total = pdu[i + 1].toInt() and 0xFF,
+                            sequence = pdu[i + 2].toInt() and 0xFF
+                        )
+                        id == 0x08 && length == 4 -> ConcatHeader(
+                            reference = ((pdu[i].toInt() and 0xFF) shl 8) or (pdu[i + 1].toInt() and 0xFF),
+                            total = pdu[i + 2].toInt() and 0xFF,
+                            sequence = pdu[i + 3].toInt() and 0xFF
+                        )
+                        else -> null
+                    }
+                    if (header != null) {
+                        return header.takeIf { it.total > 1 && it.sequence in 1..it.total }
+                    }
+                    i += length
+                }
+                null
+            } catch (e: IndexOutOfBoundsException) {
+                null
+            }
+        }
+    }
+}
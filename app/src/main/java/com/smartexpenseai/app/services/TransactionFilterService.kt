@@ -6,6 +6,7 @@ import com.smartexpenseai.app.utils.logging.StructuredLogger
 import com.smartexpenseai.app.data.entities.MerchantEntity
 import com.smartexpenseai.app.data.entities.TransactionEntity
 import com.smartexpenseai.app.models.ParsedTransaction
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import com.smartexpenseai.app.ui.messages.MessageItem
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.withContext
@@ -323,10 +324,7 @@ class TransactionFilterService @Inject constructor(
      */
     private fun normalizeMerchantName(merchantName: String): String {
         // Use same normalization as MerchantAliasManager and DataMigrationHelper for consistency
-        return merchantName.uppercase()
-            .replace(Regex("[*#@\\-_]+.*"), "") // Remove suffixes after special chars
-            .replace(Regex("\\s+"), " ") // Normalize spaces
-            .trim()
+        return MerchantNormalizer.groupingKey(merchantName)
     }
     
     /**
@@ -5,6 +5,7 @@ import android.content.Context
 import androidx.lifecycle.ViewModel
 import androidx.lifecycle.viewModelScope
 import com.smartexpenseai.app.data.repository.ExpenseRepository
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import com.smartexpenseai.app.services.SMSParsingService
 import com.smartexpenseai.app.services.TransactionFilterService
 import com.smartexpenseai.app.utils.CategoryManager
@@ -1377,15 +1378,7 @@ class MessagesViewModel @Inject constructor(
      * Normalize merchant name to match database format
      */
     private fun normalizeMerchantName(merchantName: String): String {
-        return merchantName.uppercase()
-            .replace(Regex("\\s+"), " ")
-            .trim()
-            .replace(Regex("\\*(ORDER|PAYMENT|TXN|TRANSACTION).*$"), "")
-            .replace(Regex("#\\d+.*$"), "")
-            .replace(Regex("@\\w+.*$"), "")
-            .replace(Regex("-{2,}.*$"), "")
-            .replace(Regex("_{2,}.*$"), "")
-            .trim()
+        return MerchantNormalizer.transactionKey(merchantName)
     }
     
     /**
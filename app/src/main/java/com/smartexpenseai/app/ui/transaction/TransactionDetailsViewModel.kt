@@ -5,6 +5,7 @@ import androidx.lifecycle.SavedStateHandle
 import androidx.lifecycle.ViewModel
 import androidx.lifecycle.viewModelScope
 import com.smartexpenseai.app.data.repository.ExpenseRepository
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import com.smartexpenseai.app.utils.CategoryManager
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import dagger.hilt.android.lifecycle.HiltViewModel
@@ -212,10 +213,7 @@ class TransactionDetailsViewModel @Inject constructor(
                         val categoryAfterUpdate = repository.getCategoryByName(newCategory)
                         if (categoryAfterUpdate != null) {
                             transactionsUpdatedCount = repository.updateAllTransactionsCategoryByMerchant(
-                                normalizedMerchant = currentTransaction.merchant.lowercase()
-                                    .replace(Regex("[^a-zA-Z0-9\\s]"), "")
-                                    .replace(Regex("\\s+"), " ")
-                                    .trim(),
+                                normalizedMerchant = MerchantNormalizer.alnumKey(currentTransaction.merchant),
                                 newCategoryId = categoryAfterUpdate.id
                             )
                             logger.debug("updateCategory","✅ Updated $transactionsUpdatedCount transactions to category '$newCategory'")
@@ -305,10 +303,7 @@ class TransactionDetailsViewModel @Inject constructor(
                         val category = repository.getCategoryByName(newCategory)
                         if (category != null) {
                             transactionsUpdatedCount = repository.updateAllTransactionsCategoryByMerchant(
-                                normalizedMerchant = currentTransaction.merchant.lowercase()
-                                    .replace(Regex("[^a-zA-Z0-9\\s]"), "")
-                                    .replace(Regex("\\s+"), " ")
-                                    .trim(),
+                                normalizedMerchant = MerchantNormalizer.alnumKey(currentTransaction.merchant),
                                 newCategoryId = category.id
                             )
                             logger.debug("updateMerchant","✅ Updated $transactionsUpdatedCount transactions to category '$newCategory'")
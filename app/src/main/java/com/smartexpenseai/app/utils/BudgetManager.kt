@@ -3,6 +3,7 @@ package com.smartexpenseai.app.utils
 import android.content.Context
 import android.content.SharedPreferences
 import com.smartexpenseai.app.models.ParsedTransaction
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import org.json.JSONArray
 import org.json.JSONObject
 import java.util.*
@@ -307,10 +308,7 @@ class BudgetManager @Inject constructor(
      * Normalize merchant name for consistent comparison
      */
     private fun normalizeMerchantName(merchantName: String): String {
-        return merchantName.uppercase()
-            .replace(Regex("[*#@\\-_]+.*"), "")
-            .replace(Regex("\\s+"), " ")
-            .trim()
+        return MerchantNormalizer.groupingKey(merchantName)
     }
     
     private fun getDefaultCategoryBudget(categoryName: String): Float {
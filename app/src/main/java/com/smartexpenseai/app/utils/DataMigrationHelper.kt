@@ -6,6 +6,7 @@ import com.smartexpenseai.app.data.entities.TransactionEntity
 import com.smartexpenseai.app.data.models.Transaction
 import com.smartexpenseai.app.data.repository.ExpenseRepository
 import com.smartexpenseai.app.data.storage.TransactionStorage
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.withContext
@@ -131,10 +132,7 @@ class DataMigrationHelper @Inject constructor(
      */
     private suspend fun convertLegacyTransactionToEntity(transaction: Transaction): TransactionEntity {
         // Normalize merchant name
-        val normalizedMerchant = transaction.merchant.uppercase()
-            .replace(Regex("[*#@\\-_]+.*"), "")
-            .replace(Regex("\\s+"), " ")
-            .trim()
+        val normalizedMerchant = MerchantNormalizer.groupingKey(transaction.merchant)
         
         // Ensure merchant exists in database
         ensureMerchantExists(normalizedMerchant, transaction.merchant)
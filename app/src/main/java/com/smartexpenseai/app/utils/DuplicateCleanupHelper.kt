@@ -1,11 +1,17 @@
 package com.smartexpenseai.app.utils
 
 import android.content.Context
+import androidx.sqlite.db.SupportSQLiteDatabase
+import com.smartexpenseai.app.data.dao.TransactionDao
+import com.smartexpenseai.app.data.database.ExpenseDatabase
 import com.smartexpenseai.app.data.entities.TransactionEntity
 import com.smartexpenseai.app.data.repository.ExpenseRepository
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.withContext
+import java.util.Date
+import java.util.Locale
+import java.util.concurrent.Callable
 import java.util.concurrent.TimeUnit
 
 /**
@@ -50,35 +56,89 @@ object DuplicateCleanupHelper {
      * Perform comprehensive duplicate cleanup
      * Uses multiple strategies to find and remove all types of duplicates
      */
-    suspend fun cleanupAllDuplicates(context: Context): CleanupResult = withContext(Dispatchers.IO) {
+    suspend fun cleanupAllDuplicates(context: Context): CleanupResult =
+        cleanupAllDuplicates(ExpenseDatabase.getDatabase(context))
+
+    /**
+     * Same as above against any database. Runs the three strategies as SQL window-function
+     * passes when the device's SQLite has them (3.25+, Android 11+), otherwise in memory.
+     */
+    suspend fun cleanupAllDuplicates(database: ExpenseDatabase): CleanupResult = withContext(Dispatchers.IO) {
         logger.info(
             where = "cleanupAllDuplicates",
             what = "🧹 Starting comprehensive duplicate cleanup"
         )
 
-        val repository = ExpenseRepository.getInstance(context)
-        val allTransactions = repository.getAllTransactionsSync()
+        if (supportsWindowFunctions(database)) {
+            cleanupInSql(database)
+        } else {
+            cleanupInMemory(database.transactionDao())
+        }
+    }
+
+    /**
+     * All three strategies in one transaction, without loading the table
+     *
+     * Each strategy ranks the active rows of every duplicate group with ROW_NUMBER() into
+     * a temp table, reads back only the grouped rows for the result details, and
+     * soft-deletes every row ranked below first with one UPDATE. Groups and rankings use
+     * the same keys and orders as [cleanupInMemory] ([SMS_ID_KEEP_ORDER],
+     * [REFERENCE_KEEP_ORDER], [SIMILARITY_KEEP_ORDER], [similarityKey]), so both paths
+     * remove the same rows. Like the per-row path, removal marks rows inactive so the
+     * same SMS is never re-imported.
+     */
+    internal fun cleanupInSql(database: ExpenseDatabase): CleanupResult =
+        database.runInTransaction(Callable {
+            val db = database.openHelper.writableDatabase
+            val totalCount = countActive(db)
+            logger.info(
+                where = "cleanupInSql",
+                what = "Found $totalCount total transactions in database"
+            )
+
+            val now = System.currentTimeMillis()
+            val strategies = listOf(SMS_ID_RANKING, REFERENCE_RANKING, SIMILARITY_RANKING)
+            val details = strategies.flatMap { ranking -> applyRanking(db, ranking, now) }
+
+            val totalRemoved = details.sumOf { it.removed.size }
+            val finalCount = countActive(db)
+            logger.info(
+                where = "cleanupInSql",
+                what = "✅ Cleanup complete! Before: $totalCount | After: $finalCount | Removed: $totalRemoved"
+            )
+
+            CleanupResult(
+                totalTransactions = totalCount,
+                duplicatesFound = details.sumOf { it.count },
+                duplicatesRemoved = totalRemoved,
+                strategy = "Multi-Strategy (SMS ID + Reference Number + Similarity)",
+                details = details
+            )
+        })
+
+    /**
+     * The original implementation: group in Kotlin, soft-delete row by row
+     * Fallback for SQLite without window functions.
+     */
+    internal suspend fun cleanupInMemory(transactionDao: TransactionDao): CleanupResult {
+        val allTransactions = transactionDao.getAllTransactionsSync()
         val totalCount = allTransactions.size
 
         logger.info(
-            where = "cleanupAllDuplicates",
+            where = "cleanupInMemory",
             what = "Found $totalCount total transactions in database"
         )
 
         // Strategy 1: SMS ID duplicates (highest priority)
-        val smsIdResult = cleanupBySmsId(allTransactions, repository)
-
-        // Reload transactions after first cleanup
-        val remainingAfterSmsId = repository.getAllTransactionsSync()
+        val smsIdResult = cleanupBySmsId(allTransactions, transactionDao)
 
-        // Strategy 2: Reference number duplicates
-        val refNumberResult = cleanupByReferenceNumber(remainingAfterSmsId, repository)
-
-        // Reload transactions after second cleanup
-        val remainingAfterRefNumber = repository.getAllTransactionsSync()
+        // Strategy 2: Reference number duplicates, over what strategy 1 kept
+        val remainingAfterSmsId = allTransactions.filter { it.id !in removedIds(smsIdResult) }
+        val refNumberResult = cleanupByReferenceNumber(remainingAfterSmsId, transactionDao)
 
         // Strategy 3: Transaction similarity (merchant + amount + time + bank)
-        val similarityResult = cleanupBySimilarity(remainingAfterRefNumber, repository)
+        val remainingAfterRefNumber = remainingAfterSmsId.filter { it.id !in removedIds(refNumberResult) }
+        val similarityResult = cleanupBySimilarity(remainingAfterRefNumber, transactionDao)
 
         val totalRemoved = smsIdResult.duplicatesRemoved +
                           refNumberResult.duplicatesRemoved +
@@ -88,14 +148,12 @@ object DuplicateCleanupHelper {
                         refNumberResult.duplicatesFound +
                         similarityResult.duplicatesFound
 
-        val finalCount = repository.getAllTransactionsSync().size
-
         logger.info(
-            where = "cleanupAllDuplicates",
-            what = "✅ Cleanup complete! Before: $totalCount | After: $finalCount | Removed: $totalRemoved"
+            where = "cleanupInMemory",
+            what = "✅ Cleanup complete! Before: $totalCount | After: ${totalCount - totalRemoved} | Removed: $totalRemoved"
         )
 
-        CleanupResult(
+        return CleanupResult(
             totalTransactions = totalCount,
             duplicatesFound = totalFound,
             duplicatesRemoved = totalRemoved,
@@ -104,13 +162,203 @@ object DuplicateCleanupHelper {
         )
     }
 
+    private fun removedIds(result: CleanupResult): Set<Long> =
+        result.details.flatMap { it.removed }.toHashSet()
+
+    /**
+     * One strategy as SQL: [rankedSelect] yields id, group_key, group_id, rn and
+     * group_size for active rows, rn = 1 being the row to keep
+     */
+    private class SqlRanking(
+        val label: String,
+        val keyPrefix: String,
+        val rankedSelect: String
+    )
+
+    private const val RANKED_TABLE = "cleanup_ranked"
+
+    private val SMS_ID_RANKING = SqlRanking(
+        label = "Strategy 1",
+        keyPrefix = "SMS_ID",
+        rankedSelect = """
+            SELECT id, sms_id AS group_key,
+                MIN(id) OVER (PARTITION BY sms_id) AS group_id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY sms_id
+                    ORDER BY confidence_score DESC, created_at ASC, transaction_date DESC, id
+                ) AS rn,
+                COUNT(*) OVER (PARTITION BY sms_id) AS group_size
+            FROM transactions
+            WHERE is_active = 1
+        """
+    )
+
+    private val REFERENCE_RANKING = SqlRanking(
+        label = "Strategy 2",
+        keyPrefix = "REF",
+        rankedSelect = """
+            SELECT id, reference_number || '_' || bank_name AS group_key,
+                MIN(id) OVER (PARTITION BY reference_number, bank_name) AS group_id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY reference_number, bank_name
+                    ORDER BY confidence_score DESC, transaction_date DESC, id
+                ) AS rn,
+                COUNT(*) OVER (PARTITION BY reference_number, bank_name) AS group_size
+            FROM transactions
+            WHERE is_active = 1 AND reference_number IS NOT NULL AND TRIM(reference_number) != ''
+        """
+    )
+
+    // similarityKey's merchant, bank and 10-minute bucket plus the exact amount, then runs
+    // no more than 10 minutes apart (gaps and islands), as cleanupBySimilarity clusters
+    // them. Names compare with NOCASE, which folds ASCII letters only, like similarityKey;
+    // LOWER() would follow ICU wherever SQLite is built with it. sim_key is only the
+    // label shown in the result details.
+    private val SIMILARITY_RANKING = SqlRanking(
+        label = "Strategy 3",
+        keyPrefix = "SIMILAR",
+        rankedSelect = """
+            SELECT id, sim_key AS group_key,
+                MIN(id) OVER (PARTITION BY merchant_key, bank_key, bucket, amount, island) AS group_id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY merchant_key, bank_key, bucket, amount, island
+                    ORDER BY confidence_score DESC, transaction_date, id
+                ) AS rn,
+                COUNT(*) OVER (PARTITION BY merchant_key, bank_key, bucket, amount, island) AS group_size
+            FROM (
+                SELECT *, SUM(new_island) OVER (
+                    PARTITION BY merchant_key, bank_key, bucket, amount
+                    ORDER BY transaction_date, id ROWS UNBOUNDED PRECEDING
+                ) AS island
+                FROM (
+                    SELECT *, CASE
+                        WHEN transaction_date - LAG(transaction_date) OVER (
+                            PARTITION BY merchant_key, bank_key, bucket, amount ORDER BY transaction_date, id
+                        ) <= 600000 THEN 0 ELSE 1 END AS new_island
+                    FROM (
+                        SELECT id, amount, transaction_date, confidence_score,
+                            normalized_merchant COLLATE NOCASE AS merchant_key,
+                            bank_name COLLATE NOCASE AS bank_key,
+                            transaction_date / 600000 AS bucket,
+                            normalized_merchant || '_' || PRINTF('%.2f', amount) || '_' ||
+                                (transaction_date / 600000) || '_' || bank_name AS sim_key
+                        FROM transactions
+                        WHERE is_active = 1
+                    )
+                )
+            )
+        """
+    )
+
+    // Best row first; the SQL rankings order each group the same way, down to the id
+    private val SMS_ID_KEEP_ORDER: Comparator<TransactionEntity> =
+        compareByDescending<TransactionEntity> { it.confidenceScore }
+            .thenBy { it.createdAt }
+            .thenByDescending { it.transactionDate }
+            .thenBy { it.id }
+
+    private val REFERENCE_KEEP_ORDER: Comparator<TransactionEntity> =
+        compareByDescending<TransactionEntity> { it.confidenceScore }
+            .thenByDescending { it.transactionDate }
+            .thenBy { it.id }
+
+    private val SIMILARITY_KEEP_ORDER: Comparator<TransactionEntity> =
+        compareByDescending<TransactionEntity> { it.confidenceScore }
+            .thenBy { it.transactionDate }
+            .thenBy { it.id }
+
+    // SQLite's TRIM() with no second argument strips spaces only
+    private fun hasReferenceNumber(transaction: TransactionEntity): Boolean =
+        transaction.referenceNumber?.trim(' ')?.isNotEmpty() == true
+
+    /**
+     * generateDeduplicationKey with a 10-minute window, but folding only ASCII letters
+     * like SQLite's NOCASE, so both cleanup paths put the same rows in a group
+     */
+    private fun similarityKey(transaction: TransactionEntity): String {
+        val bucket = transaction.transactionDate.time / TimeUnit.MINUTES.toMillis(10)
+        val roundedAmount = String.format(Locale.US, "%.2f", transaction.amount)
+        return "${asciiLowercase(transaction.normalizedMerchant)}_${roundedAmount}_${bucket}_${asciiLowercase(transaction.bankName)}"
+    }
+
+    private fun asciiLowercase(value: String): String =
+        String(CharArray(value.length) { i ->
+            val c = value[i]
+            if (c in 'A'..'Z') c + ('a' - 'A') else c
+        })
+
+    private fun applyRanking(db: SupportSQLiteDatabase, ranking: SqlRanking, now: Long): List<DuplicateGroup> {
+        db.execSQL("DROP TABLE IF EXISTS $RANKED_TABLE")
+        db.execSQL("CREATE TEMP TABLE $RANKED_TABLE AS SELECT * FROM (${ranking.rankedSelect}) WHERE group_size > 1")
+
+        val groups = mutableListOf<DuplicateGroup>()
+        db.query(
+            """
+            SELECT r.id, r.group_key, r.rn, r.group_size, t.raw_merchant, t.amount
+            FROM $RANKED_TABLE r JOIN transactions t ON t.id = r.id
+            ORDER BY r.group_id, r.rn
+            """
+        ).use { cursor ->
+            var kept: DuplicateGroup? = null
+            val removed = mutableListOf<Long>()
+            while (cursor.moveToNext()) {
+                val id = cursor.getLong(0)
+                if (cursor.getInt(2) == 1) {
+                    kept?.let { groups += it.copy(removed = removed.toList()) }
+                    removed.clear()
+                    kept = DuplicateGroup(
+                        key = "${ranking.keyPrefix}:${cursor.getString(1)}",
+                        count = cursor.getInt(3),
+                        merchant = cursor.getString(4) ?: "Unknown",
+                        amount = cursor.getDouble(5),
+                        kept = id,
+                        removed = emptyList()
+                    )
+                } else {
+                    removed += id
+                }
+            }
+            kept?.let { groups += it.copy(removed = removed.toList()) }
+        }
+
+        db.execSQL(
+            "UPDATE transactions SET is_active = 0, updated_at = ? WHERE id IN (SELECT id FROM $RANKED_TABLE WHERE rn > 1)",
+            arrayOf<Any>(now)
+        )
+        db.execSQL("DROP TABLE $RANKED_TABLE")
+
+        logger.info(
+            where = "applyRanking",
+            what = "[${ranking.label}] ✅ Removed ${groups.sumOf { it.removed.size }} duplicates in ${groups.size} groups"
+        )
+        return groups
+    }
+
+    private fun countActive(db: SupportSQLiteDatabase): Int =
+        db.query("SELECT COUNT(*) FROM transactions WHERE is_active = 1").use { cursor ->
+            if (cursor.moveToFirst()) cursor.getInt(0) else 0
+        }
+
+    // Window functions arrived in SQLite 3.25 (bundled from Android 11)
+    internal fun supportsWindowFunctions(database: ExpenseDatabase): Boolean =
+        try {
+            database.openHelper.readableDatabase.query("SELECT sqlite_version()").use { cursor ->
+                val version = if (cursor.moveToFirst()) cursor.getString(0) else ""
+                val (major, minor) = version.split('.').map { it.toIntOrNull() ?: 0 } + listOf(0, 0)
+                major > 3 || (major == 3 && minor >= 25)
+            }
+        } catch (e: Exception) {
+            logger.warn("supportsWindowFunctions", "Could not read SQLite version: ${e.message}")
+            false
+        }
+
     /**
      * Strategy 1: Clean up duplicates with same SMS ID
      * This catches transactions from the same SMS processed multiple times
      */
     private suspend fun cleanupBySmsId(
         transactions: List<TransactionEntity>,
-        repository: ExpenseRepository
+        transactionDao: TransactionDao
     ): CleanupResult {
         logger.debug(
             where = "cleanupBySmsId",
@@ -145,19 +393,12 @@ object DuplicateCleanupHelper {
             )
 
             // Keep the one with highest confidence score, or earliest created_at if same confidence
-            val toKeep = duplicates.maxWithOrNull { a, b ->
-                when {
-                    a.confidenceScore != b.confidenceScore ->
-                        a.confidenceScore.compareTo(b.confidenceScore)
-                    else ->
-                        b.createdAt.compareTo(a.createdAt) // Keep earliest
-                }
-            }
+            val toKeep = duplicates.minWithOrNull(SMS_ID_KEEP_ORDER)
 
             val toRemove = duplicates.filter { it.id != toKeep?.id }
 
             for (duplicate in toRemove) {
-                repository.deleteTransaction(duplicate)
+                transactionDao.softDeleteTransactionById(duplicate.id, Date())
                 removedCount++
                 logger.debug(
                     where = "cleanupBySmsId",
@@ -197,7 +438,7 @@ object DuplicateCleanupHelper {
      */
     private suspend fun cleanupByReferenceNumber(
         transactions: List<TransactionEntity>,
-        repository: ExpenseRepository
+        transactionDao: TransactionDao
     ): CleanupResult {
         logger.debug(
             where = "cleanupByReferenceNumber",
@@ -205,10 +446,10 @@ object DuplicateCleanupHelper {
         )
 
         // Only check transactions that have reference numbers
-        val withRefNumbers = transactions.filter { !it.referenceNumber.isNullOrBlank() }
+        val withRefNumbers = transactions.filter { hasReferenceNumber(it) }
 
         val refNumberGroups = withRefNumbers
-            .groupBy { "${it.referenceNumber}_${it.bankName}" }
+            .groupBy { it.referenceNumber to it.bankName }
             .filter { it.value.size > 1 }
 
         if (refNumberGroups.isEmpty()) {
@@ -228,18 +469,19 @@ object DuplicateCleanupHelper {
         val duplicateGroups = mutableListOf<DuplicateGroup>()
         var removedCount = 0
 
-        for ((key, duplicates) in refNumberGroups) {
+        for ((reference, duplicates) in refNumberGroups) {
+            val key = "${reference.first}_${reference.second}"
             logger.warn(
                 where = "cleanupByReferenceNumber",
                 what = "[Strategy 2] Found ${duplicates.size} duplicates with ref: $key"
             )
 
             // Keep the one with highest confidence score
-            val toKeep = duplicates.maxByOrNull { it.confidenceScore }
+            val toKeep = duplicates.minWithOrNull(REFERENCE_KEEP_ORDER)
             val toRemove = duplicates.filter { it.id != toKeep?.id }
 
             for (duplicate in toRemove) {
-                repository.deleteTransaction(duplicate)
+                transactionDao.softDeleteTransactionById(duplicate.id, Date())
                 removedCount++
                 logger.debug(
                     where = "cleanupByReferenceNumber",
@@ -279,23 +521,15 @@ object DuplicateCleanupHelper {
      */
     private suspend fun cleanupBySimilarity(
         transactions: List<TransactionEntity>,
-        repository: ExpenseRepository
+        transactionDao: TransactionDao
     ): CleanupResult {
         logger.debug(
             where = "cleanupBySimilarity",
             what = "[Strategy 3] Checking for similar transactions..."
         )
 
-        val similarityGroups = transactions.groupBy { transaction ->
-            TransactionEntity.generateDeduplicationKey(
-                merchant = transaction.normalizedMerchant,
-                amount = transaction.amount,
-                date = transaction.transactionDate,
-                bankName = transaction.bankName,
-                referenceNumber = null, // Don't use ref number here (already handled in strategy 2)
-                windowMinutes = 10
-            )
-        }.filter { it.value.size > 1 }
+        // Reference numbers are left out here (already handled in strategy 2)
+        val similarityGroups = transactions.groupBy { similarityKey(it) }.filter { it.value.size > 1 }
 
         if (similarityGroups.isEmpty()) {
             logger.debug(
@@ -321,7 +555,7 @@ object DuplicateCleanupHelper {
 
             for ((amount, amountDuplicates) in exactDuplicates) {
                 // Further filter by 10-minute window
-                val timeSortedDuplicates = amountDuplicates.sortedBy { it.transactionDate.time }
+                val timeSortedDuplicates = amountDuplicates.sortedWith(compareBy({ it.transactionDate }, { it.id }))
                 val duplicateClusters = mutableListOf<List<TransactionEntity>>()
                 var currentCluster = mutableListOf(timeSortedDuplicates.first())
 
@@ -352,11 +586,11 @@ object DuplicateCleanupHelper {
                     )
 
                     // Keep the one with highest confidence score
-                    val toKeep = cluster.maxByOrNull { it.confidenceScore }
+                    val toKeep = cluster.minWithOrNull(SIMILARITY_KEEP_ORDER)
                     val toRemove = cluster.filter { it.id != toKeep?.id }
 
                     for (duplicate in toRemove) {
-                        repository.deleteTransaction(duplicate)
+                        transactionDao.softDeleteTransactionById(duplicate.id, Date())
                         removedCount++
                         logger.debug(
                             where = "cleanupBySimilarity",
@@ -432,7 +666,7 @@ object DuplicateCleanupHelper {
             .groupBy { it.smsId }
             .filter { it.value.size > 1 }
             .map { (smsId, duplicates) ->
-                val kept = duplicates.maxByOrNull { it.confidenceScore }
+                val kept = duplicates.minWithOrNull(SMS_ID_KEEP_ORDER)
                 DuplicateGroup(
                     key = "SMS_ID:$smsId",
                     count = duplicates.size,
@@ -446,11 +680,11 @@ object DuplicateCleanupHelper {
 
     private fun findReferenceNumberDuplicates(transactions: List<TransactionEntity>): List<DuplicateGroup> {
         return transactions
-            .filter { !it.referenceNumber.isNullOrBlank() }
+            .filter { hasReferenceNumber(it) }
             .groupBy { "${it.referenceNumber}_${it.bankName}" }
             .filter { it.value.size > 1 }
             .map { (key, duplicates) ->
-                val kept = duplicates.maxByOrNull { it.confidenceScore }
+                val kept = duplicates.minWithOrNull(REFERENCE_KEEP_ORDER)
                 DuplicateGroup(
                     key = "REF:$key",
                     count = duplicates.size,
@@ -464,18 +698,10 @@ object DuplicateCleanupHelper {
 
     private fun findSimilarityDuplicates(transactions: List<TransactionEntity>): List<DuplicateGroup> {
         return transactions
-            .groupBy { transaction ->
-                TransactionEntity.generateDeduplicationKey(
-                    merchant = transaction.normalizedMerchant,
-                    amount = transaction.amount,
-                    date = transaction.transactionDate,
-                    bankName = transaction.bankName,
-                    windowMinutes = 10
-                )
-            }
+            .groupBy { similarityKey(it) }
             .filter { it.value.size > 1 }
             .map { (key, duplicates) ->
-                val kept = duplicates.maxByOrNull { it.confidenceScore }
+                val kept = duplicates.minWithOrNull(SIMILARITY_KEEP_ORDER)
                 DuplicateGroup(
                     key = "SIMILAR:$key",
                     count = duplicates.size,
@@ -3,6 +3,7 @@ package com.smartexpenseai.app.utils
 
 import android.content.Context
 import com.smartexpenseai.app.data.repository.ExpenseRepository
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.withContext
@@ -34,10 +35,7 @@ object ExclusionMigrationHelper {
                     val isExcluded = !isIncluded // Convert inclusion to exclusion
                     
                     // Convert display name back to normalized name for database lookup
-                    val normalizedName = merchantDisplayName.lowercase()
-                        .replace(Regex("[^a-zA-Z0-9\\s]"), "")
-                        .replace(Regex("\\s+"), " ")
-                        .trim()
+                    val normalizedName = MerchantNormalizer.alnumKey(merchantDisplayName)
                     
                     try {
                         // Check if merchant exists in database
@@ -4,6 +4,7 @@ import android.content.Context
 import android.content.Intent
 import android.os.Environment
 import androidx.core.content.FileProvider
+import com.smartexpenseai.app.parsing.engine.ParseTimings
 import java.io.BufferedReader
 import java.io.File
 import java.io.FileWriter
@@ -71,6 +72,13 @@ class LogExporter(private val context: Context) {
                     append("No app log file found at: ${appLogFile.absolutePath}\n\n")
                 }
 
+                // Per-stage SMS parse latencies (see RuleLoader.setParseTimingEnabled)
+                append("[SMS PARSE TIMINGS]\n")
+                append("-" .repeat(60))
+                append("\n")
+                append(ParseTimings.format())
+                append("\n")
+
                 // Collect recent logcat output
                 append("[RECENT LOGCAT OUTPUT - Last 500 lines]\n")
                 append("-" .repeat(60))
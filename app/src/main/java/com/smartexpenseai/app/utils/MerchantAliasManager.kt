@@ -1,6 +1,7 @@
 package com.smartexpenseai.app.utils
 
 import android.content.Context
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
 import com.smartexpenseai.app.utils.logging.StructuredLogger
 import kotlinx.coroutines.runBlocking
 import javax.inject.Inject
@@ -351,23 +352,8 @@ class MerchantAliasManager @Inject constructor(
      * Enhanced to preserve more identity while still grouping similar merchants
      */
     fun normalizeMerchantName(name: String): String {
-        val cleaned = name.uppercase()
-            .replace(Regex("\\s+"), " ") // Normalize spaces first
-            .trim()
-        
-        // Enhanced normalization - remove company suffixes and transaction artifacts
-        val normalized = cleaned
-            .replace(Regex("\\*(ORDER|PAYMENT|TXN|TRANSACTION).*$"), "") // Remove order/payment suffixes
-            .replace(Regex("#\\d+.*$"), "") // Remove transaction numbers
-            .replace(Regex("@\\w+.*$"), "") // Remove @ suffixes
-            .replace(Regex("-{2,}.*$"), "") // Remove double dashes and everything after
-            .replace(Regex("_{2,}.*$"), "") // Remove double underscores and everything after
-            // Remove common company suffixes to group similar merchants
-            .replace(Regex("\\s+(PVT\\s+)?LTD\\.?$"), "") // Remove LTD, PVT LTD
-            .replace(Regex("\\s+LIMITED$"), "") // Remove LIMITED
-            .replace(Regex("\\s+PRIVATE\\s+LIMITED$"), "") // Remove PRIVATE LIMITED
-            .replace(Regex("\\s+(LLC|INC|CORP)\\.?$"), "") // Remove LLC, INC, CORP
-            .trim()
+        // Transaction artifacts and company suffixes removed to group similar merchants
+        val normalized = MerchantNormalizer.aliasKey(name)
 
         logger.debug("normalizeMerchantName","'$name' -> '$normalized'")
         return normalized
@@ -378,12 +364,15 @@ class MerchantAliasManager @Inject constructor(
      * This is used when user wants to group merchants that should be the same
      */
     fun getAggressiveNormalizedName(name: String): String {
-        return name.uppercase()
-            .replace(Regex("[*#@\\-_]+.*"), "") // Remove suffixes after special chars
-            .replace(Regex("\\s+"), " ") // Normalize spaces
-            .replace(Regex("\\b(BANGALORE|MUMBAI|DELHI|CHENNAI|HYDERABAD|PUNE)\\b"), "") // Remove city names
-            .replace(Regex("\\b(PVT|LTD|LLC|INC|CORP)\\b"), "") // Remove company suffixes
-            .replace(Regex("\\s+"), " ")
-            .trim()
+        val grouped = MerchantNormalizer.groupingKey(name) // Remove suffixes after special chars
+            .replace(CITY_NAMES_REGEX, "") // Remove city names
+            .replace(COMPANY_SUFFIX_REGEX, "") // Remove company suffixes
+        return MerchantNormalizer.collapseWhitespace(grouped)
+    }
+
+    companion object {
+        // Compiled once; getAggressiveNormalizedName runs for every merchant in a grouping pass
+        private val CITY_NAMES_REGEX = Regex("\\b(BANGALORE|MUMBAI|DELHI|CHENNAI|HYDERABAD|PUNE)\\b")
+        private val COMPANY_SUFFIX_REGEX = Regex("\\b(PVT|LTD|LLC|INC|CORP)\\b")
     }
 }
\ No newline at end of file
@@ -0,0 +1,166 @@
+package com.smartexpenseai.app.data.repository.internal
+
+import android.content.Context
+import androidx.room.Room
+import androidx.test.core.app.ApplicationProvider
+import com.smartexpenseai.app.data.database.ExpenseDatabase
+import com.smartexpenseai.app.data.entities.CategoryEntity
+import com.smartexpenseai.app.data.entities.MerchantEntity
+import com.smartexpenseai.app.data.entities.TransactionEntity
+import kotlinx.coroutines.runBlocking
+import org.junit.After
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertNull
+import org.junit.Before
+import org.junit.Test
+import org.junit.runner.RunWith
+import org.robolectric.RobolectricTestRunner
+import java.util.Date
+
+/**
+ * [IngestDedupIndex] must answer like the per-row queries it replaces, including
+ * which row it picks when several are in a transaction's similarity window
+ */
+@RunWith(RobolectricTestRunner::class)
+class IngestDedupIndexTest {
+
+    private lateinit var database: ExpenseDatabase
+
+    @Before
+    fun setUp() = runBlocking {
+        database = Room.inMemoryDatabaseBuilder(
+            ApplicationProvider.getApplicationContext<Context>(),
+            ExpenseDatabase::class.java
+        ).allowMainThreadQueries().build()
+
+        val categoryId = database.categoryDao().insertCategory(
+            CategoryEntity(name = "Other", color = "#888888", createdAt = Date(T))
+        )
+        database.merchantDao().insertMerchants(
+            listOf(
+                MerchantEntity(normalizedName = "SWIGGY", displayName = "Swiggy", categoryId = categoryId, createdAt = Date(T)),
+                MerchantEntity(normalizedName = "ZOMATO", displayName = "Zomato", categoryId = categoryId, isDeleted = true, createdAt = Date(T))
+            )
+        )
+        database.transactionDao().insertTransactions(EXISTING)
+        Unit
+    }
+
+    @After
+    fun tearDown() {
+        database.close()
+    }
+
+    @Test
+    fun batchAnswersMatchPerRowQueries() = runBlocking {
+        val transactionDao = database.transactionDao()
+        val merchantDao = database.merchantDao()
+        val index = IngestDedupIndex.load(transactionDao, merchantDao, BATCH, BATCH)
+
+        for (entity in BATCH) {
+            val smsIdExists = transactionDao.getTransactionBySmsId(entity.smsId) != null
+            assertEquals(entity.smsId, smsIdExists, index.containsSmsId(entity.smsId))
+
+            val perRow = TransactionDataRepository.confirmSimilar(
+                entity,
+                transactionDao.findSimilarTransaction(
+                    normalizedMerchant = entity.normalizedMerchant,
+                    minAmount = (entity.amount - TransactionDataRepository.SIMILAR_AMOUNT_TOLERANCE).coerceAtLeast(0.0),
+                    maxAmount = entity.amount + TransactionDataRepository.SIMILAR_AMOUNT_TOLERANCE,
+                    startDate = Date(entity.transactionDate.time - TransactionDataRepository.SIMILAR_TIME_WINDOW_MILLIS),
+                    endDate = Date(entity.transactionDate.time + TransactionDataRepository.SIMILAR_TIME_WINDOW_MILLIS),
+                    bankName = entity.bankName
+                )
+            )
+            val similar = index.findSimilar(entity)
+            assertEquals(entity.smsId, perRow?.id, similar?.id)
+
+            val merchantDeleted = merchantDao.isMerchantDeleted(entity.normalizedMerchant) ?: false
+            assertEquals(entity.smsId, merchantDeleted, index.isMerchantDeleted(entity.normalizedMerchant))
+
+            // Store what ExpenseRepository would store, so later rows see it on both sides
+            if (!smsIdExists && similar == null) {
+                val stored = entity.copy(isActive = !merchantDeleted)
+                val id = transactionDao.insertTransaction(stored)
+                if (id > 0) index.add(stored.copy(id = id))
+            }
+        }
+    }
+
+    @Test
+    fun lowestIdInTheWindowDecidesTheReferenceCheck() = runBlocking {
+        val index = IngestDedupIndex.load(database.transactionDao(), database.merchantDao(), BATCH, BATCH)
+
+        // Rows 1 (ref 111) and 2 (ref 222) are both in the window; row 1 is the one compared
+        val candidate = transaction("new_222", "SWIGGY", 250.0, 120_000, reference = "222")
+        assertNull(index.findSimilar(candidate))
+        assertEquals(1L, index.findSimilar(candidate.copy(referenceNumber = null))?.id)
+    }
+
+    companion object {
+        // 2025-01-01T00:00:00Z
+        private const val T = 1_735_689_600_000L
+        private const val MINUTE = 60_000L
+
+        private fun transaction(
+            smsId: String,
+            merchant: String,
+            amount: Double,
+            offsetMillis: Long,
+            reference: String? = null,
+            bank: String = "HDFC Bank",
+            isActive: Boolean = true
+        ) = TransactionEntity(
+            smsId = smsId,
+            amount = amount,
+            rawMerchant = merchant,
+            normalizedMerchant = merchant,
+            bankName = bank,
+            transactionDate = Date(T + offsetMillis),
+            rawSmsBody = "Dedup fixture $smsId",
+            confidenceScore = 0.9f,
+            referenceNumber = reference,
+            isActive = isActive,
+            createdAt = Date(T),
+            updatedAt = Date(T)
+        )
+
+        // Ids 1..n in this order
+        private val EXISTING = listOf(
+            transaction("old_1", "SWIGGY", 250.0, 0, reference = "111"),
+            transaction("old_2", "SWIGGY", 250.5, 2 * MINUTE, reference = "222"),
+            transaction("old_3", "SWIGGY", 249.5, 4 * MINUTE),
+            transaction("old_4", "SWIGGY", 250.0, 30 * MINUTE),
+            transaction("old_5", "SWIGGY", 250.0, 0, bank = "ICICI Bank"),
+            transaction("old_6", "ZOMATO", 120.0, 0, isActive = false),
+            transaction("old_7", "SWIGGY", 90.0, MINUTE, reference = "CARD1234H1a2b3c")
+        )
+
+        private val BATCH = listOf(
+            // sms_id already stored
+            transaction("old_1", "SWIGGY", 250.0, 0, reference = "111"),
+            // Several rows in the window; the lowest id has a different reference
+            transaction("new_1", "SWIGGY", 250.0, 3 * MINUTE, reference = "222"),
+            // Several rows in the window, no reference: the lowest id is the duplicate
+            transaction("new_2", "SWIGGY", 250.2, 3 * MINUTE),
+            // Same reference as the lowest-id match
+            transaction("new_3", "SWIGGY", 250.0, MINUTE, reference = "111"),
+            // Nothing in range: stored
+            transaction("new_4", "SWIGGY", 260.0, 25 * MINUTE),
+            // Only the other bank's row is in range
+            transaction("new_5", "SWIGGY", 250.0, 5 * MINUTE, bank = "ICICI Bank"),
+            // An inactive row still blocks; the merchant is deleted
+            transaction("new_6", "ZOMATO", 120.0, 5 * MINUTE),
+            // Deleted merchant, nothing similar: stored inactive
+            transaction("new_7", "ZOMATO", 500.0, 5 * MINUTE),
+            // Synthetic card refs never veto a match
+            transaction("new_8", "SWIGGY", 90.0, 2 * MINUTE, reference = "CARD1234H9f8e7d"),
+            // Stored by this batch, then matched by the next row
+            transaction("new_9", "SWIGGY", 700.0, 60 * MINUTE),
+            transaction("new_10", "SWIGGY", 700.0, 62 * MINUTE),
+            // Same sms_id twice in one batch
+            transaction("new_11", "SWIGGY", 999.0, 90 * MINUTE),
+            transaction("new_11", "SWIGGY", 999.0, 90 * MINUTE)
+        )
+    }
+}
@@ -0,0 +1,244 @@
+package com.smartexpenseai.app.parsing.benchmark
+
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizer
+import com.smartexpenseai.app.parsing.engine.MerchantNormalizerTest
+import com.smartexpenseai.app.parsing.engine.PatternStats
+import com.smartexpenseai.app.parsing.engine.RuleLoader
+import com.smartexpenseai.app.parsing.engine.SmsDateParser
+import com.smartexpenseai.app.parsing.engine.UnifiedSMSParser
+import com.smartexpenseai.app.utils.logging.StructuredLogger
+import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.withContext
+import java.lang.management.ManagementFactory
+import java.util.Locale
+
+/**
+ * Throughput and latency benchmark for [UnifiedSMSParser] over a [SyntheticSmsCorpus]
+ *
+ * Runs in unit tests under Robolectric, which provides the assets the engine reads its
+ * rules from. Messages go through the public [UnifiedSMSParser.parseSMS] one at a time
+ * on a single [Dispatchers.IO] thread: parseSMS switches to IO itself, so this keeps
+ * every call on the measuring thread, and per-message latencies are not blurred by
+ * contention. Every body is unique, so each parse is a parse-cache miss plus a put,
+ * as on a first inbox scan.
+ *
+ * Reports, per bank and for the noise group: messages/sec, p50/p99 latency, bytes
+ * allocated per message and how many messages parsed. Micro-benchmarks cover
+ * [MerchantNormalizer.transactionKey] against the regex chain it replaced (as checked in
+ * [MerchantNormalizerTest]), the date tokenizer and the rule-set build (bundle vs JSON).
+ */
+class ParserBenchmark(
+    private val parser: UnifiedSMSParser,
+    private val ruleLoader: RuleLoader
+) {
+    private val logger = StructuredLogger("SMS_PARSING", "ParserBenchmark")
+
+    // Results of micro-benchmark loops are folded in here so the JIT can't drop the work
+    @Volatile
+    private var sink = 0L
+
+    class Config(
+        val corpusSize: Int = SyntheticSmsCorpus.DEFAULT_SIZE,
+        val noiseRatio: Double = SyntheticSmsCorpus.DEFAULT_NOISE_RATIO,
+        val warmupMessages: Int = 10_000,
+        val microIterations: Int = 100_000,
+        val ruleBuildIterations: Int = 5,
+        val seed: Int = 42
+    )
+
+    /**
+     * Parser numbers for one bank (or [NOISE_GROUP])
+     *
+     * @property bytesPerMessage Heap bytes allocated per message, -1 when the runtime
+     *   doesn't report allocation totals
+     * @property parsedRate Share of messages parsed into a transaction - close to 1 for
+     *   banks and close to 0 for noise
+     */
+    data class GroupResult(
+        val group: String,
+        val messages: Int,
+        val messagesPerSecond: Double,
+        val p50Micros: Double,
+        val p99Micros: Double,
+        val bytesPerMessage: Long,
+        val parsedRate: Double
+    )
+
+    data class Report(
+        val groups: List<GroupResult>,
+        val overallMessagesPerSecond: Double,
+        val merchantNormalizerNanos: Double,
+        val legacyMerchantNormalizerNanos: Double,
+        val dateParserNanos: Double,
+        val bundleBuildMillis: Double,
+        val jsonBuildMillis: Double
+    ) {
+        /**
+         * Threshold violations, one line each; empty when the run is within [thresholds]
+         */
+        fun regressions(thresholds: Thresholds = Thresholds()): List<String> {
+            val problems = mutableListOf<String>()
+            if (overallMessagesPerSecond < thresholds.minMessagesPerSecond) {
+                problems += "overall: %.0f msg/s < %.0f".format(
+                    Locale.US, overallMessagesPerSecond, thresholds.minMessagesPerSecond
+                )
+            }
+            groups.forEach { group ->
+                if (group.p99Micros > thresholds.maxP99Micros) {
+                    problems += "${group.group}: p99 %.1f us > %.1f".format(
+                        Locale.US, group.p99Micros, thresholds.maxP99Micros
+                    )
+                }
+                if (group.bytesPerMessage > thresholds.maxBytesPerMessage) {
+                    problems += "${group.group}: ${group.bytesPerMessage} B/msg > ${thresholds.maxBytesPerMessage}"
+                }
+                if (group.group != NOISE_GROUP && group.parsedRate < thresholds.minBankParsedRate) {
+                    problems += "${group.group}: parsed %.3f < %.3f".format(
+                        Locale.US, group.parsedRate, thresholds.minBankParsedRate
+                    )
+                }
+            }
+            return problems
+        }
+
+        fun format(): String = buildString {
+            appendLine("group          messages    msg/s   p50_us   p99_us   B/msg  parsed")
+            groups.forEach { g ->
+                appendLine(
+                    String.format(
+                        Locale.US, "%-12s %10d %8.0f %8.1f %8.1f %7d  %6.3f",
+                        g.group, g.messages, g.messagesPerSecond, g.p50Micros, g.p99Micros,
+                        g.bytesPerMessage, g.parsedRate
+                    )
+                )
+            }
+            appendLine(String.format(Locale.US, "overall: %.0f msg/s", overallMessagesPerSecond))
+            appendLine(
+                String.format(
+                    Locale.US, "merchant transactionKey: %.0f ns/op (regex chain %.0f ns/op)",
+                    merchantNormalizerNanos, legacyMerchantNormalizerNanos
+                )
+            )
+            appendLine(String.format(Locale.US, "date parser: %.0f ns/op", dateParserNanos))
+            appendLine(
+                String.format(
+                    Locale.US, "rule set build: bundle %.1f ms, json %.1f ms", bundleBuildMillis, jsonBuildMillis
+                )
+            )
+        }
+    }
+
+    /**
+     * Regression limits for [Report.regressions]. The defaults are loose enough for a
+     * shared CI machine; tighten them when comparing runs on one fixed machine.
+     */
+    data class Thresholds(
+        val minMessagesPerSecond: Double = 2_000.0,
+        val maxP99Micros: Double = 5_000.0,
+        val maxBytesPerMessage: Long = 64 * 1024,
+        val minBankParsedRate: Double = 0.9
+    )
+
+    /**
+     * Generate the corpus, warm up and measure. Takes tens of seconds for the default size.
+     */
+    suspend fun run(config: Config = Config()): Result<Report> = withContext(Dispatchers.IO) {
+        val ruleSet = ruleLoader.load().getOrElse { e ->
+            logger.error("run", "Failed to build rules for benchmark", e)
+            return@withContext Result.failure(e)
+        }
+
+        val corpus = SyntheticSmsCorpus.generate(ruleSet.rules, config.corpusSize, config.noiseRatio, config.seed)
+        logger.info("run", "Benchmarking ${corpus.size} messages across ${ruleSet.rules.banks.size} banks")
+
+        // Warm up on a differently seeded corpus so the measured bodies are fresh
+        SyntheticSmsCorpus.generate(ruleSet.rules, config.warmupMessages, config.noiseRatio, config.seed + 1)
+            .forEach { parser.parseSMS(it.sender, it.body, it.timestamp) }
+
+        val groups = corpus.groupBy { it.bankCode ?: NOISE_GROUP }
+        var totalNanos = 0L
+        val results = groups.map { (group, samples) ->
+            val latencies = LongArray(samples.size)
+            var parsed = 0
+            val bytesBefore = allocatedBytes()
+            val groupStart = System.nanoTime()
+            samples.forEachIndexed { index, sample ->
+                val start = System.nanoTime()
+                val result = parser.parseSMS(sample.sender, sample.body, sample.timestamp)
+                latencies[index] = System.nanoTime() - start
+                if (result is UnifiedSMSParser.ParseResult.Success) parsed++
+            }
+            val groupNanos = System.nanoTime() - groupStart
+            val bytesAfter = allocatedBytes()
+            totalNanos += groupNanos
+
+            latencies.sort()
+            GroupResult(
+                group = group,
+                messages = samples.size,
+                messagesPerSecond = samples.size * 1e9 / groupNanos,
+                p50Micros = percentile(latencies, 0.50) / 1e3,
+                p99Micros = percentile(latencies, 0.99) / 1e3,
+                bytesPerMessage = if (bytesBefore < 0 || bytesAfter < 0) -1 else (bytesAfter - bytesBefore) / samples.size,
+                parsedRate = parsed.toDouble() / samples.size
+            )
+        }.sortedBy { it.group }
+
+        val merchants = corpus.asSequence().map { it.body.substringAfterLast(" at ", it.body).take(32) }
+            .take(1024).toList()
+        val dates = listOf("04-07-25", "04/07/2025", "4 July 2025", "31-Feb-25", "12.11.24", "Ref 1234")
+
+        val report = Report(
+            groups = results,
+            overallMessagesPerSecond = corpus.size * 1e9 / totalNanos,
+            merchantNormalizerNanos = nanosPerOp(config.microIterations) { i ->
+                MerchantNormalizer.transactionKey(merchants[i % merchants.size]).length.toLong()
+            },
+            legacyMerchantNormalizerNanos = nanosPerOp(config.microIterations) { i ->
+                MerchantNormalizerTest.legacyTransactionKey(merchants[i % merchants.size]).length.toLong()
+            },
+            dateParserNanos = nanosPerOp(config.microIterations) { i ->
+                SmsDateParser.parseEpochMillis(dates[i % dates.size])
+            },
+            bundleBuildMillis = buildMillis(config.ruleBuildIterations, preferBundle = true),
+            jsonBuildMillis = buildMillis(config.ruleBuildIterations, preferBundle = false)
+        )
+        logger.info("run", "Benchmark finished:\n${report.format()}")
+        Result.success(report)
+    }
+
+    private inline fun nanosPerOp(iterations: Int, op: (Int) -> Long): Double {
+        var acc = 0L
+        // Warm up with a tenth of the iterations
+        for (i in 0 until iterations / 10) acc += op(i)
+        val start = System.nanoTime()
+        for (i in 0 until iterations) acc += op(i)
+        val elapsed = System.nanoTime() - start
+        sink += acc
+        return elapsed.toDouble() / iterations
+    }
+
+    // Regexes come from the loader's compiled-pattern cache after the first build, so
+    // this is the read/validate/plan cost rather than regex compilation
+    private fun buildMillis(iterations: Int, preferBundle: Boolean): Double {
+        val start = System.nanoTime()
+        repeat(iterations) { ruleLoader.buildRuleSet(preferBundle, stats = PatternStats()) }
+        return (System.nanoTime() - start) / 1e6 / iterations
+    }
+
+    private fun percentile(sorted: LongArray, p: Double): Double {
+        if (sorted.isEmpty()) return 0.0
+        return sorted[((sorted.size - 1) * p).toInt()].toDouble()
+    }
+
+    // Allocations of the measuring thread; the whole group is parsed on it
+    private fun allocatedBytes(): Long {
+        val threads = ManagementFactory.getThreadMXBean() as? com.sun.management.ThreadMXBean ?: return -1L
+        if (!threads.isThreadAllocatedMemorySupported || !threads.isThreadAllocatedMemoryEnabled) return -1L
+        return threads.getThreadAllocatedBytes(Thread.currentThread().id)
+    }
+
+    companion object {
+        const val NOISE_GROUP = "noise"
+    }
+}
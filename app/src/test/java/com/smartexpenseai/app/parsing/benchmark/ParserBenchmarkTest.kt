@@ -0,0 +1,41 @@
+package com.smartexpenseai.app.parsing.benchmark
+
+import android.content.Context
+import androidx.test.core.app.ApplicationProvider
+import com.smartexpenseai.app.parsing.engine.ConfidenceCalculator
+import com.smartexpenseai.app.parsing.engine.RuleLoader
+import com.smartexpenseai.app.parsing.engine.UnifiedSMSParser
+import kotlinx.coroutines.runBlocking
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertTrue
+import org.junit.Test
+import org.junit.runner.RunWith
+import org.robolectric.RobolectricTestRunner
+
+/**
+ * Fails `./gradlew test` when the parser drops below [ParserBenchmark.Thresholds]
+ *
+ * Uses a smaller corpus than an interactive run so the suite stays fast; the
+ * thresholds are per message, so the size doesn't change what is checked.
+ */
+@RunWith(RobolectricTestRunner::class)
+class ParserBenchmarkTest {
+
+    @Test
+    fun parserStaysWithinThresholds() = runBlocking {
+        val context = ApplicationProvider.getApplicationContext<Context>()
+        val ruleLoader = RuleLoader(context)
+        val benchmark = ParserBenchmark(UnifiedSMSParser(ruleLoader, ConfidenceCalculator()), ruleLoader)
+
+        val report = benchmark.run(
+            ParserBenchmark.Config(
+                corpusSize = 20_000,
+                warmupMessages = 5_000,
+                microIterations = 20_000,
+                ruleBuildIterations = 3
+            )
+        ).getOrThrow()
+        assertTrue("every bank should be in the report", report.groups.size > 1)
+        assertEquals(emptyList<String>(), report.regressions())
+    }
+}
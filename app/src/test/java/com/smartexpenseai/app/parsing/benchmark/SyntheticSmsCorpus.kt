@@ -0,0 +1,182 @@
+package com.smartexpenseai.app.parsing.benchmark
+
+import com.smartexpenseai.app.parsing.models.BankRule
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import kotlin.random.Random
+
+/**
+ * Deterministic synthetic inbox for parser benchmarks
+ *
+ * Transaction SMS are rendered from a set of real-world bank templates (UPI debit and
+ * credit, card spend, account debit, NEFT) with random amounts, merchants, VPAs, dates
+ * and reference numbers. For each bank only the templates its own amount, merchant and
+ * reference patterns in bank_rules.json can extract are used, so every bank's plan is
+ * exercised rather than just the fallbacks. Senders use the bank's literal sender codes
+ * behind the usual operator prefixes. The rest is noise: OTPs (some from bank senders),
+ * promotions, delivery and bill notices, recharges and personal messages.
+ *
+ * The same seed always produces the same corpus.
+ */
+object SyntheticSmsCorpus {
+
+    /**
+     * One synthetic SMS
+     *
+     * @property bankCode Bank the transaction was rendered for; null for noise
+     */
+    class Sample(
+        val sender: String,
+        val body: String,
+        val timestamp: Long,
+        val bankCode: String?
+    ) {
+        val isTransaction: Boolean get() = bankCode != null
+    }
+
+    const val DEFAULT_SIZE = 100_000
+    const val DEFAULT_NOISE_RATIO = 0.6
+
+    private val TRANSACTION_TEMPLATES = listOf(
+        "Rs.{amount} debited from A/c XX{acct} on {date} to VPA {vpa}. UPI Ref No {ref}. Not you? Call 18002586161",
+        "INR {amount} spent on {bank} Card XX{card} at {merchant} on {date}. Avl Lmt: INR {balance}. Ref {ref}",
+        "Your A/c XX{acct} is debited for Rs {amount} on {date} towards {merchant}. Txn ID {ref}.",
+        "Rs {amount} credited to A/c XX{acct} on {date} from {vpa}. UPI Ref {ref}. Avl Bal Rs {balance}",
+        "Dear Customer, Rs.{amount} has been debited from your account XX{acct} on {date} for purchase at {merchant}. RRN {ref}",
+        "Sent Rs.{amount} From {bank} A/C *{acct} To {merchant} On {date} Ref {ref}. Not You? Call 1800 22 1911",
+        "Rs.{amount} Dr. from A/C XX{acct} to {vpa} on {date}. Ref {ref}. Avl Bal Rs.{balance}",
+        "NEFT of INR {amount} credited to your A/c XX{acct} on {date} by {merchant}. UTR {ref}"
+    )
+
+    private val NOISE_TEMPLATES = listOf(
+        "{otp} is your OTP to log in to {merchant}. Do not share it with anyone.",
+        "OTP for txn of Rs.{amount} at {merchant} on your card XX{card} is {otp}. Valid for 10 mins. Do not share.",
+        "Get FLAT {percent}% OFF on {merchant}! Use code SAVE{percent}. T&C apply. Shop now: https://bit.ly/3xYz{otp}",
+        "Congratulations! You are eligible for a pre-approved loan of Rs.{amount}. Apply now!",
+        "Your order #{order} from {merchant} has been shipped and will be delivered by {date}.",
+        "Your electricity bill of Rs.{amount} is due on {date}. Pay now to avoid late fee.",
+        "Recharge of Rs.{amount} successful for 98{acct}1234. Validity 28 days. Enjoy unlimited calls!",
+        "Hey, are we still meeting at {merchant} tomorrow? Call me when you're free.",
+        "Update your KYC details to continue using our services. Visit the nearest branch.",
+        "Your {merchant} subscription renews on {date}. Manage it from the app."
+    )
+
+    private val MERCHANTS = listOf(
+        "SWIGGY", "ZOMATO", "AMAZON", "FLIPKART", "BIG BAZAAR", "RELIANCE FRESH", "DMART",
+        "UBER INDIA", "OLA CABS", "IRCTC", "BOOKMYSHOW", "NETFLIX", "APOLLO PHARMACY",
+        "INDIAN OIL", "HP PETROL PUMP", "STARBUCKS", "DOMINOS PIZZA", "MYNTRA", "NYKAA", "BLINKIT"
+    )
+    private val VPA_HANDLES = listOf("ybl", "okaxis", "okhdfcbank", "paytm", "upi", "okicici", "ibl")
+    private val SENDER_PREFIXES = listOf("VM-", "AD-", "JD-", "BZ-", "VK-", "AX-")
+    private val NOISE_SENDERS = listOf(
+        "AD-AMAZON", "VM-SWIGGY", "JD-JIOINF", "BZ-AIRTEL", "VK-FLPKRT", "AX-ZOMATO",
+        "VM-MYNTRA", "+919876543210", "+918123456789", "AD-BSESRJ"
+    )
+    private val MONTHS = listOf("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+    // 2025-01-01T00:00:00Z; timestamps only need to be plausible, not current
+    private const val BASE_TIMESTAMP = 1_735_689_600_000L
+    private const val DAY_MILLIS = 86_400_000L
+
+    /**
+     * Generate [size] messages, [noiseRatio] of them non-transactional, spread evenly over banks
+     */
+    fun generate(
+        rules: BankRulesSchema,
+        size: Int = DEFAULT_SIZE,
+        noiseRatio: Double = DEFAULT_NOISE_RATIO,
+        seed: Int = 42
+    ): List<Sample> {
+        val random = Random(seed)
+        val templatesByBank = rules.banks.map { bank -> bank to templatesFor(bank, rules) }
+        val bankSenders = rules.banks.associate { bank -> bank.code to literalSenders(bank) }
+
+        return List(size) { index ->
+            val timestamp = BASE_TIMESTAMP + random.nextLong(0, 365 * DAY_MILLIS)
+            if (random.nextDouble() < noiseRatio) {
+                // A few OTPs and offers come from bank senders, the rest from merchants and people
+                val sender = if (random.nextInt(5) == 0) {
+                    val bank = rules.banks[random.nextInt(rules.banks.size)]
+                    SENDER_PREFIXES.random(random) + bankSenders.getValue(bank.code).random(random)
+                } else {
+                    NOISE_SENDERS.random(random)
+                }
+                Sample(sender, render(NOISE_TEMPLATES.random(random), "Bank", random), timestamp, null)
+            } else {
+                val (bank, templates) = templatesByBank[index % templatesByBank.size]
+                val sender = SENDER_PREFIXES.random(random) + bankSenders.getValue(bank.code).random(random)
+                Sample(sender, render(templates.random(random), bank.displayName, random), timestamp, bank.code)
+            }
+        }
+    }
+
+    // Templates the bank's own patterns (with fallbacks for the reference) can extract
+    private fun templatesFor(bank: BankRule, rules: BankRulesSchema): List<String> {
+        val amount = compileAll(bank.patterns.amount)
+        val merchant = compileAll(bank.patterns.merchant)
+        val reference = compileAll(bank.patterns.referenceNumber.orEmpty() + rules.fallbackPatterns.referenceNumber.orEmpty())
+        val probe = Random(0)
+
+        val usable = TRANSACTION_TEMPLATES.filter { template ->
+            val body = render(template, bank.displayName, probe)
+            amount.any { it.containsMatchIn(body) } &&
+                merchant.any { it.containsMatchIn(body) } &&
+                reference.any { it.containsMatchIn(body) }
+        }
+        return usable.ifEmpty { TRANSACTION_TEMPLATES }
+    }
+
+    private fun compileAll(patterns: List<String>): List<Regex> =
+        patterns.mapNotNull { pattern ->
+            try {
+                Regex(pattern, RegexOption.IGNORE_CASE)
+            } catch (e: Exception) {
+                null
+            }
+        }
+
+    private fun literalSenders(bank: BankRule): List<String> =
+        bank.senderPatterns.filter { pattern -> pattern.all { it.isLetterOrDigit() } }.ifEmpty { listOf(bank.code) }
+
+    private fun render(template: String, bankName: String, random: Random): String {
+        val merchant = MERCHANTS.random(random)
+        return template
+            .replace("{amount}", formatAmount(random))
+            .replace("{balance}", formatAmount(random))
+            .replace("{acct}", random.nextInt(1000, 10000).toString())
+            .replace("{card}", random.nextInt(1000, 10000).toString())
+            .replace("{date}", formatDate(random))
+            .replace("{vpa}", merchant.lowercase().replace(" ", "") + "@" + VPA_HANDLES.random(random))
+            .replace("{merchant}", merchant)
+            .replace("{ref}", random.nextLong(100_000_000_000L, 999_999_999_999L).toString())
+            .replace("{otp}", random.nextInt(100_000, 1_000_000).toString())
+            .replace("{order}", random.nextLong(1_000_000_000L, 9_999_999_999L).toString())
+            .replace("{percent}", (random.nextInt(1, 10) * 10).toString())
+            .replace("{bank}", bankName)
+    }
+
+    private fun formatAmount(random: Random): String {
+        val rupees = when (random.nextInt(10)) {
+            in 0..5 -> random.nextInt(10, 2_000)
+            in 6..8 -> random.nextInt(2_000, 50_000)
+            else -> random.nextInt(50_000, 500_000)
+        }
+        val formatted = if (rupees >= 1_000 && random.nextBoolean()) {
+            "%,d".format(rupees)
+        } else {
+            rupees.toString()
+        }
+        return if (random.nextBoolean()) "$formatted.${random.nextInt(0, 100).toString().padStart(2, '0')}" else formatted
+    }
+
+    private fun formatDate(random: Random): String {
+        val day = random.nextInt(1, 29).toString().padStart(2, '0')
+        val month = random.nextInt(1, 13)
+        val year = 2025
+        return when (random.nextInt(4)) {
+            0 -> "$day-${month.toString().padStart(2, '0')}-${year % 100}"
+            1 -> "$day/${month.toString().padStart(2, '0')}/$year"
+            2 -> "$day-${MONTHS[month - 1]}-${year % 100}"
+            else -> "$day-${month.toString().padStart(2, '0')}-$year"
+        }
+    }
+}
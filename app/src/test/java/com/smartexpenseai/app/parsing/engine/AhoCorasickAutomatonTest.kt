@@ -0,0 +1,59 @@
+package com.smartexpenseai.app.parsing.engine
+
+import org.junit.Assert.assertEquals
+import org.junit.Test
+import kotlin.random.Random
+
+/**
+ * [AhoCorasickAutomaton] must report every (end position, keyword) pair a naive
+ * `indexOf` scan finds, overlapping and nested keywords included
+ */
+class AhoCorasickAutomatonTest {
+
+    @Test
+    fun reportsEveryOccurrenceOnHandPickedText() {
+        val keywords = listOf("he", "she", "his", "hers", "dr", "dr.", "cr", "credit", "credited by", "e", "", "he")
+        for (text in listOf("", "ushers", "hishershe", "dr. cr.", "credited by credit", "eeee", "hhhhe", "sh")) {
+            assertEquals(text, naive(keywords, text), automaton(keywords, text))
+        }
+    }
+
+    @Test
+    fun reportsEveryOccurrenceOnRandomText() {
+        val random = Random(3)
+        repeat(200) {
+            val keywords = List(random.nextInt(1, 12)) { word(random, random.nextInt(1, 6)) }
+            val text = word(random, random.nextInt(0, 60))
+            assertEquals("$keywords / $text", naive(keywords, text), automaton(keywords, text))
+        }
+    }
+
+    // A small alphabet so keywords overlap and share prefixes and suffixes
+    private fun word(random: Random, length: Int): String =
+        buildString { repeat(length) { append("abc".random(random)) } }
+
+    private fun automaton(keywords: List<String>, text: String): Set<Pair<Int, Int>> {
+        val automaton = AhoCorasickAutomaton(keywords)
+        val found = mutableSetOf<Pair<Int, Int>>()
+        var state = 0
+        text.forEachIndexed { i, c ->
+            state = automaton.step(state, c)
+            automaton.matches(state).forEach { found.add(i + 1 to it) }
+        }
+        return found
+    }
+
+    // Empty keywords are never reported
+    private fun naive(keywords: List<String>, text: String): Set<Pair<Int, Int>> {
+        val found = mutableSetOf<Pair<Int, Int>>()
+        keywords.forEachIndexed { index, keyword ->
+            if (keyword.isEmpty()) return@forEachIndexed
+            var at = text.indexOf(keyword)
+            while (at >= 0) {
+                found.add(at + keyword.length to index)
+                at = text.indexOf(keyword, at + 1)
+            }
+        }
+        return found
+    }
+}
@@ -0,0 +1,82 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.google.gson.Gson
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertTrue
+import org.junit.Test
+import java.io.File
+
+/**
+ * [BacktrackingAnalyzer] on the textbook blow-up shapes and on the shipped rules
+ */
+class BacktrackingAnalyzerTest {
+
+    @Test
+    fun flagsNestedAndAlternatingRepeatsAsExponential() {
+        for (pattern in listOf("(a+)+", "(a|a)*", "(a+)+b", "(a|ab)*c", "(\\w+\\s?)*", "(?:x*y?)+z", "([A-Z]|[a-z])+")) {
+            assertTrue(pattern, BacktrackingAnalyzer.Risk.EXPONENTIAL in risks(pattern))
+        }
+    }
+
+    @Test
+    fun flagsOverlappingAdjacentRepeatsAsPolynomialOnly() {
+        for (pattern in listOf("\\s*[:\\-]?\\s*", ".*.*", "\\d+\\d+x", "a*(?:b?)a+", "[A-Za-z0-9\\s]+?(?:\\s+on|\\.)")) {
+            assertEquals(pattern, listOf(BacktrackingAnalyzer.Risk.POLYNOMIAL), risks(pattern).distinct())
+        }
+    }
+
+    @Test
+    fun leavesDisjointBoundedAndPossessiveRepeatsAlone() {
+        for (pattern in listOf("\\d+\\s+", "a{2,5}a{2,5}", "(a++)+", "\\s*+\\s*+", "(abc|def)*", "(a+b)+", "\\(a+\\)+", "[a+]+")) {
+            assertEquals(pattern, emptyList<BacktrackingAnalyzer.Risk>(), risks(pattern))
+        }
+    }
+
+    @Test
+    fun shippedRulesHaveNoExponentialPatterns() {
+        val patterns = shippedPatterns()
+        for (pattern in patterns) {
+            assertTrue(pattern, BacktrackingAnalyzer.Risk.EXPONENTIAL !in risks(pattern))
+        }
+
+        // Fixed-width and literal-alternation rules are clean
+        val safe = listOf(
+            "(\\d{2}/\\d{2}/\\d{4})",
+            "on\\s+(\\d{2}\\s+[A-Za-z]{3}\\s+\\d{4})",
+            "(debited|spent|paid|withdrawn)",
+            "\\bRRN[:#\\s]*([0-9]{9,})\\b"
+        )
+        for (pattern in safe) {
+            assertTrue(pattern, pattern in patterns)
+            assertEquals(pattern, emptyList<BacktrackingAnalyzer.Risk>(), risks(pattern))
+        }
+
+        // Optional separator between two \s* runs: polynomial, so it gets a budget rather than being skipped
+        val separated = "(?:Ref|Reference)\\s*[:\\-]?\\s*([A-Z0-9]{6,})"
+        assertTrue(separated in patterns)
+        assertEquals(listOf(BacktrackingAnalyzer.Risk.POLYNOMIAL), risks(separated).distinct())
+    }
+
+    @Test
+    fun ignoresMalformedPatterns() {
+        assertEquals(emptyList<BacktrackingAnalyzer.Risk>(), risks("(a+"))
+        assertEquals(emptyList<BacktrackingAnalyzer.Risk>(), risks("[a-"))
+    }
+
+    private fun risks(pattern: String) = BacktrackingAnalyzer.analyze(pattern).map { it.risk }
+
+    // Same pattern lists RuleLoader checks
+    private fun shippedPatterns(): Set<String> {
+        // Unit tests run with the module directory as working directory
+        val rules = Gson().fromJson(File("src/main/assets/bank_rules.json").readText(), BankRulesSchema::class.java)
+        val patterns = LinkedHashSet<String>()
+        rules.banks.forEach { bank ->
+            val p = bank.patterns
+            listOf(p.amount, p.merchant, p.date, p.transactionType, p.referenceNumber).forEach { patterns.addAll(it.orEmpty()) }
+        }
+        val fallback = rules.fallbackPatterns
+        listOf(fallback.amount, fallback.merchant, fallback.referenceNumber).forEach { patterns.addAll(it.orEmpty()) }
+        return patterns
+    }
+}
@@ -0,0 +1,98 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.google.gson.Gson
+import com.smartexpenseai.app.parsing.benchmark.SyntheticSmsCorpus
+import com.smartexpenseai.app.parsing.models.BankRule
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import org.junit.Assert.assertEquals
+import org.junit.Test
+import java.io.File
+
+/**
+ * [ExtractionPlan] in file order must capture exactly what the per-field loops it
+ * replaced captured: the bank's patterns, then the fallback patterns, first group 1
+ * that matches wins
+ */
+class ExtractionPlanTest {
+
+    // Unit tests run with the module directory as working directory
+    private val rules: BankRulesSchema =
+        Gson().fromJson(File("src/main/assets/bank_rules.json").readText(), BankRulesSchema::class.java)
+
+    private fun compile(pattern: String) = Regex(pattern, RegexOption.IGNORE_CASE)
+
+    @Test
+    fun planCapturesMatchLegacyLoopsOnTheSyntheticCorpus() {
+        val plans = ExtractionPlan.buildAll(rules, ::compile, PatternStats())
+        val bodies = SyntheticSmsCorpus.generate(rules, size = 3_000).map { it.body } + SAMPLES
+
+        // Every body against every bank, not only its own, plus the fallback-only plan
+        val banks: List<BankRule?> = rules.banks + listOf(null)
+        banks.forEachIndexed { index, bank ->
+            val plan = plans[index]
+            val patterns = bank?.patterns
+            val fallback = rules.fallbackPatterns
+            for (body in bodies) {
+                val where = "${bank?.code ?: "fallback"}: $body"
+                assertEquals(where, legacy(body, patterns?.amount, fallback.amount), firstCapture(body, plan.amount))
+                assertEquals(where, legacy(body, patterns?.merchant, fallback.merchant), firstCapture(body, plan.merchant))
+                assertEquals(where, legacy(body, patterns?.date, null), firstCapture(body, plan.date))
+                assertEquals(where, legacy(body, patterns?.transactionType, null), firstCapture(body, plan.transactionType))
+                assertEquals(
+                    where,
+                    legacy(body, patterns?.referenceNumber, fallback.referenceNumber),
+                    firstCapture(body, plan.referenceNumber)
+                )
+            }
+        }
+    }
+
+    @Test
+    fun fallbackPatternsTheBankAlreadyTriedAreDropped() {
+        val plans = ExtractionPlan.buildAll(rules, ::compile, PatternStats())
+        rules.banks.forEachIndexed { index, bank ->
+            val expected = (bank.patterns.amount + rules.fallbackPatterns.amount).distinct()
+                .filter { runCatching { compile(it) }.isSuccess }
+            assertEquals(bank.code, expected, plans[index].amount.map { it.regex.pattern })
+        }
+    }
+
+    // UnifiedSMSParser.firstCapture: a pattern that throws (no group 1) counts as a miss
+    private fun firstCapture(body: String, steps: List<ExtractionPlan.Step>): String? =
+        steps.firstNotNullOfOrNull { step ->
+            try {
+                step.find(body)?.groupValues?.get(1)?.trim()
+            } catch (e: Exception) {
+                null
+            }
+        }
+
+    // UnifiedSMSParser's extract* loops before ExtractionPlan
+    private fun legacy(body: String, bankPatterns: List<String>?, fallbackPatterns: List<String>?): String? {
+        bankPatterns?.forEach { pattern -> tryExtractWithPattern(body, pattern)?.let { return it } }
+        fallbackPatterns?.forEach { pattern -> tryExtractWithPattern(body, pattern)?.let { return it } }
+        return null
+    }
+
+    private fun tryExtractWithPattern(body: String, pattern: String): String? =
+        try {
+            compile(pattern).find(body)?.groupValues?.get(1)?.trim()
+        } catch (e: Exception) {
+            null
+        }
+
+    companion object {
+        private val SAMPLES = listOf(
+            "Rs.500.00 debited from A/c XX1234 on 04-07-25 to VPA swiggy@ybl. UPI Ref No 518512345678.",
+            "INR 1,299.00 spent on HDFC Bank Card XX4321 at AMAZON on 2025-07-04:13:45:01. Avl Lmt: INR 45,000",
+            "Your a/c no. XXXXXXXX1234 is credited by Rs.25,000.00 on 04-Jul-25 by NEFT-SALARY. Ref UTR HDFCN52025070412345",
+            "Rs 75 Dr. from A/C XX9876 to blinkit@okaxis on 04/07/2025. Ref 518599998888",
+            "Sent Rs.1,500.00 From SBI A/C *5678 To RAHUL KUMAR On 04/07/25 Ref 518577776666",
+            "ICICI Bank Acct XX123 debited for Rs 249.00 on 04-Jul-25; UBER INDIA credited. UPI:518566665555",
+            "Transaction of INR 3,450 at DMART using Kotak Card XX1111 on 4 July 2025",
+            "123456 is your OTP. Do not share it with anyone.",
+            "",
+            "Rs."
+        )
+    }
+}
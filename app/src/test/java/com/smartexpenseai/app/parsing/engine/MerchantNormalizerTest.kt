@@ -0,0 +1,120 @@
+package com.smartexpenseai.app.parsing.engine
+
+import org.junit.Assert.assertEquals
+import org.junit.Test
+import kotlin.random.Random
+
+/**
+ * Each [MerchantNormalizer] function against the regex chain quoted in its KDoc,
+ * on hand-picked names plus seeded random ones built from the tokens the chains
+ * react to
+ */
+class MerchantNormalizerTest {
+
+    @Test
+    fun canonicalMatchesLegacyChain() = check(MerchantNormalizer::canonical) {
+        it.uppercase().replace(WHITESPACE, " ").trim()
+    }
+
+    @Test
+    fun collapseWhitespaceMatchesLegacyChain() = check(MerchantNormalizer::collapseWhitespace) {
+        it.trim().replace(WHITESPACE, " ")
+    }
+
+    @Test
+    fun transactionKeyMatchesLegacyChain() = check(MerchantNormalizer::transactionKey, ::legacyTransactionKey)
+
+    @Test
+    fun aliasKeyMatchesLegacyChain() = check(MerchantNormalizer::aliasKey) {
+        var result = legacyArtifacts(it.uppercase().replace(WHITESPACE, " ").trim())
+        COMPANY_SUFFIXES.forEach { suffix -> result = result.replace(suffix, "") }
+        result.trim()
+    }
+
+    @Test
+    fun groupingKeyMatchesLegacyChain() = check(MerchantNormalizer::groupingKey) {
+        it.uppercase().replace(Regex("[*#@\\-_]+.*"), "").replace(WHITESPACE, " ").trim()
+    }
+
+    @Test
+    fun alnumKeyMatchesLegacyChain() = check(MerchantNormalizer::alnumKey) {
+        it.lowercase().replace(Regex("[^a-zA-Z0-9\\s]"), "").replace(WHITESPACE, " ").trim()
+    }
+
+    @Test
+    fun retainAlnumAndMatchesMerchantNameCleanerChains() {
+        check({ MerchantNormalizer.retainAlnumAnd(it, ".@_-") }) {
+            it.replace(Regex("[^A-Za-z0-9.@_\\s-]"), "").trim()
+        }
+        check({ MerchantNormalizer.retainAlnumAnd(it, "&'-") }) {
+            it.replace(Regex("[^A-Za-z0-9\\s&'-]"), "").trim()
+        }
+    }
+
+    private fun check(actual: (String) -> String, legacy: (String) -> String) {
+        for (name in NAMES) {
+            assertEquals(escape(name), legacy(name), actual(name))
+        }
+    }
+
+    companion object {
+        private val WHITESPACE = Regex("\\s+")
+
+        private val ARTIFACTS = listOf(
+            Regex("\\*(ORDER|PAYMENT|TXN|TRANSACTION).*$"),
+            Regex("#\\d+.*$"),
+            Regex("@\\w+.*$"),
+            Regex("-{2,}.*$"),
+            Regex("_{2,}.*$")
+        )
+
+        private val COMPANY_SUFFIXES = listOf(
+            Regex("\\s+(PVT\\s+)?LTD\\.?$"),
+            Regex("\\s+LIMITED$"),
+            Regex("\\s+PRIVATE\\s+LIMITED$"),
+            Regex("\\s+(LLC|INC|CORP)\\.?$")
+        )
+
+        /**
+         * The chain [MerchantNormalizer.transactionKey] replaced; ParserBenchmark times the two against each other
+         */
+        internal fun legacyTransactionKey(name: String): String =
+            legacyArtifacts(name.uppercase().replace(WHITESPACE, " ").trim()).trim()
+
+        private fun legacyArtifacts(text: String): String {
+            var result = text
+            ARTIFACTS.forEach { result = result.replace(it, "") }
+            return result
+        }
+
+        private fun escape(text: String): String = text.map { c ->
+            if (c.code in 0x20..0x7E) c.toString() else "\\u%04X".format(c.code)
+        }.joinToString("")
+
+        private val HAND_PICKED = listOf(
+            "", " ", "Swiggy", "  swiggy   instamart ", "AMAZON PAY INDIA PVT LTD", "Amazon Pvt. Ltd.",
+            "Reliance Retail Limited", "Tata Private Limited", "Tata PRIVATE  LIMITED", "Acme Inc.", "Acme LLC",
+            "Acme Corp", "ACMECORP", "Zomato*ORDER 12345", "Zomato *payment", "Uber*TXN9", "Shop #1234 Mumbai",
+            "Shop #A12", "paytm@ybl", "user@ ybl", "a@_b", "Big--Bazaar", "Big-Bazaar", "Big__Bazaar", "Big_Bazaar",
+            "LTD", " LTD", "PVT LTD", "X PVT  LTD.", "X LTD LIMITED", "X LIMITED LIMITED", "X PRIVATE LIMITED LTD",
+            "tab\tseparated\tname", "new\nline", "carriage\r\nreturn", "vertical\u000Btab", "form\u000Cfeed",
+            "Café Coffee Day", "CAFÉ", "Straße", "İstanbul Kebab", "ıstanbul", "हल्दीराम", "Ünïcödé Ltd",
+            "No\u00A0Break\u00A0Space", "\u00A0padded\u00A0", "line\u2028separator", "para\u2029graph",
+            "next\u0085line", "trail\u2028", "Zomato*ORDER\u2028tail", "A*B\nC*D", "A#1\u2028B#2", "🍕 Pizza Hut 🍕",
+            "Flipkart & Co.", "D'Mart", "Mc-Donald's", "a.b@c_d-e", "ŉ", "ﬁsh ﬂy"
+        )
+
+        private val TOKENS = listOf(
+            "a", "Z", "q", "0", "7", " ", "  ", "\t", "\n", "\r", "\u000B", "\u000C", "\u00A0", "\u0085",
+            "\u2028", "\u2029", "*", "#", "@", "-", "_", ".", "&", "'", "é", "É", "ß", "İ", "ı", "दि", "😀",
+            "ﬁ", "ORDER", "PAYMENT", "TXN", "TRANSACTION", "LTD", "PVT", "LIMITED", "PRIVATE", "LLC", "INC",
+            "CORP", "ltd", "inc"
+        )
+
+        private val NAMES: List<String> = HAND_PICKED + Random(7).let { random ->
+            List(5_000) {
+                buildString { repeat(random.nextInt(0, 12)) { append(TOKENS.random(random)) } }
+            }
+        }
+    }
+}
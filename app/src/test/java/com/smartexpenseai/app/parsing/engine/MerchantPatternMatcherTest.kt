@@ -0,0 +1,82 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.google.gson.Gson
+import com.smartexpenseai.app.parsing.models.MerchantCategoryRule
+import com.smartexpenseai.app.parsing.models.MerchantRulesConfig
+import org.junit.Assert.assertEquals
+import org.junit.Test
+import java.io.File
+import kotlin.random.Random
+
+/**
+ * [MerchantPatternMatcher] against the loop it replaced in MerchantRuleEngine:
+ * the first category in priority order whose `matches()` accepts the name, and
+ * within it the first pattern whose regex `containsMatchIn` the name
+ */
+class MerchantPatternMatcherTest {
+
+    @Test
+    fun matchesLegacyLoopOnShippedRules() {
+        // Unit tests run with the module directory as working directory
+        val config = Gson().fromJson(File("src/main/assets/merchant_rules.json").readText(), MerchantRulesConfig::class.java)
+        val categories = config.categories.sortedBy { it.priority }
+        val keywords = categories.flatMap { it.patterns }.mapNotNull { MerchantPatternMatcher.literalCore(it) }
+        assertEquivalent(categories, names(keywords + listOf("UBER EATS", "UBEREATS", "BIG  BAZAAR", "D MART", "HDFC LIFE")))
+    }
+
+    @Test
+    fun matchesLegacyLoopWithRegexesGatesAndInvalidPatterns() {
+        val categories = listOf(
+            category("Invalid", "[ABC", "(SHOP"),
+            category("Gated", "ZOMAT?O.*", "UBER\\s*EATS.*", "CAFE\\d+", "A{2}B"),
+            category("Alternation", "KFC|MCD", ".*(PIZZA|BURGER).*"),
+            category("Keywords", ".*PIZZA.*", "UBER.*", "SHOP.*", ".*CAFE.*", "ZOMA.*", "\u00C9.*"),
+            category("Anchored", "^MCD$", "^UBER"),
+            category("Anything", ".*")
+        )
+        val tokens = listOf(
+            "[ABC", "(SHOP", "ZOMATO", "ZOMAO", "ZOMAT", "UBER", "EATS", "CAFE", "7", "AA", "AAB", "KFC", "MCD",
+            "PIZZA", "BURGER", "SHOP", "\u00C9", "\u00E9"
+        )
+        assertEquivalent(categories, names(tokens))
+        // ".*" last still catches everything, including the empty name
+        assertEquals(5, MerchantPatternMatcher.build(categories).match("")?.categoryIndex)
+    }
+
+    private fun assertEquivalent(categories: List<MerchantCategoryRule>, names: List<String>) {
+        val matcher = MerchantPatternMatcher.build(categories)
+        for (name in names) {
+            val normalized = MerchantNormalizer.groupingKey(name)
+            val location = matcher.match(normalized)
+            assertEquals(name, legacy(categories, normalized), location?.let { it.categoryIndex to it.patternIndex })
+        }
+    }
+
+    // An invalid regex counts as a literal, as in MerchantCategoryRule.getCompiledPatterns
+    private fun legacy(categories: List<MerchantCategoryRule>, normalized: String): Pair<Int, Int>? {
+        val categoryIndex = categories.indexOfFirst { it.matches(normalized) }
+        if (categoryIndex < 0) return null
+        val patternIndex = categories[categoryIndex].getCompiledPatterns().indexOfFirst { it.containsMatchIn(normalized) }
+        return categoryIndex to patternIndex
+    }
+
+    // Keywords glued together with case changes, separators and non-ASCII noise
+    private fun names(keywords: List<String>): List<String> {
+        val random = Random(13)
+        val glue = listOf("", " ", "  ", "\t", "X", "9", "*", "-", "@", "\u00C9", "\u00DF")
+        val fuzz = List(5_000) {
+            buildString {
+                repeat(random.nextInt(1, 4)) {
+                    val keyword = keywords.random(random)
+                    val cut = if (random.nextInt(5) == 0) random.nextInt(0, keyword.length + 1) else keyword.length
+                    append(glue.random(random))
+                    append(keyword.take(cut).map { if (random.nextBoolean()) it.lowercaseChar() else it }.joinToString(""))
+                }
+            }
+        }
+        return keywords + fuzz + listOf("", " ", "SWIGGY*ORDER", "ZOMATO-123", "AMAZON PAY", "\u0130NOX", "P\u0130ZZA")
+    }
+
+    private fun category(name: String, vararg patterns: String) =
+        MerchantCategoryRule(name = name, emoji = "", color = "", patterns = patterns.toList())
+}
@@ -0,0 +1,80 @@
+package com.smartexpenseai.app.parsing.engine
+
+import org.junit.After
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertFalse
+import org.junit.Assert.assertNull
+import org.junit.Assert.assertSame
+import org.junit.Assert.assertTrue
+import org.junit.Assert.fail
+import org.junit.Test
+import java.util.concurrent.CountDownLatch
+import java.util.concurrent.Executors
+
+/**
+ * [RegexBudget] with its own single-worker pool: a search stuck in the queue is answered
+ * on the caller and never charged to the pattern; a search that runs too long is
+ */
+class RegexBudgetTest {
+
+    private val executor = Executors.newSingleThreadExecutor { runnable ->
+        Thread(runnable, "regex-budget-test").apply { isDaemon = true }
+    }
+
+    private val release = CountDownLatch(1)
+
+    @After
+    fun tearDown() {
+        release.countDown()
+        executor.shutdownNow()
+    }
+
+    @Test
+    fun queuedSearchRunsOnTheCallerAndKeepsThePattern() {
+        occupyWorker()
+        val budget = RegexBudget.bounded(20, executor)
+
+        assertEquals("500", budget.find(Regex("\\d+"), "Rs 500 debited")?.value)
+        assertNull(budget.find(Regex("\\d+"), "no digits"))
+        assertFalse(budget.isDisabled)
+    }
+
+    @Test
+    fun runningSearchOverItsBudgetDisablesThePattern() {
+        val budget = RegexBudget.bounded(20, executor)
+        // Four adjacent digit runs before a missing "x": about n^4 / 24 steps over n digits
+        val slow = Regex("\\d*\\d*\\d*\\d*x")
+        val digits = "1".repeat(200)
+
+        assertExceeded { budget.find(slow, digits) }
+        assertTrue(budget.isDisabled)
+        // Disabled for good, even for input that would finish instantly
+        assertExceeded { budget.find(slow, "1x") }
+    }
+
+    @Test
+    fun unboundedBudgetRunsDirectly() {
+        assertFalse(RegexBudget.UNBOUNDED.isBounded)
+        assertEquals("42", RegexBudget.UNBOUNDED.find(Regex("\\d+"), "Rs 42")?.value)
+        assertSame(RegexBudget.UNBOUNDED, RegexBudget.forPattern(RegexExecutionMode.BUDGETED, emptyList()))
+    }
+
+    // Park the only worker until tearDown, so every search submitted meanwhile stays queued
+    private fun occupyWorker() {
+        val started = CountDownLatch(1)
+        executor.execute {
+            started.countDown()
+            release.await()
+        }
+        started.await()
+    }
+
+    private fun assertExceeded(search: () -> Unit) {
+        try {
+            search()
+            fail("expected RegexBudgetExceededException")
+        } catch (e: RegexBudgetExceededException) {
+            assertEquals(20L, e.timeoutMillis)
+        }
+    }
+}
@@ -0,0 +1,68 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.google.gson.Gson
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import com.smartexpenseai.app.parsing.models.MerchantRulesConfig
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertTrue
+import org.junit.Test
+import java.io.ByteArrayInputStream
+import java.io.ByteArrayOutputStream
+import java.io.DataOutputStream
+import java.io.File
+import java.io.IOException
+
+/**
+ * The bundles `compileRuleBundles` writes must read back as exactly what Gson makes
+ * of the JSON they were built from
+ *
+ * Reads the generated assets, so run it through Gradle (preBuild writes them).
+ */
+class RuleBundleReaderTest {
+
+    // Unit tests run with the module directory as working directory
+    private val assets = File("src/main/assets")
+    private val bundles = File("build/generated/ruleBundles/assets")
+
+    @Test
+    fun bankBundleMatchesJson() {
+        val json = File(assets, "bank_rules.json").readText()
+        val expected = Gson().fromJson(json, BankRulesSchema::class.java)
+
+        val bundle = bundle(RuleBundleReader.BANK_RULES_BUNDLE).inputStream().use { RuleBundleReader.readBankRules(it) }
+
+        assertEquals(expected, bundle.rules)
+        // RuleLoader's fingerprint for the same JSON, so a stale bundle is noticed
+        assertEquals("${expected.version}:${Integer.toHexString(json.hashCode())}:${json.length}", bundle.fingerprint)
+    }
+
+    @Test
+    fun merchantBundleMatchesJson() {
+        val expected = Gson().fromJson(File(assets, "merchant_rules.json").readText(), MerchantRulesConfig::class.java)
+
+        val rules = bundle(RuleBundleReader.MERCHANT_RULES_BUNDLE).inputStream().use { RuleBundleReader.readMerchantRules(it) }
+
+        assertEquals(expected, rules)
+    }
+
+    @Test(expected = IOException::class)
+    fun rejectsAMerchantBundleAsBankRules() {
+        bundle(RuleBundleReader.MERCHANT_RULES_BUNDLE).inputStream().use { RuleBundleReader.readBankRules(it) }
+    }
+
+    @Test(expected = IOException::class)
+    fun rejectsAnotherFormatVersion() {
+        val bytes = ByteArrayOutputStream()
+        DataOutputStream(bytes).use { out ->
+            out.writeInt(0x53524231) // "SRB1"
+            out.writeInt(1)
+        }
+        RuleBundleReader.readBankRules(ByteArrayInputStream(bytes.toByteArray()))
+    }
+
+    private fun bundle(name: String): File {
+        val file = File(bundles, name)
+        assertTrue("$file is missing; it is written by the compileRuleBundles task", file.isFile)
+        return file
+    }
+}
@@ -0,0 +1,97 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.google.gson.Gson
+import com.smartexpenseai.app.parsing.models.BankRule
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import com.smartexpenseai.app.parsing.models.FallbackPatterns
+import com.smartexpenseai.app.parsing.models.TransactionPatterns
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertFalse
+import org.junit.Assert.assertTrue
+import org.junit.Test
+import java.io.File
+import kotlin.random.Random
+
+/**
+ * [SenderIndex] against the linear scan it replaced: first bank in file order with a
+ * sender pattern that `containsMatchIn` the sender, case-insensitively
+ */
+class SenderIndexTest {
+
+    private fun compile(pattern: String) = Regex(pattern, RegexOption.IGNORE_CASE)
+
+    @Test
+    fun matchesLinearScanOnShippedRules() {
+        // Unit tests run with the module directory as working directory
+        val rules = Gson().fromJson(File("src/main/assets/bank_rules.json").readText(), BankRulesSchema::class.java)
+        val codes = rules.banks.flatMap { it.senderPatterns }.filter { SenderIndex.isLiteral(it) }
+        assertEquivalent(rules, senders(codes))
+    }
+
+    @Test
+    fun matchesLinearScanWithRegexPatternsAndOverlappingCodes() {
+        val rules = rules(
+            "AXIS" to listOf("AXISBK", "^AX-"),
+            "SBI" to listOf("SBIINB", "SBI(PSG|UPI)"),
+            "HDFC" to listOf("HDFCBK", "HDFC"),
+            "BOB" to listOf("BOB", "BOBTXN", "B.B"),
+            "IDFC" to listOf("IDFCFB", "IDFC"),
+            "CAFÉ" to listOf("CAFÉBK")
+        )
+        val extra = listOf(
+            "AX-HDFCBK", "VM-AXISBK", "AX-SBIUPI", "JD-BOBTXN", "BZ-B8B", "VK-IDFCHDFC",
+            "cafébk", "CAFÉBK", "CAFéBK", "HDFCIDFCFB", "SBIPSGAXISBK"
+        )
+        assertEquivalent(rules, senders(rules.banks.flatMap { it.senderPatterns }.filter { SenderIndex.isLiteral(it) }) + extra)
+    }
+
+    @Test
+    fun literalDetection() {
+        assertTrue(SenderIndex.isLiteral("HDFCBK"))
+        assertTrue(SenderIndex.isLiteral("VM-HDFC"))
+        assertFalse(SenderIndex.isLiteral(""))
+        assertFalse(SenderIndex.isLiteral("^AX-"))
+        assertFalse(SenderIndex.isLiteral("SBI(PSG|UPI)"))
+        assertFalse(SenderIndex.isLiteral("B.B"))
+    }
+
+    private fun assertEquivalent(rules: BankRulesSchema, senders: List<String>) {
+        val index = SenderIndex.build(rules, ::compile)
+        for (sender in senders) {
+            val expected = rules.banks.indexOfFirst { bank ->
+                bank.senderPatterns.any { compile(it).containsMatchIn(sender) }
+            }
+            assertEquals(sender, expected, index.findBankIndex(sender))
+        }
+    }
+
+    // Every code with gateway prefixes, mixed case and surrounding noise, plus non-bank senders
+    private fun senders(codes: List<String>): List<String> {
+        val random = Random(11)
+        val prefixes = listOf("", "VM-", "AD-", "JD-", "BZ-", "AX-", "XX")
+        val generated = codes.flatMap { code ->
+            List(6) {
+                val cased = code.map { if (random.nextBoolean()) it.lowercaseChar() else it }.joinToString("")
+                val partial = if (code.length > 2 && random.nextInt(4) == 0) cased.dropLast(1) else cased
+                prefixes.random(random) + partial + listOf("", "S", "-T", "9").random(random)
+            }
+        }
+        return generated + listOf("", "+919876543210", "AD-AMAZON", "VM-SWIGGY", "ＨＤＦＣＢＫ", "hdfc bk", "BANK")
+    }
+
+    private fun rules(vararg banks: Pair<String, List<String>>): BankRulesSchema {
+        val patterns = TransactionPatterns(amount = emptyList(), merchant = emptyList())
+        return BankRulesSchema(
+            version = 1,
+            banks = banks.map { (code, senders) ->
+                BankRule(code = code, displayName = code, senderPatterns = senders, patterns = patterns)
+            },
+            fallbackPatterns = FallbackPatterns(
+                amount = emptyList(),
+                merchant = emptyList(),
+                debitKeywords = emptyList(),
+                creditKeywords = emptyList()
+            )
+        )
+    }
+}
@@ -0,0 +1,123 @@
+package com.smartexpenseai.app.parsing.engine
+
+import org.junit.After
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertTrue
+import org.junit.Test
+import java.text.SimpleDateFormat
+import java.util.Calendar
+import java.util.Date
+import java.util.Locale
+import java.util.TimeZone
+
+/**
+ * [SmsDateParser] against the SimpleDateFormat trial loop it replaced in UnifiedSMSParser
+ *
+ * Years stay after 1582: SimpleDateFormat switches to the Julian calendar before the
+ * Gregorian cutover, where the tokenizer stays proleptic Gregorian.
+ */
+class SmsDateParserTest {
+
+    private val originalZone = TimeZone.getDefault()
+
+    @After
+    fun restoreZone() {
+        TimeZone.setDefault(originalZone)
+    }
+
+    @Test
+    fun acceptsWhatTheFormatLoopAccepted() {
+        // India has no DST; New York checks the local-midnight DST correction
+        for (zone in listOf("Asia/Kolkata", "America/New_York", "UTC")) {
+            TimeZone.setDefault(TimeZone.getTimeZone(zone))
+            for (text in CORPUS) {
+                val expected = legacyParse(text)?.time ?: SmsDateParser.NO_DATE
+                assertEquals("'$text' in $zone", expected, SmsDateParser.parseEpochMillis(text))
+            }
+        }
+    }
+
+    @Test
+    fun isFasterThanTheFormatLoop() {
+        TimeZone.setDefault(TimeZone.getTimeZone("Asia/Kolkata"))
+        val rounds = 200
+        // Warm both up before timing
+        repeat(rounds) { CORPUS.forEach { text -> legacyParse(text); SmsDateParser.parseEpochMillis(text) } }
+
+        val legacyStart = System.nanoTime()
+        repeat(rounds) { CORPUS.forEach { legacyParse(it) } }
+        val legacyNanos = System.nanoTime() - legacyStart
+
+        val tokenizerStart = System.nanoTime()
+        repeat(rounds) { CORPUS.forEach { SmsDateParser.parseEpochMillis(it) } }
+        val tokenizerNanos = System.nanoTime() - tokenizerStart
+
+        val calls = rounds * CORPUS.size
+        println(
+            String.format(
+                Locale.US, "SimpleDateFormat loop: %.2f µs/date | SmsDateParser: %.2f µs/date",
+                legacyNanos / 1e3 / calls, tokenizerNanos / 1e3 / calls
+            )
+        )
+        assertTrue("tokenizer should beat the format loop", tokenizerNanos < legacyNanos)
+    }
+
+    companion object {
+
+        private val DATE_FORMATS = listOf(
+            "dd-MM-yy", "dd/MM/yy", "dd.MM.yy", "dd-MMM-yy", "dd/MMM/yy", "dd MMM yy",
+            "dd-MM-yyyy", "dd/MM/yyyy", "dd-MMM-yyyy", "dd/MMM/yyyy", "dd MMM yyyy"
+        )
+
+        private val MONTH_PREFIX = Regex("(?i)\\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)")
+
+        // UnifiedSMSParser.tryParseDate before SmsDateParser
+        private fun legacyParse(dateStr: String): Date? {
+            val calendar = Calendar.getInstance()
+            calendar.set(2000, 0, 1)
+            val yearStartDate = calendar.time
+
+            val normalized = dateStr.replace(MONTH_PREFIX) { m ->
+                m.value.lowercase().replaceFirstChar { it.uppercase() }
+            }
+            val candidates = if (normalized == dateStr) listOf(dateStr) else listOf(dateStr, normalized)
+
+            candidates.forEach { candidate ->
+                DATE_FORMATS.forEach { pattern ->
+                    try {
+                        val format = SimpleDateFormat(pattern, Locale.ENGLISH)
+                        format.isLenient = false
+                        format.set2DigitYearStart(yearStartDate)
+                        return format.parse(candidate)
+                    } catch (e: Exception) {
+                        // Try next format
+                    }
+                }
+            }
+            return null
+        }
+
+        private val CORPUS = listOf(
+            // Numeric, each separator, 1/2/4-digit fields
+            "04-07-25", "04/07/25", "04.07.25", "4-7-25", "04-07-2025", "04/07/2025", "04.07.2025",
+            "31-12-99", "01-01-00", "1/1/2024", "004-07-25",
+            // Alpha months, short and long, any case
+            "04-Jul-25", "04-JUL-25", "04-jul-25", "04/Jul/25", "04 Jul 25", "4 July 2025",
+            "04-July-2025", "04 JULY 2025", "15 Sep 2024", "15-SEP-24", "01 May 23", "9/Dec/2023",
+            "04-JUNE-25", "30 jan 2026",
+            // Blanks in front of fields, and a trailing time
+            " 04-07-25", "\t04-07-25", "04-\t07-25", "04 - 07 - 25", "04  Jul  25", "04 Jul\t25",
+            "04-07-25 10:30:15", "04-Jul-2025 at 14:02", "04-07-2510:30",
+            // Leap days and impossible dates
+            "29-02-24", "29-02-25", "29-02-2000", "29-02-2100", "31-04-25", "30-02-24",
+            "00-07-25", "32-07-25", "04-00-25", "04-13-25", "31/11/2024",
+            // Mixed or unsupported separators and month styles
+            "04-07/25", "04/07-25", "04 07 25", "04.Jul.25", "04-Jul/25", "04_07_25",
+            // Not month names
+            "04-Sept-25", "04-Julyy-25", "04-Ma-25", "04-Mayday-25", "04-XYZ-25",
+            // Missing parts and odd lengths
+            "", " ", "04", "04-", "04-07", "04-07-", "-07-25", "04--25", "Jul-04-25",
+            "04-07-20255"
+        )
+    }
+}
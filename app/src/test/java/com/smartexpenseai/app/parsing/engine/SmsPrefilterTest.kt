@@ -0,0 +1,101 @@
+package com.smartexpenseai.app.parsing.engine
+
+import com.google.gson.Gson
+import com.smartexpenseai.app.parsing.benchmark.SyntheticSmsCorpus
+import com.smartexpenseai.app.parsing.models.BankRulesSchema
+import org.junit.Assert.assertEquals
+import org.junit.Test
+import java.io.File
+import kotlin.random.Random
+
+/**
+ * [SmsPrefilter] against the checks it replaced in UnifiedSMSParser: the
+ * NON_TRANSACTION_PATTERNS loop, `body.lowercase().contains(keyword)` for the card
+ * pseudo-ref check, and the keyword fallback of extractTransactionType on the
+ * alnum-only body
+ */
+class SmsPrefilterTest {
+
+    // Unit tests run with the module directory as working directory
+    private val rules: BankRulesSchema =
+        Gson().fromJson(File("src/main/assets/bank_rules.json").readText(), BankRulesSchema::class.java)
+
+    private val prefilter = SmsPrefilter.build(rules.fallbackPatterns)
+
+    @Test
+    fun matchesLegacyChecksOnTheSyntheticCorpus() {
+        check(SyntheticSmsCorpus.generate(rules, size = 5_000).map { it.body } + SAMPLES)
+    }
+
+    @Test
+    fun matchesLegacyChecksOnRandomTokenSoup() {
+        val random = Random(5)
+        check(List(5_000) { buildString { repeat(random.nextInt(0, 14)) { append(TOKENS.random(random)) } } })
+    }
+
+    private fun check(bodies: List<String>) {
+        for (body in bodies) {
+            val verdict = prefilter.classify(body)
+            val reason = legacyRejectReason(body)
+            assertEquals(body, reason, verdict.rejectReason)
+            if (reason != null) {
+                assertEquals(body, SmsPrefilter.Kind.REJECT, verdict.kind)
+                continue
+            }
+            assertEquals(body, legacyHasTxnKeyword(body), verdict.hasTxnKeyword)
+            assertEquals(body, legacyKeywordKind(body), verdict.kind)
+        }
+    }
+
+    private fun legacyRejectReason(body: String): String? =
+        NON_TRANSACTION_PATTERNS.firstOrNull { (_, pattern) -> pattern.containsMatchIn(body) }?.first
+
+    private fun legacyHasTxnKeyword(body: String): Boolean {
+        val bodyLower = body.lowercase()
+        return rules.fallbackPatterns.debitKeywords.any { bodyLower.contains(it) } ||
+            rules.fallbackPatterns.creditKeywords.any { bodyLower.contains(it) }
+    }
+
+    private fun legacyKeywordKind(body: String): SmsPrefilter.Kind {
+        val bodyLower = body.replace(Regex("[^A-Za-z0-9\\s]"), " ").trim().lowercase()
+        return when {
+            rules.fallbackPatterns.debitKeywords.any { bodyLower.contains(it) } -> SmsPrefilter.Kind.DEBIT
+            rules.fallbackPatterns.creditKeywords.any { bodyLower.contains(it) } -> SmsPrefilter.Kind.CREDIT
+            else -> SmsPrefilter.Kind.UNKNOWN
+        }
+    }
+
+    companion object {
+        // UnifiedSMSParser.NON_TRANSACTION_PATTERNS before SmsPrefilter
+        private val NON_TRANSACTION_PATTERNS = listOf(
+            "future autopay notice" to Regex("will\\s+be\\s+debited", RegexOption.IGNORE_CASE),
+            "UPI collect request" to Regex("has\\s+requested|requested\\s+money|payment\\s+request|collect\\s+request", RegexOption.IGNORE_CASE),
+            "OTP message" to Regex("\\botp\\b|one\\s*time\\s*password", RegexOption.IGNORE_CASE),
+            "bill/due reminder" to Regex("payment\\s+due|min(?:imum)?\\s+(?:amount\\s+)?due|due\\s+on|is\\s+due", RegexOption.IGNORE_CASE),
+            "declined transaction" to Regex("insufficient\\s+balance|transaction\\s+(?:declined|failed)", RegexOption.IGNORE_CASE),
+            "promotional offer" to Regex(
+                "\\b(?:e-?voucher|voucher|gift\\s*card|coupon|reward\\s*points?)\\b" +
+                    "|\\bt&c\\b|\\bterms\\s+(?:and|&)\\s+conditions\\b" +
+                    "|\\bby\\s+doing\\s+\\d+\\s+(?:txn|trxn|transaction)s?\\b",
+                RegexOption.IGNORE_CASE
+            )
+        )
+
+        private val SAMPLES = listOf(
+            "", "Rs.500 DEBITED from A/c XX1234", "Rs 500 CR. to A/c", "Dr.Rs 200", "dr-cr", "credited by NEFT",
+            "Your card will be debited for Rs 99 on 05-Jul", "Pay Rs 499 by 5th; minimum amount due Rs 50",
+            "Get a voucher worth Rs 500 on your card. T&C apply", "Your OTP is 1234. Rs.100 debited",
+            "Transaction declined: insufficient balance", "Rs 100 spent. Your otp for next is 1234",
+            "Rs.1,000 DEB\u0130TED from A/c", "Rs 250 PA\u0130D to SWIGGY", "e\u2011mandate set up for Rs 199",
+            "auto\u00A0debit of Rs 99", "EMI\tof Rs 1,999", "added\nto wallet", "REFUND of Rs 10 pr\u00F6cessed",
+            "Rs 50 trans-action", "Rs 50 trans\u0301action done"
+        )
+
+        private val TOKENS = listOf(
+            "Rs ", "1,000", " ", "\t", "\n", ".", "-", "/", "*", "DEBITED", "debit", "ed", "Dr", "dr.", "CR",
+            "cr.", "credit", "ed by", "paid", "PA\u0130D", "\u0130", "i", "\u0307", "e-mandate", "mandate", "auto",
+            "-debit", " debit", "emi of", "transfer", "red to your", "otp", "OTP", "will be debited", "is due",
+            "coupon", "t&c", "requested money", "declined", "transaction failed", "by doing 3 txns", "\u00E9", "\u00DF"
+        )
+    }
+}
@@ -0,0 +1,112 @@
+package com.smartexpenseai.app.services
+
+import com.smartexpenseai.app.data.entities.TransactionEntity
+import kotlinx.coroutines.CoroutineScope
+import kotlinx.coroutines.Job
+import kotlinx.coroutines.async
+import kotlinx.coroutines.awaitAll
+import kotlinx.coroutines.awaitCancellation
+import kotlinx.coroutines.cancel
+import kotlinx.coroutines.test.advanceTimeBy
+import kotlinx.coroutines.test.runCurrent
+import kotlinx.coroutines.test.runTest
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertTrue
+import org.junit.Test
+import java.util.Date
+
+/**
+ * Batching, per-message outcomes and shutdown of [SMSIngestionQueue], on test time
+ */
+class SMSIngestionQueueTest {
+
+    private val batches = mutableListOf<List<String>>()
+
+    // Stores nothing; answers each candidate with its own sms_id so the order shows
+    private val echo: suspend (List<SMSIngestionQueue.Candidate>) -> List<SMSIngestionQueue.Outcome> = { candidates ->
+        batches += candidates.map { it.entity.smsId }
+        candidates.map { SMSIngestionQueue.Outcome.Duplicate(it.entity.smsId) }
+    }
+
+    @Test
+    fun fullBatchesGoOutWithoutWaiting() = runTest {
+        val queue = SMSIngestionQueue(echo, maxBatchSize = 3, maxBatchWaitMillis = 1_000, scope = backgroundScope)
+        val ids = listOf("a", "b", "c", "d", "e", "f", "g")
+
+        val outcomes = queue.submitAll(ids.map { candidate(it) })
+
+        assertEquals(listOf(listOf("a", "b", "c"), listOf("d", "e", "f"), listOf("g")), batches)
+        assertEquals(ids.map { SMSIngestionQueue.Outcome.Duplicate(it) }, outcomes)
+        // Only the short last batch waited out the window
+        assertEquals(1_000L, testScheduler.currentTime)
+    }
+
+    @Test
+    fun messagesWithinTheWindowShareABatch() = runTest {
+        val queue = SMSIngestionQueue(echo, maxBatchSize = 10, maxBatchWaitMillis = 50, scope = backgroundScope)
+
+        val first = async { queue.submit(candidate("a")) }
+        advanceTimeBy(20)
+        val second = async { queue.submit(candidate("b")) }
+        advanceTimeBy(100)
+        val third = async { queue.submit(candidate("c")) }
+
+        assertEquals(
+            listOf("a", "b", "c").map { SMSIngestionQueue.Outcome.Duplicate(it) },
+            listOf(first, second, third).awaitAll()
+        )
+        assertEquals(listOf(listOf("a", "b"), listOf("c")), batches)
+    }
+
+    @Test
+    fun writerFailureFailsOnlyItsBatch() = runTest {
+        var broken = true
+        val queue = SMSIngestionQueue(
+            writer = { candidates ->
+                if (broken) {
+                    broken = false
+                    throw IllegalStateException("disk full")
+                }
+                echo(candidates)
+            },
+            maxBatchWaitMillis = 0,
+            scope = backgroundScope
+        )
+
+        val failed = queue.submitAll(listOf(candidate("a"), candidate("b")))
+        assertEquals(listOf("disk full", "disk full"), failed.map { (it as SMSIngestionQueue.Outcome.Failed).error.message })
+        assertEquals(listOf(SMSIngestionQueue.Outcome.Duplicate("c")), queue.submitAll(listOf(candidate("c"))))
+    }
+
+    @Test
+    fun cancellingTheConsumerAnswersEveryMessage() = runTest {
+        val queueScope = CoroutineScope(backgroundScope.coroutineContext + Job())
+        val queue = SMSIngestionQueue(writer = { awaitCancellation() }, maxBatchSize = 2, scope = queueScope)
+
+        val waiting = async { queue.submitAll(listOf("a", "b", "c", "d", "e").map { candidate(it) }) }
+        // "a" and "b" sit in the writer, the rest in the channel
+        runCurrent()
+        queueScope.cancel()
+
+        val outcomes = waiting.await()
+        assertEquals(5, outcomes.size)
+        assertTrue(outcomes.all { it is SMSIngestionQueue.Outcome.Failed })
+        assertTrue(queue.submit(candidate("f")) is SMSIngestionQueue.Outcome.Failed)
+    }
+
+    private fun candidate(smsId: String) = SMSIngestionQueue.Candidate(
+        entity = TransactionEntity(
+            smsId = smsId,
+            amount = 100.0,
+            rawMerchant = "SWIGGY",
+            normalizedMerchant = "SWIGGY",
+            bankName = "HDFC Bank",
+            transactionDate = Date(0),
+            rawSmsBody = "Rs 100 debited",
+            confidenceScore = 1f,
+            createdAt = Date(0),
+            updatedAt = Date(0)
+        ),
+        checkSimilar = false
+    )
+}
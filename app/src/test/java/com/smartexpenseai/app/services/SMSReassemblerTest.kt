@@ -0,0 +1,148 @@
+package com.smartexpenseai.app.services
+
+import kotlinx.coroutines.async
+import kotlinx.coroutines.test.advanceTimeBy
+import kotlinx.coroutines.test.runTest
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertNull
+import org.junit.Assert.assertTrue
+import org.junit.Test
+
+/**
+ * Concatenation headers decoded from hand-built PDUs, and parts joined across broadcasts
+ */
+class SMSReassemblerTest {
+
+    @Test
+    fun readsEightBitReference() {
+        val pdu = deliverPdu(udh = byteArrayOf(0x00, 0x03, 0xA7.toByte(), 0x03, 0x02))
+        assertEquals(SMSReassembler.ConcatHeader(reference = 0xA7, total = 3, sequence = 2), SMSReassembler.concatHeader(pdu, "3gpp"))
+    }
+
+    @Test
+    fun readsSixteenBitReference() {
+        val pdu = deliverPdu(udh = byteArrayOf(0x08, 0x04, 0x12, 0xF4.toByte(), 0x02, 0x01))
+        assertEquals(SMSReassembler.ConcatHeader(reference = 0x12F4, total = 2, sequence = 1), SMSReassembler.concatHeader(pdu, null))
+    }
+
+    @Test
+    fun skipsOtherElementsAndHonoursTheSmscAddress() {
+        // National language shift element first, then the concatenation element
+        val udh = byteArrayOf(0x25, 0x01, 0x01, 0x00, 0x03, 0x05, 0x02, 0x02)
+        val smsc = byteArrayOf(0x07, 0x91.toByte(), 0x19, 0x98.toByte(), 0x45, 0x00, 0x00, 0xF0.toByte())
+        assertEquals(SMSReassembler.ConcatHeader(5, 2, 2), SMSReassembler.concatHeader(deliverPdu(udh, smsc = smsc), "3gpp"))
+        // An odd digit count still rounds the address up to whole octets
+        assertEquals(SMSReassembler.ConcatHeader(5, 2, 2), SMSReassembler.concatHeader(deliverPdu(udh, addressDigits = 11), "3gpp"))
+    }
+
+    @Test
+    fun returnsNullWithoutAUsableHeader() {
+        val concat = byteArrayOf(0x00, 0x03, 0x01, 0x02, 0x01)
+        // 3GPP2, no header indicator, SMS-SUBMIT, no concatenation element
+        assertNull(SMSReassembler.concatHeader(deliverPdu(concat), "3gpp2"))
+        assertNull(SMSReassembler.concatHeader(deliverPdu(concat, firstOctet = 0x04), "3gpp"))
+        assertNull(SMSReassembler.concatHeader(deliverPdu(concat, firstOctet = 0x41), "3gpp"))
+        assertNull(SMSReassembler.concatHeader(deliverPdu(byteArrayOf(0x25, 0x01, 0x01)), "3gpp"))
+        // Single part, sequence 0, sequence past the total, wrong element length
+        assertNull(SMSReassembler.concatHeader(deliverPdu(byteArrayOf(0x00, 0x03, 0x01, 0x01, 0x01)), "3gpp"))
+        assertNull(SMSReassembler.concatHeader(deliverPdu(byteArrayOf(0x00, 0x03, 0x01, 0x02, 0x00)), "3gpp"))
+        assertNull(SMSReassembler.concatHeader(deliverPdu(byteArrayOf(0x00, 0x03, 0x01, 0x02, 0x03)), "3gpp"))
+        assertNull(SMSReassembler.concatHeader(deliverPdu(byteArrayOf(0x08, 0x03, 0x01, 0x02, 0x01)), "3gpp"))
+    }
+
+    @Test
+    fun returnsNullForMalformedPdus() {
+        assertNull(SMSReassembler.concatHeader(ByteArray(0), "3gpp"))
+        // Header length shorter than the element it contains
+        val overrun = deliverPdu(byteArrayOf(0x00, 0x03, 0x01, 0x02, 0x01))
+        overrun[udhlIndex(overrun)] = 0x03
+        assertNull(SMSReassembler.concatHeader(overrun, "3gpp"))
+        // Every truncation that cuts into the header
+        val pdu = deliverPdu(byteArrayOf(0x00, 0x03, 0x01, 0x02, 0x01))
+        val headerEnd = udhlIndex(pdu) + 1 + 5
+        for (length in 0 until headerEnd) {
+            assertNull("length $length", SMSReassembler.concatHeader(pdu.copyOf(length), "3gpp"))
+        }
+    }
+
+    @Test
+    fun joinsPartsOfOneBroadcastInSequenceOrder() = runTest {
+        val reassembler = SMSReassembler()
+        val messages = reassembler.assemble(
+            listOf(
+                part("HDFCBK", "debited.", concat = SMSReassembler.ConcatHeader(9, 2, 2), timestamp = 2),
+                part("HDFCBK", "Rs 500 ", concat = SMSReassembler.ConcatHeader(9, 2, 1), timestamp = 1),
+                part("AXISBK", "single ", timestamp = 5),
+                part("AXISBK", "headerless", timestamp = 5)
+            )
+        )
+        assertEquals(
+            setOf(
+                SMSIngestionService.IncomingSms("HDFCBK", "Rs 500 debited.", timestamp = 1, receivedAtNanos = 0),
+                SMSIngestionService.IncomingSms("AXISBK", "single headerless", timestamp = 5, receivedAtNanos = 0)
+            ),
+            messages.toSet()
+        )
+    }
+
+    @Test
+    fun partsFromALaterBroadcastGoToTheFirstCaller() = runTest {
+        val reassembler = SMSReassembler(windowMillis = 3_000)
+        val first = async { reassembler.assemble(listOf(part("SBIINB", "A", SMSReassembler.ConcatHeader(1, 2, 1)))) }
+        advanceTimeBy(1_000)
+        val second = reassembler.assemble(listOf(part("SBIINB", "B", SMSReassembler.ConcatHeader(1, 2, 2))))
+
+        assertTrue(second.isEmpty())
+        assertEquals(listOf("AB"), first.await().map { it.body })
+    }
+
+    @Test
+    fun incompleteMessageIsReturnedAfterTheWindow() = runTest {
+        val reassembler = SMSReassembler(windowMillis = 3_000)
+        val messages = reassembler.assemble(
+            listOf(
+                part("SBIINB", "one ", SMSReassembler.ConcatHeader(7, 3, 1)),
+                part("SBIINB", "three", SMSReassembler.ConcatHeader(7, 3, 3))
+            )
+        )
+        assertEquals(listOf("one three"), messages.map { it.body })
+        assertEquals(3_000L, testScheduler.currentTime)
+    }
+
+    private fun part(
+        sender: String,
+        body: String,
+        concat: SMSReassembler.ConcatHeader? = null,
+        timestamp: Long = 0
+    ) = SMSReassembler.Part(sender, body, timestamp, receivedAtNanos = 0, concat = concat)
+
+    companion object {
+        private val NO_SMSC = byteArrayOf(0x00)
+
+        /**
+         * SMS-DELIVER PDU with a user data header: SMSC, first octet, originating
+         * address, PID, DCS, timestamp, UDL, then [udh] behind its length octet
+         */
+        private fun deliverPdu(
+            udh: ByteArray,
+            smsc: ByteArray = NO_SMSC,
+            firstOctet: Int = 0x44,
+            addressDigits: Int = 12
+        ): ByteArray {
+            val address = ByteArray((addressDigits + 1) / 2) { 0x21 }
+            val timestamp = byteArrayOf(0x52, 0x70, 0x40, 0x31, 0x54, 0x10, 0x32)
+            val text = "Hi".toByteArray()
+            return smsc +
+                byteArrayOf(firstOctet.toByte(), addressDigits.toByte(), 0x91.toByte()) + address +
+                byteArrayOf(0x00, 0x04) + timestamp +
+                byteArrayOf((1 + udh.size + text.size).toByte(), udh.size.toByte()) + udh + text
+        }
+
+        // Offset of the user data header length octet in a PDU built by deliverPdu
+        private fun udhlIndex(pdu: ByteArray): Int {
+            var i = 1 + pdu[0] + 1
+            val digits = pdu[i++].toInt()
+            return i + 1 + (digits + 1) / 2 + 1 + 1 + 7 + 1
+        }
+    }
+}
@@ -0,0 +1,157 @@
+package com.smartexpenseai.app.utils
+
+import android.content.Context
+import androidx.room.Room
+import com.smartexpenseai.app.data.database.ExpenseDatabase
+import com.smartexpenseai.app.data.entities.TransactionEntity
+import com.smartexpenseai.app.utils.logging.StructuredLogger
+import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.withContext
+import java.util.Date
+import java.util.Locale
+import kotlin.random.Random
+
+/**
+ * Times [DuplicateCleanupHelper]'s SQL and in-memory cleanups on the same synthetic table
+ *
+ * Two in-memory databases get identical rows (so identical ids): unique transactions
+ * plus a share of re-imports that repeat an existing reference number, or the same
+ * merchant, amount and bank a few minutes apart, sometimes with the merchant's case
+ * changed. Confidence scores come from a handful of values and some re-imports keep
+ * the original timestamp, so groups often tie on everything but the id. Each path
+ * cleans its own copy and the removed rows are compared. Runs under Robolectric; see
+ * DuplicateCleanupParityTest.
+ */
+object DuplicateCleanupBenchmark {
+
+    private val logger = StructuredLogger(
+        featureTag = "CLEANUP",
+        className = "DuplicateCleanupBenchmark"
+    )
+
+    /**
+     * @property sqlMillis -1 when the device's SQLite has no window functions
+     * @property mismatchedRows Rows removed by only one of the two paths; always 0
+     *   when the two paths agree
+     */
+    data class Report(
+        val rows: Int,
+        val sqlMillis: Double,
+        val inMemoryMillis: Double,
+        val sqlRemoved: Int,
+        val inMemoryRemoved: Int,
+        val mismatchedRows: Int
+    ) {
+        fun format(): String = String.format(
+            Locale.US,
+            "rows: %d | sql: %.1f ms, %d removed | in-memory: %.1f ms, %d removed | mismatched: %d",
+            rows, sqlMillis, sqlRemoved, inMemoryMillis, inMemoryRemoved, mismatchedRows
+        )
+    }
+
+    private val MERCHANTS = listOf(
+        "SWIGGY", "ZOMATO", "AMAZON", "FLIPKART", "DMART", "UBER INDIA", "IRCTC", "NETFLIX",
+        "APOLLO PHARMACY", "INDIAN OIL", "STARBUCKS", "MYNTRA", "BLINKIT", "BIG BAZAAR",
+        "CAFÉ COFFEE DAY", "ÇAY EVİ", "MÜNCHEN BÄCKEREI", "हल्दीराम"
+    )
+    private val CONFIDENCES = listOf(0.6f, 0.75f, 0.9f, 0.9f, 1.0f)
+    private val BANKS = listOf("HDFC Bank", "ICICI Bank", "State Bank of India", "Axis Bank", "Kotak Bank")
+
+    // 2025-01-01T00:00:00Z
+    private const val BASE_TIMESTAMP = 1_735_689_600_000L
+    private const val YEAR_MILLIS = 365L * 86_400_000L
+    private const val INSERT_CHUNK = 5_000
+
+    suspend fun run(
+        context: Context,
+        rows: Int = 200_000,
+        duplicateRatio: Double = 0.1,
+        seed: Int = 42
+    ): Report = withContext(Dispatchers.IO) {
+        val transactions = generate(rows, duplicateRatio, seed)
+        val sqlDatabase = fill(context, transactions)
+        val memoryDatabase = fill(context, transactions)
+
+        try {
+            val sqlSupported = DuplicateCleanupHelper.supportsWindowFunctions(sqlDatabase)
+            var sqlResult: DuplicateCleanupHelper.CleanupResult? = null
+            val sqlStart = System.nanoTime()
+            if (sqlSupported) sqlResult = DuplicateCleanupHelper.cleanupInSql(sqlDatabase)
+            val sqlNanos = System.nanoTime() - sqlStart
+
+            val memoryStart = System.nanoTime()
+            val memoryResult = DuplicateCleanupHelper.cleanupInMemory(memoryDatabase.transactionDao())
+            val memoryNanos = System.nanoTime() - memoryStart
+
+            val sqlRemovedIds = sqlResult?.details.orEmpty().flatMap { it.removed }.toSet()
+            val memoryRemovedIds = memoryResult.details.flatMap { it.removed }.toSet()
+
+            val report = Report(
+                rows = transactions.size,
+                sqlMillis = if (sqlSupported) sqlNanos / 1e6 else -1.0,
+                inMemoryMillis = memoryNanos / 1e6,
+                sqlRemoved = sqlRemovedIds.size,
+                inMemoryRemoved = memoryRemovedIds.size,
+                mismatchedRows = if (sqlSupported) (sqlRemovedIds - memoryRemovedIds).size + (memoryRemovedIds - sqlRemovedIds).size else 0
+            )
+            logger.info("run", "Duplicate cleanup benchmark: ${report.format()}")
+            report
+        } finally {
+            sqlDatabase.close()
+            memoryDatabase.close()
+        }
+    }
+
+    private suspend fun fill(context: Context, transactions: List<TransactionEntity>): ExpenseDatabase {
+        val database = Room.inMemoryDatabaseBuilder(context, ExpenseDatabase::class.java).build()
+        transactions.chunked(INSERT_CHUNK).forEach { database.transactionDao().insertTransactions(it) }
+        return database
+    }
+
+    private fun generate(rows: Int, duplicateRatio: Double, seed: Int): List<TransactionEntity> {
+        val random = Random(seed)
+        val created = Date()
+        val result = ArrayList<TransactionEntity>(rows)
+        while (result.size < rows) {
+            val index = result.size
+            val original = result.takeIf { it.isNotEmpty() && random.nextDouble() < duplicateRatio }
+                ?.get(random.nextInt(result.size))
+            val entity = if (original == null) {
+                val merchant = MERCHANTS.random(random)
+                TransactionEntity(
+                    smsId = "bench_$index",
+                    amount = random.nextInt(10, 50_000) + random.nextInt(0, 100) / 100.0,
+                    rawMerchant = merchant,
+                    normalizedMerchant = merchant,
+                    bankName = BANKS.random(random),
+                    transactionDate = Date(BASE_TIMESTAMP + random.nextLong(0, YEAR_MILLIS)),
+                    rawSmsBody = "Synthetic transaction $index",
+                    confidenceScore = CONFIDENCES.random(random),
+                    referenceNumber = if (random.nextBoolean()) random.nextLong(100_000_000_000L, 999_999_999_999L).toString() else null,
+                    createdAt = created,
+                    updatedAt = created
+                )
+            } else {
+                // Re-import of an earlier row: same reference, or no reference and the same
+                // or a slightly shifted timestamp, possibly with the merchant in other case
+                val sameReference = original.referenceNumber != null && random.nextBoolean()
+                val shift = if (random.nextBoolean()) 0L else random.nextLong(0, 5 * 60_000L)
+                val merchant = when (random.nextInt(3)) {
+                    0 -> original.normalizedMerchant.lowercase()
+                    1 -> original.normalizedMerchant.uppercase()
+                    else -> original.normalizedMerchant
+                }
+                original.copy(
+                    smsId = "bench_$index",
+                    normalizedMerchant = merchant,
+                    transactionDate = if (sameReference) original.transactionDate
+                        else Date(original.transactionDate.time + shift),
+                    referenceNumber = if (sameReference) original.referenceNumber else null,
+                    confidenceScore = CONFIDENCES.random(random)
+                )
+            }
+            result += entity
+        }
+        return result
+    }
+}
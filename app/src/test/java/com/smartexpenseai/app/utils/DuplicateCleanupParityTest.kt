@@ -0,0 +1,116 @@
+package com.smartexpenseai.app.utils
+
+import android.content.Context
+import androidx.room.Room
+import androidx.test.core.app.ApplicationProvider
+import com.smartexpenseai.app.data.database.ExpenseDatabase
+import com.smartexpenseai.app.data.entities.TransactionEntity
+import kotlinx.coroutines.runBlocking
+import org.junit.Assert.assertEquals
+import org.junit.Assert.assertTrue
+import org.junit.Test
+import org.junit.runner.RunWith
+import org.robolectric.RobolectricTestRunner
+import org.robolectric.annotation.SQLiteMode
+import java.util.Date
+
+/**
+ * [DuplicateCleanupHelper.cleanupInSql] and [DuplicateCleanupHelper.cleanupInMemory]
+ * must soft-delete the same rows
+ *
+ * Native SQLite mode, because the legacy Robolectric SQLite predates window functions.
+ */
+@RunWith(RobolectricTestRunner::class)
+@SQLiteMode(SQLiteMode.Mode.NATIVE)
+class DuplicateCleanupParityTest {
+
+    private val context = ApplicationProvider.getApplicationContext<Context>()
+
+    @Test
+    fun bothPathsRemoveTheSameRowsFromTiesAndNonAsciiMerchants() = runBlocking {
+        val sqlRemoved = removedIds(FIXTURE, inSql = true)
+        val memoryRemoved = removedIds(FIXTURE, inSql = false)
+
+        assertEquals(EXPECTED_REMOVED, sqlRemoved)
+        assertEquals(EXPECTED_REMOVED, memoryRemoved)
+    }
+
+    @Test
+    fun bothPathsAgreeOnASyntheticTable() = runBlocking {
+        val report = DuplicateCleanupBenchmark.run(context, rows = 20_000, duplicateRatio = 0.2)
+        assertTrue("SQLite should support window functions", report.sqlMillis >= 0)
+        assertTrue("the table should have duplicates", report.sqlRemoved > 0)
+        assertEquals(0, report.mismatchedRows)
+    }
+
+    private suspend fun removedIds(rows: List<TransactionEntity>, inSql: Boolean): Set<Long> {
+        val database = Room.inMemoryDatabaseBuilder(context, ExpenseDatabase::class.java)
+            .allowMainThreadQueries()
+            .build()
+        try {
+            database.transactionDao().insertTransactions(rows)
+            val result = if (inSql) {
+                assertTrue(DuplicateCleanupHelper.supportsWindowFunctions(database))
+                DuplicateCleanupHelper.cleanupInSql(database)
+            } else {
+                DuplicateCleanupHelper.cleanupInMemory(database.transactionDao())
+            }
+            return result.details.flatMap { it.removed }.toSet()
+        } finally {
+            database.close()
+        }
+    }
+
+    companion object {
+        // 2025-01-01T00:00:00Z, the start of a 10-minute bucket
+        private const val T = 1_735_689_600_000L
+
+        private fun row(
+            id: Long,
+            merchant: String,
+            bank: String,
+            amount: Double,
+            offsetMillis: Long,
+            confidence: Float,
+            reference: String? = null
+        ) = TransactionEntity(
+            id = id,
+            smsId = "parity_$id",
+            amount = amount,
+            rawMerchant = merchant,
+            normalizedMerchant = merchant,
+            bankName = bank,
+            transactionDate = Date(T + offsetMillis),
+            rawSmsBody = "Parity fixture $id",
+            confidenceScore = confidence,
+            referenceNumber = reference,
+            createdAt = Date(T),
+            updatedAt = Date(T)
+        )
+
+        private val FIXTURE = listOf(
+            // Same reference, tied on confidence and date: the lower id stays
+            row(1, "SWIGGY", "HDFC Bank", 250.0, 60_000, 0.9f, reference = "111"),
+            row(2, "SWIGGY", "HDFC Bank", 250.0, 60_000, 0.9f, reference = "111"),
+            // SQLite's TRIM() keeps a tab, so this is a reference on both paths; latest date stays
+            row(3, "ZOMATO", "ICICI Bank", 120.0, 120_000, 0.8f, reference = "\t"),
+            row(4, "ZOMATO", "ICICI Bank", 120.0, 180_000, 0.8f, reference = "\t"),
+            // Blank reference: no reference group
+            row(5, "ZOMATO", "ICICI Bank", 999.0, 0, 0.7f, reference = "  "),
+            // ASCII case differences group; full ties keep the lowest id; 14 joins the run
+            row(6, "Swiggy", "Axis Bank", 80.0, 120_000, 0.5f),
+            row(7, "SWIGGY", "Axis Bank", 80.0, 120_000, 0.5f),
+            row(8, "swiggy", "axis bank", 80.0, 120_000, 0.5f),
+            row(14, "SWIGGY", "Axis Bank", 80.0, 599_000, 0.5f),
+            // É and é only differ outside ASCII, so 9 stays apart from 10 and 11
+            row(9, "CAFÉ", "HDFC Bank", 45.0, 60_000, 0.6f),
+            row(10, "café", "HDFC Bank", 45.0, 60_000, 0.6f),
+            row(11, "Café", "HDFC Bank", 45.0, 60_000, 0.6f),
+            // Non-Latin merchant: highest confidence stays
+            row(12, "हल्दीराम", "State Bank of India", 300.0, 0, 0.9f),
+            row(13, "हल्दीराम", "State Bank of India", 300.0, 0, 1.0f)
+        )
+
+        private val EXPECTED_REMOVED = setOf(2L, 3L, 7L, 8L, 14L, 11L, 12L)
+    }
+}